@@ -3,6 +3,9 @@ LaunchDarkly API Client Package
 High-performance, cached, and resilient API client for LaunchDarkly operations
 """
 
-from .launchdarkly_client import LaunchDarklyClient, get_client, reset_client
+from .launchdarkly_client import (LaunchDarklyClient, PatchConflict, PatchRejected, RequestCancelled, get_client,
+                                  is_guarded_patch, is_patch_conflict, patch_error_message, reset_client)
+from .async_client import AsyncLaunchDarklyClient, AsyncAPIError
 
-__all__ = ['LaunchDarklyClient', 'get_client', 'reset_client']
+__all__ = ['LaunchDarklyClient', 'PatchConflict', 'PatchRejected', 'get_client', 'is_guarded_patch', 'is_patch_conflict',
+           'patch_error_message', 'RequestCancelled', 'reset_client', 'AsyncLaunchDarklyClient', 'AsyncAPIError']
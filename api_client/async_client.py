@@ -0,0 +1,585 @@
+"""
+Asyncio LaunchDarkly API Client
+Flag, segment, patch, audit-log and orphan-export surface of LaunchDarklyClient
+(everything except the offline snapshot fallback), built on aiohttp with a pooled
+keep-alive connector so fan-out work (per-flag scans, multi-environment reads,
+audit-log paging) runs many requests in flight on one event loop instead of one
+thread each. The Enhanced View tab drives its orphan export through utils.async_bridge.
+"""
+
+import json
+import time
+import asyncio
+import inspect
+import logging
+from datetime import datetime
+from urllib.parse import urlencode
+from functools import wraps
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency; the threaded client works without it
+    aiohttp = None
+
+from shared.config_loader import LAUNCHDARKLY_API_KEY, PROJECT_KEY
+from api_config.api_endpoints import LAUNCHDARKLY_BASE_URL, APIConfig, APIHeaders
+from .launchdarkly_client import (
+    APICache, CoalescedProgress, ConditionalRequestStore, LaunchDarklyClient, PatchConflict, PatchRejected,
+    ValidatorEntry, RateLimiter, build_cache_key, get_client, is_guarded_patch, is_patch_conflict
+)
+from .metrics import ClientMetrics
+from .flag_data import FlagDataMixin
+
+# Statuses retried with backoff, as the threaded client's urllib3 Retry does
+RETRY_STATUSES = {500, 502, 503, 504}
+
+class AsyncAPIError(Exception):
+    """Non-success HTTP response from the LaunchDarkly API"""
+    def __init__(self, method: str, url: str, status: int, body: str = ""):
+        super().__init__(f"{status} error for {method} {url}: {body[:200]}")
+        self.method = method
+        self.url = url
+        self.status = status
+        self.body = body
+
+    def message(self) -> str:
+        """LaunchDarkly's error message with the status code (as patch_error_message)"""
+        try:
+            message = (json.loads(self.body) or {}).get("message")
+        except (ValueError, AttributeError):
+            message = None
+        return f"{self.status} {message or self.body[:200]}".strip()
+
+@dataclass
+class AsyncResponse:
+    """Fully-read response (body is buffered so the connection returns to the pool)"""
+    status: int
+    headers: CaseInsensitiveDict
+    content: bytes
+    url: str
+
+    def json(self) -> Any:
+        return json.loads(self.content.decode("utf-8")) if self.content else None
+
+def async_cached_request(ttl_seconds: int = 300, tags: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None):
+    """Async counterpart of cached_request; keys and tags are built the same way"""
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            cache_key, arguments = build_cache_key(func.__name__, signature, self, args, kwargs)
+
+            cached_result = self.cache.get(cache_key)
+            self.metrics.record_cache(cached_result is not None)
+            if cached_result is not None:
+                return cached_result
+
+            result = await func(self, *args, **kwargs)
+            if result is not None:
+                entry_tags = tags(arguments) if tags else ()
+                self.cache.set(cache_key, result, ttl_seconds, tags=entry_tags)
+
+            return result
+        return wrapper
+    return decorator
+
+class AsyncLaunchDarklyClient(FlagDataMixin):
+    """asyncio LaunchDarkly client; use ``async with`` or call ``close()`` when done.
+
+    The aiohttp session is created lazily on first use so it binds to the loop the
+    client actually runs on (see utils.async_bridge for driving it from Tk).
+
+    A LaunchDarkly token has one rate budget, so a client for the same token and
+    project as ``share_with`` (by default the get_client() instance) uses that
+    client's response cache, ETag validators, read/write rate limiters and metrics
+    instead of its own; running both never doubles the real request rate.
+    """
+
+    def __init__(self, api_key: str = None, project_key: str = None,
+                 max_connections: int = APIConfig.ASYNC_MAX_CONNECTIONS,
+                 share_with: Optional[LaunchDarklyClient] = None):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncLaunchDarklyClient requires aiohttp. Install it with 'pip install aiohttp' "
+                "or use LaunchDarklyClient instead."
+            )
+        self.api_key = api_key or LAUNCHDARKLY_API_KEY
+        self.project_key = project_key or PROJECT_KEY
+        self.base_url = LAUNCHDARKLY_BASE_URL
+        self.max_connections = max_connections
+        self.session: Optional["aiohttp.ClientSession"] = None
+
+        shared = share_with or get_client()
+        if shared.api_key == self.api_key and shared.project_key == self.project_key:
+            self.cache = shared.cache
+            self.validators = shared.validators
+            self.read_limiter = shared.read_limiter
+            self.write_limiter = shared.write_limiter
+            self.metrics = shared.metrics
+        else:
+            # Another token or project: its own budgets and cache (cache keys do not include the project)
+            self.cache = APICache()
+            self.validators = ConditionalRequestStore()
+            self.read_limiter = RateLimiter(rate_per_minute=APIConfig.READ_REQUESTS_PER_MINUTE, name="read")
+            self.write_limiter = RateLimiter(rate_per_minute=APIConfig.WRITE_REQUESTS_PER_MINUTE, name="write")
+            self.metrics = ClientMetrics()
+        self.rate_limiter = self.read_limiter
+        self.stats = {
+            "requests_made": 0,
+            "errors": 0,
+            "pages_fetched": 0,
+            "conditional_requests": 0,
+            "not_modified": 0,
+            "bytes_revalidated": 0
+        }
+        self.logger = logging.getLogger(__name__)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=APIConfig.ASYNC_KEEPALIVE_TIMEOUT
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=APIHeaders.get_launchdarkly_headers(self.api_key),
+                timeout=aiohttp.ClientTimeout(total=APIConfig.DEFAULT_TIMEOUT)
+            )
+        return self.session
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def _limiter_for(self, method: str) -> RateLimiter:
+        return self.read_limiter if method.upper() in ("GET", "HEAD", "OPTIONS") else self.write_limiter
+
+    async def _acquire_rate_limit(self, method: str):
+        # The loop must never block, so poll the limiter and sleep between attempts
+        limiter = self._limiter_for(method)
+        while not limiter.acquire():
+            wait_time = max(limiter.wait_time(), 0.05)
+            await asyncio.sleep(wait_time)
+            self.metrics.record_rate_limit_wait(wait_time)
+
+    async def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None,
+                            json_body: Any = None, headers: Optional[Dict] = None) -> AsyncResponse:
+        """Rate-limited request with retries, GET revalidation and metrics.
+
+        Raises AsyncAPIError for non-success statuses once retries are exhausted.
+        """
+        url = f"{self.base_url}{endpoint}"
+        method = method.upper()
+        headers = dict(headers or {})
+
+        validator_key = None
+        validator = None
+        if method == "GET":
+            validator_key = f"{url}?{urlencode(sorted((params or {}).items()))}"
+            validator = self.validators.get(validator_key)
+            if validator:
+                if validator.etag:
+                    headers["If-None-Match"] = validator.etag
+                if validator.last_modified:
+                    headers["If-Modified-Since"] = validator.last_modified
+                self.stats["conditional_requests"] += 1
+
+        response = await self._send_with_retries(method, url, params, json_body, headers)
+
+        if response.status == 304 and validator:
+            self.stats["not_modified"] += 1
+            self.stats["bytes_revalidated"] += len(validator.content)
+            return AsyncResponse(status=200, headers=CaseInsensitiveDict(validator.headers), content=validator.content, url=url)
+
+        if response.status >= 400:
+            self.stats["errors"] += 1
+            body = response.content.decode("utf-8", "replace")
+            self.logger.error(f"API request failed: {method} {endpoint} - {response.status}")
+            raise AsyncAPIError(method, url, response.status, body)
+
+        if validator_key and response.status == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.validators.put(validator_key, ValidatorEntry(
+                    etag=etag,
+                    last_modified=last_modified,
+                    content=response.content,
+                    headers=dict(response.headers),
+                    encoding="utf-8"
+                ))
+
+        return response
+
+    async def _send_with_retries(self, method: str, url: str, params: Optional[Dict],
+                                 json_body: Any, headers: Dict) -> AsyncResponse:
+        """Send with retries; every attempt, retries included, takes its own rate-limit token.
+
+        Connection errors and 5xx responses back off exponentially before queueing
+        again. A 429 has already paused and slowed the limiter through
+        update_from_headers, so its retry just waits for the next token.
+        """
+        session = self._get_session()
+        retries = 0
+        while True:
+            await self._acquire_rate_limit(method)
+            self.stats["requests_made"] += 1
+            started = time.perf_counter()
+            try:
+                async with session.request(method, url, params=params, json=json_body, headers=headers) as raw:
+                    content = await raw.read()
+                    response = AsyncResponse(status=raw.status, headers=CaseInsensitiveDict(raw.headers), content=content, url=url)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.metrics.record_request(method, url, (time.perf_counter() - started) * 1000, error=True)
+                if retries >= APIConfig.MAX_RETRIES:
+                    self.stats["errors"] += 1
+                    raise
+                retries += 1
+                await asyncio.sleep(0.5 * (2 ** (retries - 1)))
+                continue
+
+            self._limiter_for(method).update_from_headers(response.headers, response.status)
+            throttled = response.status == 429
+            should_retry = (throttled or response.status in RETRY_STATUSES) and retries < APIConfig.MAX_RETRIES
+            self.metrics.record_request(
+                method, url, (time.perf_counter() - started) * 1000,
+                status=response.status,
+                bytes_received=len(content),
+                retries=1 if should_retry else 0,
+                error=response.status >= 400
+            )
+            if not should_retry:
+                return response
+
+            retries += 1
+            if throttled:
+                self.logger.warning(f"Rate limited: {method} {url} (attempt {retries}), "
+                                    f"waiting for the {self._limiter_for(method).name} limiter")
+                continue
+            retry_after = self._retry_after_seconds(response.headers)
+            await asyncio.sleep(retry_after if retry_after is not None else 0.5 * (2 ** (retries - 1)))
+
+    @staticmethod
+    def _retry_after_seconds(headers: CaseInsensitiveDict) -> Optional[float]:
+        value = headers.get("Retry-After")
+        try:
+            return max(0.0, float(value)) if value is not None else None
+        except ValueError:
+            return None
+
+    @async_cached_request(ttl_seconds=300, tags=lambda args: ["flags"])  # 5-minute cache
+    async def get_all_flags(self, include_archived: bool = True, limit: int = 100, sort_by: str = "modified",
+                            concurrent: bool = True) -> List[Dict]:
+        """Get all feature flags; pages after the first are fetched concurrently"""
+        first_page = await self._fetch_flags_page(limit, 0)
+        flags = first_page.get("items", [])
+        all_flags = list(flags)
+        offset = limit
+
+        total_count = first_page.get("totalCount")
+        if concurrent and isinstance(total_count, int) and len(flags) >= limit and total_count > limit:
+            offsets = list(range(limit, total_count, limit))
+            semaphore = asyncio.Semaphore(APIConfig.MAX_PAGE_WORKERS)
+
+            async def fetch(off: int) -> Dict:
+                async with semaphore:
+                    return await self._fetch_flags_page(limit, off)
+
+            # gather() preserves submission order, keeping pages in offset order
+            for page in await asyncio.gather(*(fetch(off) for off in offsets)):
+                flags = page.get("items", [])
+                all_flags.extend(flags)
+            offset = offsets[-1] + limit
+
+        while len(flags) >= limit:
+            page = await self._fetch_flags_page(limit, offset)
+            flags = page.get("items", [])
+            all_flags.extend(flags)
+            offset += limit
+
+        for flag in all_flags:
+            self._enrich_flag_data(flag)
+
+        return self._sort_flags(all_flags, sort_by)
+
+    async def _fetch_flags_page(self, limit: int, offset: int) -> Dict:
+        endpoint = f"/flags/{self.project_key}"
+        response = await self._make_request("GET", endpoint, params={"limit": limit, "offset": offset, "summary": 0})
+        self.stats["pages_fetched"] += 1
+        return response.json() or {}
+
+    @async_cached_request(ttl_seconds=60, tags=lambda args: [f"flag:{args['flag_key']}"])  # 1-minute cache
+    async def get_flag(self, flag_key: str) -> Optional[Dict]:
+        """Get a specific flag"""
+        response = await self._make_request("GET", f"/flags/{self.project_key}/{flag_key}")
+        flag = response.json()
+        if flag:
+            self._enrich_flag_data(flag)
+        return flag
+
+    async def get_flag_raw(self, flag_key: str) -> Optional[Dict]:
+        """Get a flag exactly as LaunchDarkly returns it (no enrichment, no TTL cache)"""
+        response = await self._make_request("GET", f"/flags/{self.project_key}/{flag_key}")
+        return response.json()
+
+    async def get_flags(self, flag_keys: List[str], max_concurrency: int = APIConfig.SCAN_WORKERS) -> Dict[str, Optional[Dict]]:
+        """Fetch many flags concurrently; missing (404) flags map to None"""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def fetch(flag_key: str) -> Optional[Dict]:
+            async with semaphore:
+                try:
+                    return await self.get_flag(flag_key)
+                except AsyncAPIError as e:
+                    if e.status == 404:
+                        return None
+                    raise
+
+        results = await asyncio.gather(*(fetch(key) for key in flag_keys))
+        return dict(zip(flag_keys, results))
+
+    async def find_orphaned_flags(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> List[Dict]:
+        """Scan every flag with full environment data and return the orphaned ones"""
+        flag_keys = [f.get("key") for f in await self.get_all_flags() if f.get("key")]
+        total = len(flag_keys)
+        done = 0
+        semaphore = asyncio.Semaphore(APIConfig.SCAN_WORKERS)
+
+        async def check(flag_key: str) -> Optional[Dict]:
+            nonlocal done
+            async with semaphore:
+                try:
+                    # Raw reads keep a full scan from flooding the TTL cache with single flags
+                    flag = await self.get_flag_raw(flag_key)
+                except AsyncAPIError as e:
+                    self.logger.debug(f"Skipping {flag_key}: {e}")
+                    flag = None
+            done += 1
+            if progress_callback:
+                progress_callback(done, total, flag_key)
+            if flag and flag.get("environments") and self._is_orphaned_flag_with_env_data(flag):
+                return self._enrich_flag_for_export(flag)
+            return None
+
+        results = await asyncio.gather(*(check(key) for key in flag_keys))
+        return [flag for flag in results if flag]
+
+    async def export_orphaned_flags(self, progress_callback: Optional[Callable[[int, int, str], None]] = None
+                                    ) -> Tuple[List[Dict], str]:
+        """Find orphaned flags and write them to orphaned_flags_<timestamp>.csv.
+
+        Progress calls are coalesced as in LaunchDarklyClient.export_orphaned_flags_bg;
+        the CSV is written on the default executor so the loop keeps running.
+        """
+        progress = CoalescedProgress(progress_callback, APIConfig.SCAN_PROGRESS_INTERVAL)
+        orphaned_flags = await self.find_orphaned_flags(progress.update)
+
+        filename = f"orphaned_flags_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        await asyncio.get_running_loop().run_in_executor(None, self._write_orphaned_csv, orphaned_flags, filename)
+        self.logger.info(f"ORPHANED EXPORT: Found {len(orphaned_flags)} orphaned flags, saved to {filename}")
+        return orphaned_flags, filename
+
+    @async_cached_request(ttl_seconds=APIConfig.SEGMENT_CACHE_TTL,
+                          tags=lambda args: ["segments", f"segments:{args['env_key']}"])
+    async def get_segments(self, env_key: str) -> Dict[str, Dict]:
+        """All segments of an environment keyed by segment key (see LaunchDarklyClient.get_segments)"""
+        segments: Dict[str, Dict] = {}
+        limit = APIConfig.SEGMENT_PAGE_SIZE
+        offset = 0
+        while True:
+            response = await self._make_request("GET", f"/segments/{self.project_key}/{env_key}",
+                                                params={"limit": limit, "offset": offset})
+            data = response.json() or {}
+            items = data.get("items", []) or []
+            for segment in items:
+                if segment.get("key"):
+                    segments[segment["key"]] = segment
+            total_count = data.get("totalCount")
+            offset += limit
+            if len(items) < limit or (isinstance(total_count, int) and offset >= total_count):
+                break
+        return segments
+
+    async def get_segment(self, env_key: str, segment_key: str) -> Optional[Dict]:
+        """One segment, served from the cached bulk listing of its environment"""
+        return (await self.get_segments(env_key)).get(segment_key)
+
+    async def patch_flag(self, flag_key: str, operations: List[Dict], comment: str = None) -> bool:
+        """Update flag using JSON Patch operations (see LaunchDarklyClient.patch_flag).
+
+        Raises PatchConflict and PatchRejected under the same rules as the threaded client.
+        """
+        from shared.user_session import get_api_comment
+
+        payload = {
+            "comment": comment or get_api_comment(f"Flag configuration update for {flag_key}"),
+            "patch": operations
+        }
+
+        try:
+            response = await self._make_request("PATCH", f"/flags/{self.project_key}/{flag_key}", json_body=payload)
+            self._apply_written_flag(flag_key, response.json())
+            return True
+        except AsyncAPIError as e:
+            if is_patch_conflict(e.status, operations, e.body):
+                raise PatchConflict(f"{flag_key} changed since it was read ({e.status})") from e
+            if is_guarded_patch(operations) and e.status in (400, 422):
+                raise PatchRejected(e.message()) from e
+            self.logger.error(f"Failed to patch flag {flag_key}: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"Failed to patch flag {flag_key}: {str(e)}")
+
+        return False
+
+    async def update_flag(self, flag_key: str, environment: str, operations: List[Dict], comment: str = None) -> bool:
+        """Update flag using semantic patch with user attribution"""
+        from shared.user_session import get_api_comment
+
+        if not comment:
+            comment = get_api_comment("Flag update")
+
+        payload = {
+            "environmentKey": environment,
+            "comment": comment,
+            "instructions": operations
+        }
+        headers = {"Content-Type": "application/json; domain-model=launchdarkly.semanticpatch"}
+
+        try:
+            response = await self._make_request("PATCH", f"/flags/{self.project_key}/{flag_key}",
+                                                json_body=payload, headers=headers)
+            self._apply_written_flag(flag_key, response.json())
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to update flag {flag_key}: {str(e)}")
+
+        return False
+
+    async def create_flag(self, flag_data: Dict) -> bool:
+        """Create a new flag"""
+        try:
+            response = await self._make_request("POST", f"/flags/{self.project_key}", json_body=flag_data)
+            self._apply_written_flag(flag_data.get("key"), response.json())
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to create flag: {str(e)}")
+
+        return False
+
+    async def get_audit_log_entries(
+        self,
+        project_key: Optional[str] = None,
+        env_key: Optional[str] = None,
+        limit: int = 20,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        spec: Optional[str] = None,
+    ) -> List[Dict]:
+        """Fetch audit log entries (see LaunchDarklyClient.get_audit_log_entries)"""
+        params = self._audit_log_params(project_key, env_key, limit, before, after, spec)
+        response = await self._make_request("GET", "/auditlog", params=params)
+        items = (response.json() or {}).get("items", [])
+        return items if isinstance(items, list) else []
+
+    async def get_sync_cursor(self) -> Dict:
+        """Server-side starting position for sync_flag_changes (see LaunchDarklyClient.get_sync_cursor)"""
+        spec = f"proj/{self.project_key}:env/*:flag/*"
+        response = await self._make_request("GET", "/auditlog", params=self._audit_log_params(limit=20, spec=spec))
+        items = (response.json() or {}).get("items", [])
+        fetched: Dict[str, int] = {}
+        self._unseen_audit_entries(items if isinstance(items, list) else [], set(), fetched)
+        return self._sync_position(fetched, date_header=response.headers.get("Date"))
+
+    async def sync_flag_changes(self, flags: List[Dict], since_ms: int, sort_by: str = "modified",
+                                seen: Iterable[str] = ()) -> Dict:
+        """Incremental audit-log sync (see LaunchDarklyClient.sync_flag_changes)"""
+        result = {"flags": flags, "changed": [], "removed": [], "cursor": since_ms, "seen": list(seen),
+                  "full_refresh": False}
+        spec = f"proj/{self.project_key}:env/*:flag/*"
+
+        changed_keys: List[str] = []
+        fetched: Dict[str, int] = {}
+        seen = set(seen)
+        after = self._sync_after(since_ms)
+        before = None
+        for _ in range(APIConfig.DELTA_SYNC_MAX_PAGES):
+            entries = await self.get_audit_log_entries(limit=20, after=str(after), before=before, spec=spec)
+            for entry in self._unseen_audit_entries(entries, seen, fetched):
+                for flag_key in self._flag_keys_from_audit_entry(entry):
+                    if flag_key not in changed_keys:
+                        changed_keys.append(flag_key)
+            if len(entries) < 20:
+                break
+            before = str(min(e.get("date") or 0 for e in entries))
+        else:
+            result["full_refresh"] = True
+            return result
+
+        result.update(self._sync_position(fetched, since_ms))
+        if not changed_keys:
+            return result
+
+        for flag_key in changed_keys:
+            self.cache.invalidate_tag(f"flag:{flag_key}")
+        fetched = await self.get_flags(changed_keys)
+        updated = [flag for flag in fetched.values() if flag is not None]
+        removed = [key for key, flag in fetched.items() if flag is None]
+
+        self._patch_cached_listings(updated, removed)
+        result.update({
+            "flags": self.merge_flags(flags, updated, removed, sort_by),
+            "changed": [f.get("key") for f in updated],
+            "removed": removed
+        })
+        return result
+
+    async def get_flag_statistics(self, flags: Optional[List[Dict]] = None) -> Dict:
+        """Get flag usage statistics (for the given flags, or the current listing)"""
+        if flags is None:
+            flags = await self.get_all_flags()
+        return self._flag_statistics(flags)
+
+    def invalidate_cache(self, tag: str):
+        """Drop cached entries carrying tag ("flags" for listings, "flag:<key>" for one flag)"""
+        self.cache.invalidate_tag(tag)
+
+    def clear_cache(self):
+        """Clear all cached data (validators are kept for cheap revalidation)"""
+        self.cache.clear()
+
+    def get_performance_stats(self) -> Dict:
+        """Get API client performance statistics"""
+        metrics = self.metrics.snapshot()
+        cache_stats = self.cache.get_stats()
+        return {
+            **self.stats,
+            "cache_hits": metrics["cache_hits"],
+            "cache_misses": metrics["cache_misses"],
+            "cache_hit_rate": metrics["cache_hit_rate"],
+            "cached_items": cache_stats["entries"],
+            "cache_bytes": cache_stats["bytes_in_use"],
+            "cache_evictions": cache_stats["evictions"],
+            "validators_stored": len(self.validators.entries),
+            "validator_bytes": self.validators.get_stats()["bytes_in_use"],
+            "latency_p50_ms": metrics["latency"]["p50_ms"],
+            "latency_p95_ms": metrics["latency"]["p95_ms"],
+            "latency_p99_ms": metrics["latency"]["p99_ms"],
+            "bytes_received": metrics["bytes_received"],
+            "retries": metrics["retries"],
+            "rate_limit_waits": metrics["rate_limit_waits"],
+            "rate_limit_wait_seconds": metrics["rate_limit_wait_seconds"],
+            "endpoints": metrics["endpoints"],
+            "read_limiter": self.read_limiter.get_stats(),
+            "write_limiter": self.write_limiter.get_stats()
+        }
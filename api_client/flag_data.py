@@ -0,0 +1,449 @@
+"""
+Shared Flag Data Helpers
+Enrichment, sorting, statistics and audit-log helpers used by both the
+threaded and the asyncio LaunchDarkly clients
+"""
+
+import csv
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Any, Iterable, Set
+
+from api_config.api_endpoints import APIConfig
+
+class FlagDataMixin:
+    """Data helpers; expects ``project_key``, ``logger`` and an ``APICache`` as ``cache``"""
+    
+    def _sort_flags(self, flags: List[Dict], sort_by: str) -> List[Dict]:
+        """Sort flags based on specified criteria"""
+        try:
+            if sort_by == "modified":
+                # Sort by last modified date (newest first)
+                return sorted(flags, key=lambda x: x.get("lastModifiedDateTime", datetime.min), reverse=True)
+            elif sort_by == "created":
+                # Sort by creation date (newest first)
+                return sorted(flags, key=lambda x: x.get("creationDateTime", datetime.min), reverse=True)
+            elif sort_by == "name":
+                # Sort alphabetically by name
+                return sorted(flags, key=lambda x: x.get("name", "").lower())
+            elif sort_by == "key":
+                # Sort alphabetically by key
+                return sorted(flags, key=lambda x: x.get("key", "").lower())
+            elif sort_by == "health":
+                # Sort by health score (highest first)
+                return sorted(flags, key=lambda x: x.get("healthScore", 0), reverse=True)
+            elif sort_by == "status":
+                # Sort by status (Active first, then Archived)
+                return sorted(flags, key=lambda x: (x.get("status", "") != "Active", x.get("name", "").lower()))
+            else:
+                # Default to modified date
+                return sorted(flags, key=lambda x: x.get("lastModifiedDateTime", datetime.min), reverse=True)
+        except Exception as e:
+            self.logger.warning(f"Failed to sort flags by {sort_by}: {str(e)}")
+            return flags
+    
+    def _enrich_flag_data(self, flag: Dict):
+        """Enrich flag data with computed fields"""
+        # Set flag status based on archived field
+        flag["status"] = "Archived" if flag.get("archived", False) else "Active"
+        
+        # Calculate creation date
+        creation_date = flag.get("creationDate")
+        if creation_date:
+            flag["creationDateTime"] = datetime.fromtimestamp(creation_date / 1000)
+        
+        # Find most recent modification across environments
+        environments = flag.get("environments", {})
+        latest_modified = 0
+        
+        # Environment data processing (reduced logging since we know API doesn't provide this data)
+        flag_key = flag.get("key", "unknown")
+        
+        for env_key, env_data in environments.items():
+            last_modified = env_data.get("lastModified", 0)
+            if last_modified > latest_modified:
+                latest_modified = last_modified
+        
+        # Fallback to creation date if no environment modifications
+        if latest_modified:
+            flag["lastModifiedDateTime"] = datetime.fromtimestamp(latest_modified / 1000)
+        elif creation_date:
+            flag["lastModifiedDateTime"] = flag["creationDateTime"]
+        
+        # Calculate flag health score
+        flag["healthScore"] = self._calculate_health_score(flag)
+        
+        # Detect orphaned flags
+        flag["isOrphaned"] = self._is_orphaned_flag(flag)
+        
+        # Calculate environment status
+        flag["environmentStatus"] = self._get_environment_status(flag)
+    
+    def _calculate_health_score(self, flag: Dict) -> int:
+        """Calculate flag health score (0-100)"""
+        score = 100
+        
+        # Deduct points for missing description
+        if not flag.get("description", "").strip():
+            score -= 20
+        
+        # Deduct points for no tags
+        if not flag.get("tags", []):
+            score -= 10
+        
+        # Check if flag has rules/targeting
+        environments = flag.get("environments", {})
+        has_rules = False
+        
+        for env_data in environments.values():
+            if env_data.get("rules", []) or env_data.get("targets", []):
+                has_rules = True
+                break
+        
+        if not has_rules:
+            score -= 30
+        
+        # Check if flag is temporary but old
+        if flag.get("temporary", False):
+            creation_date = flag.get("creationDateTime")
+            if creation_date and (datetime.now() - creation_date).days > 30:
+                score -= 20
+        
+        return max(0, score)
+    
+    def _is_orphaned_flag(self, flag: Dict) -> bool:
+        """Check if flag is orphaned (no rules, no targeting, not actively serving traffic)"""
+        environments = flag.get("environments", {})
+        
+        # If no environment data available, assume flag is NOT orphaned (conservative approach)
+        # Individual orphaned detection will be done on-demand when user selects orphaned filter
+        if not environments:
+            return False
+        
+        for env_data in environments.values():
+            # Check for rules
+            if env_data.get("rules", []):
+                return False
+            
+            # Check for individual targeting
+            if env_data.get("targets", []):
+                return False
+            
+            # Check for context targets
+            if env_data.get("contextTargets", []):
+                return False
+            
+            # Check if flag is actively serving traffic (enabled with fallthrough)
+            if env_data.get("on", False) and env_data.get("fallthrough"):
+                return False
+            
+            # Check if flag is enabled at all
+            if env_data.get("on", False):
+                return False
+        
+        # Only mark as orphaned if we have environment data and confirmed no usage
+        return True
+    
+    def _enrich_flag_for_export(self, flag: Dict) -> Dict:
+        """Enrich flag data with export-friendly information"""
+        enriched = flag.copy()
+        environments = flag.get("environments", {})
+        
+        # Add environment summary
+        env_summary = []
+        for env_name, env_data in environments.items():
+            enabled = "✅" if env_data.get("on", False) else "❌"
+            env_summary.append(f"{env_data.get('_environmentName', env_name)}: {enabled}")
+        
+        enriched["environment_summary"] = " | ".join(env_summary)
+        enriched["total_environments"] = len(environments)
+        enriched["enabled_environments"] = len([e for e in environments.values() if e.get("on", False)])
+        
+        return enriched
+    
+    def _write_orphaned_csv(self, orphaned_flags: List[Dict], filename: str):
+        """Write orphaned flags to CSV file"""
+        if not orphaned_flags:
+            # Create empty file with headers
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(["No orphaned flags found", "All flags are actively used!"])
+            return
+        
+        headers = [
+            "Flag Key",
+            "Flag Name", 
+            "Description",
+            "Tags",
+            "Status",
+            "Environment Summary",
+            "Total Environments",
+            "Enabled Environments",
+            "Creation Date",
+            "Last Modified",
+            "Reason Orphaned"
+        ]
+        
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            
+            for flag in orphaned_flags:
+                # Format dates
+                created = flag.get("creationDate", 0)
+                created_str = datetime.fromtimestamp(created/1000).strftime("%Y-%m-%d %H:%M") if created else "Unknown"
+                
+                modified = flag.get("lastModified", 0)
+                modified_str = datetime.fromtimestamp(modified/1000).strftime("%Y-%m-%d %H:%M") if modified else "Unknown"
+                
+                # Determine why it's orphaned
+                environments = flag.get("environments", {})
+                reason_parts = []
+                if not any(env.get("on", False) for env in environments.values()):
+                    reason_parts.append("Disabled in all environments")
+                if not any(env.get("rules", []) for env in environments.values()):
+                    reason_parts.append("No targeting rules")
+                if not any(env.get("targets", []) for env in environments.values()):
+                    reason_parts.append("No individual targets")
+                
+                reason = " + ".join(reason_parts) if reason_parts else "Unknown"
+                
+                row = [
+                    flag.get("key", ""),
+                    flag.get("name", ""),
+                    flag.get("description", ""),
+                    " | ".join(flag.get("tags", [])),
+                    "Archived" if flag.get("archived", False) else "Active",
+                    flag.get("environment_summary", ""),
+                    flag.get("total_environments", 0),
+                    flag.get("enabled_environments", 0),
+                    created_str,
+                    modified_str,
+                    reason
+                ]
+                writer.writerow(row)
+    
+    def _is_orphaned_flag_with_env_data(self, flag: Dict) -> bool:
+        """Check if flag is orphaned using full environment data from individual API call"""
+        environments = flag.get("environments", {})
+        
+        if not environments:
+            return False
+        
+        for env_data in environments.values():
+            # Check for rules
+            if env_data.get("rules", []):
+                return False
+            
+            # Check for individual targeting
+            if env_data.get("targets", []):
+                return False
+            
+            # Check for context targets
+            if env_data.get("contextTargets", []):
+                return False
+            
+            # Check if flag is actively serving traffic (enabled with fallthrough)
+            if env_data.get("on", False) and env_data.get("fallthrough"):
+                return False
+            
+            # Check if flag is enabled at all
+            if env_data.get("on", False):
+                return False
+        
+        # Only mark as orphaned if we have environment data and confirmed no usage
+        return True
+    
+    def _get_environment_status(self, flag: Dict) -> Dict[str, Dict]:
+        """Get status for each environment"""
+        environments = flag.get("environments", {})
+        status = {}
+        
+        for env_key, env_data in environments.items():
+            # Determine environment display name
+            env_name = env_data.get("_environmentName", env_key.upper())
+            
+            status[env_name] = {
+                "enabled": env_data.get("on", False),
+                "archived": env_data.get("archived", False),
+                "has_rules": bool(env_data.get("rules", [])),
+                "has_targeting": bool(env_data.get("targets", []) or env_data.get("contextTargets", [])),
+                "last_modified": env_data.get("lastModified", 0)
+            }
+        
+        return status
+    
+    def _apply_written_flag(self, flag_key: Optional[str], flag: Any):
+        """Bring cached entries in line with a successful single-flag write.
+
+        ``flag`` is the body returned by the write. Cached listings are patched in place
+        (entry replaced or inserted, then re-sorted by the listing's own sort_by) and the
+        single-flag entry is dropped. Without a usable body both tags are invalidated.
+        """
+        if isinstance(flag, dict) and flag.get("key"):
+            flag_key = flag["key"]
+        else:
+            flag = None
+        
+        if flag_key:
+            self.cache.invalidate_tag(f"flag:{flag_key}")
+        if flag is None:
+            self.cache.invalidate_tag("flags")
+            return
+        
+        self._enrich_flag_data(flag)
+        self._patch_cached_listings([flag])
+    
+    def _patch_cached_listings(self, updated: List[Dict], removed: Iterable[str] = ()):
+        """Merge changed flags into every cached listing, keeping each listing's sort order"""
+        from .launchdarkly_client import cache_key_argument
+        
+        for cache_key, flags in self.cache.entries_with_tag("flags"):
+            sort_by = cache_key_argument(cache_key, "sort_by", "modified")
+            merged = self.merge_flags(flags, updated, removed, sort_by)
+            if not self.cache.replace(cache_key, merged):
+                self.cache.remove(cache_key)
+    
+    def merge_flags(self, flags: List[Dict], updated: List[Dict], removed: Iterable[str] = (),
+                    sort_by: str = "modified") -> List[Dict]:
+        """Return flags with updated entries replaced/added and removed keys dropped, re-sorted"""
+        replaced = {f.get("key") for f in updated} | set(removed)
+        merged = [f for f in flags if f.get("key") not in replaced]
+        merged.extend(updated)
+        return self._sort_flags(merged, sort_by)
+    
+    def _flag_keys_from_audit_entry(self, entry: Dict) -> List[str]:
+        """Flag keys referenced by an audit entry's target resources in this project"""
+        keys = []
+        resources = (entry.get("target") or {}).get("resources") or []
+        for resource in resources:
+            # e.g. "proj/default:env/production:flag/my-flag"
+            parts = dict(p.split("/", 1) for p in str(resource).split(":") if "/" in p)
+            proj = parts.get("proj", "").split(";")[0]
+            flag_key = parts.get("flag", "").split(";")[0]
+            if flag_key and flag_key != "*" and proj == self.project_key and flag_key not in keys:
+                keys.append(flag_key)
+        return keys
+    
+    def _audit_entry_id(self, entry: Dict) -> str:
+        """Identity of an audit entry, used to skip entries an overlapping sync already handled"""
+        if entry.get("_id"):
+            return str(entry["_id"])
+        return f"{entry.get('date')}:{','.join(self._flag_keys_from_audit_entry(entry))}"
+    
+    def _sync_after(self, since_ms: int) -> int:
+        """Audit-log query start for a delta sync: the cursor minus an overlap for late-indexed entries"""
+        return max(0, int(since_ms) - APIConfig.DELTA_SYNC_OVERLAP_MS)
+    
+    def _unseen_audit_entries(self, entries: List[Dict], seen: Set[str], fetched: Dict[str, int]) -> List[Dict]:
+        """Entries no earlier sync handled; every entry's id and date is recorded in ``fetched``"""
+        unseen = []
+        for entry in entries:
+            entry_id = self._audit_entry_id(entry)
+            if entry_id in fetched:
+                continue
+            fetched[entry_id] = entry.get("date") or 0
+            if entry_id not in seen:
+                unseen.append(entry)
+        return unseen
+    
+    def _sync_position(self, fetched: Dict[str, int], since_ms: int = 0,
+                       date_header: Optional[str] = None) -> Dict[str, Any]:
+        """{"cursor", "seen"} after a sync: the newest server-side entry date, and the entries
+        inside the next query's overlap window.
+
+        With no entries at all the response's Date header (then the local clock) is used.
+        """
+        cursor = max([int(since_ms or 0)] + list(fetched.values()))
+        if not cursor:
+            cursor = self._http_date_ms(date_header) or int(time.time() * 1000)
+        floor = cursor - APIConfig.DELTA_SYNC_OVERLAP_MS
+        return {"cursor": cursor, "seen": [entry_id for entry_id, date in fetched.items() if date >= floor]}
+    
+    @staticmethod
+    def _http_date_ms(value: Optional[str]) -> Optional[int]:
+        try:
+            return int(parsedate_to_datetime(value).timestamp() * 1000) if value else None
+        except (TypeError, ValueError):
+            return None
+    
+    def _is_recently_modified(self, flag: Dict, days: int = 7) -> bool:
+        """Check if flag was modified recently"""
+        last_modified = flag.get("lastModifiedDateTime")
+        if last_modified:
+            return (datetime.now() - last_modified).days <= days
+        return False
+    
+    def _get_environment_distribution(self, flags: List[Dict]) -> Dict:
+        """Get distribution of flags across environments"""
+        env_counts = {}
+        
+        for flag in flags:
+            env_status = flag.get("environmentStatus", {})
+            for env_name, status in env_status.items():
+                if env_name not in env_counts:
+                    env_counts[env_name] = {"total": 0, "enabled": 0, "disabled": 0}
+                
+                env_counts[env_name]["total"] += 1
+                if status["enabled"]:
+                    env_counts[env_name]["enabled"] += 1
+                else:
+                    env_counts[env_name]["disabled"] += 1
+        
+        return env_counts
+    
+    def _flag_statistics(self, flags: List[Dict]) -> Dict:
+        """Usage statistics for an enriched flag listing"""
+        stats = {
+            "total_flags": len(flags),
+            "active_flags": len([f for f in flags if f.get("status") == "Active"]),
+            "archived_flags": len([f for f in flags if f.get("status") == "Archived"]),
+            "orphaned_flags": len([f for f in flags if f.get("isOrphaned", False)]),
+            "flags_with_rules": len([f for f in flags if not f.get("isOrphaned", False)]),
+            "temporary_flags": len([f for f in flags if f.get("temporary", False)]),
+            "health_score_avg": sum(f.get("healthScore", 0) for f in flags) / len(flags) if flags else 0,
+            "recently_modified": len([f for f in flags if self._is_recently_modified(f)]),
+            "environment_distribution": self._get_environment_distribution(flags)
+        }
+        
+        return stats
+    
+    def _audit_log_params(
+        self,
+        project_key: Optional[str] = None,
+        env_key: Optional[str] = None,
+        limit: int = 20,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        spec: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Query parameters for the /auditlog endpoint"""
+        # LaunchDarkly enforces 1..20 for audit log 'limit'
+        try:
+            safe_limit = int(limit)
+        except Exception:
+            safe_limit = 20
+        if safe_limit < 1:
+            safe_limit = 1
+        if safe_limit > 20:
+            safe_limit = 20
+        params: Dict[str, Any] = {"limit": safe_limit}
+        if before:
+            params["before"] = str(before)
+        if after:
+            params["after"] = str(after)
+        # Prefer explicit spec if provided
+        if spec:
+            params["spec"] = spec
+        else:
+            proj = project_key or self.project_key
+            if env_key:
+                # Collection of all flags within a specific environment of a project
+                # Example per LD support doc: spec=my-project:env/my-env:flag/*
+                params["spec"] = f"proj/{proj}:env/{env_key}:flag/*"
+            else:
+                # No spec -> organization-wide; keep limit small
+                pass
+        
+        return params
@@ -7,17 +7,24 @@ import requests
 import json
 import time
 import logging
-import csv
 import os
+import inspect
 from datetime import datetime, timedelta
-from threading import Lock
+from threading import Lock, Condition, Thread, Event, current_thread
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib3.exceptions import MaxRetryError
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from functools import wraps
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Hashable, Iterable, Set, Tuple
 from dataclasses import dataclass
-from shared.config_loader import LAUNCHDARKLY_API_KEY, PROJECT_KEY
+from shared.config_loader import LAUNCHDARKLY_API_KEY, PROJECT_KEY, SNAPSHOT_FILE
 from api_config.api_endpoints import LAUNCHDARKLY_BASE_URL, APIConfig
+from .snapshot_store import SnapshotStore
+from .metrics import ClientMetrics
+from .flag_data import FlagDataMixin
 
 @dataclass
 class CacheEntry:
@@ -25,94 +32,566 @@ class CacheEntry:
     data: Any
     timestamp: datetime
     ttl_seconds: int
+    tags: frozenset = frozenset()
+    size_bytes: int = 0
     
     @property
     def is_expired(self) -> bool:
         return datetime.now() > self.timestamp + timedelta(seconds=self.ttl_seconds)
 
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot get a rate-limit token (non-blocking mode or wait timeout)"""
+
+class RequestCancelled(Exception):
+    """Raised when a request's caller gave up on it before it was sent"""
+
+# How often a cancellable caller queued for a token re-checks whether it is still wanted
+CANCEL_POLL_INTERVAL = 0.2
+
+class PatchConflict(Exception):
+    """Raised when a guarded JSON Patch is rejected because its test operations failed"""
+
+class PatchRejected(Exception):
+    """Raised when LaunchDarkly rejects a guarded JSON Patch as invalid (not a conflict)"""
+
+def is_guarded_patch(operations: Iterable[Dict]) -> bool:
+    return any(op.get("op") == "test" for op in operations or [])
+
+def is_patch_conflict(status_code: Optional[int], operations: Iterable[Dict], body: str = "") -> bool:
+    """Whether a rejected patch carrying test operations failed because the flag changed since it was read.
+
+    A 409 always means that; a 400 only when its body reports a failed test
+    operation. Any other 400 is a malformed patch and retrying it cannot help.
+    """
+    if not is_guarded_patch(operations):
+        return False
+    if status_code == 409:
+        return True
+    text = (body or "").lower()
+    return status_code == 400 and "test" in text and any(word in text for word in ("fail", "not equal", "mismatch"))
+
+def patch_error_message(response: Optional[requests.Response]) -> str:
+    """LaunchDarkly's error message for a rejected request, or its status code"""
+    if response is None:
+        return "no response"
+    try:
+        message = (response.json() or {}).get("message")
+    except (ValueError, AttributeError):
+        message = None
+    return f"{response.status_code} {message or response.text[:200]}".strip()
+
 class RateLimiter:
-    """Token bucket rate limiter"""
-    def __init__(self, rate_per_minute: int = 60):
+    """Fair, adaptive token bucket rate limiter.
+
+    ``acquire_blocking`` queues callers FIFO, so a thread that started waiting first is
+    served first; background callers (bulk scans) have their own queue and only get a
+    token while no interactive caller is waiting. ``update_from_headers`` feeds
+    LaunchDarkly's rate-limit headers back in: the remaining X-Ratelimit budget spread
+    over the time to X-Ratelimit-Reset becomes the target rate, Retry-After and an
+    exhausted budget pause the bucket (until X-Ratelimit-Reset when given), 429s halve
+    the refill rate and healthy responses restore it step by step. ``acquire`` keeps
+    the original non-blocking behaviour.
+    """
+    def __init__(self, rate_per_minute: int = 60, name: str = "default"):
+        self.name = name
+        self.base_rate = rate_per_minute
         self.rate_per_minute = rate_per_minute
+        self.max_tokens = rate_per_minute
         self.tokens = rate_per_minute
         self.last_update = time.time()
+        self.paused_until = 0.0
+        self.server_remaining: Optional[int] = None
+        self.throttle_count = 0
         self.lock = Lock()
+        self.condition = Condition(self.lock)
+        self.waiters: deque = deque()
+        self.background_waiters: deque = deque()
+    
+    def _refill(self, now: float):
+        # Caller holds the lock
+        elapsed = now - self.last_update
+        self.tokens = min(self.max_tokens, self.tokens + elapsed * (self.rate_per_minute / 60))
+        self.last_update = now
+    
+    def _wait_time_locked(self, now: float) -> float:
+        wait = max(0.0, self.paused_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) * (60 / self.rate_per_minute))
+        return wait
     
     def acquire(self) -> bool:
+        """Take a token if one is free right now (never jumps ahead of queued waiters)"""
         with self.lock:
             now = time.time()
-            # Add tokens based on elapsed time
-            elapsed = now - self.last_update
-            self.tokens = min(self.rate_per_minute, self.tokens + elapsed * (self.rate_per_minute / 60))
-            self.last_update = now
-            
+            self._refill(now)
+            if self.waiters or now < self.paused_until:
+                return False
             if self.tokens >= 1:
                 self.tokens -= 1
                 return True
             return False
     
+    def acquire_blocking(self, timeout: Optional[float] = None, background: bool = False,
+                         cancelled: Optional[Callable[[], bool]] = None) -> Optional[float]:
+        """Wait in FIFO order for a token; returns seconds waited, or None on timeout.
+
+        ``background`` callers queue behind every interactive caller. When ``cancelled``
+        returns True the caller leaves the queue without a token (RequestCancelled).
+        """
+        started = time.time()
+        deadline = started + timeout if timeout is not None else None
+        ticket = object()
+        queue = self.background_waiters if background else self.waiters
+        with self.condition:
+            queue.append(ticket)
+            try:
+                while True:
+                    if cancelled and cancelled():
+                        raise RequestCancelled("Request cancelled while waiting for a rate-limit token")
+                    now = time.time()
+                    self._refill(now)
+                    is_next = queue[0] is ticket and not (background and self.waiters)
+                    if is_next and now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        return now - started
+                    if deadline is not None and now >= deadline:
+                        return None
+                    # Only the head of the queue needs a timed wake-up; the rest are notified
+                    wait = self._wait_time_locked(now) if is_next else None
+                    if deadline is not None:
+                        wait = min(wait if wait is not None else deadline - now, deadline - now)
+                    if cancelled:
+                        wait = min(wait if wait is not None else CANCEL_POLL_INTERVAL, CANCEL_POLL_INTERVAL)
+                    self.condition.wait(wait)
+            finally:
+                queue.remove(ticket)
+                self.condition.notify_all()
+    
     def wait_time(self) -> float:
         """Get wait time until next token is available"""
         with self.lock:
-            if self.tokens >= 1:
-                return 0
-            return (1 - self.tokens) * (60 / self.rate_per_minute)
+            now = time.time()
+            self._refill(now)
+            return self._wait_time_locked(now)
+    
+    def update_from_headers(self, headers, status_code: int = 200):
+        """Adjust the bucket from LaunchDarkly's Retry-After / X-Ratelimit-* response headers"""
+        retry_after = _header_float(headers, "Retry-After")
+        remaining = _header_float(headers, "X-Ratelimit-Route-Remaining")
+        global_remaining = _header_float(headers, "X-Ratelimit-Global-Remaining")
+        if global_remaining is not None:
+            remaining = global_remaining if remaining is None else min(remaining, global_remaining)
+        reset_ms = _header_float(headers, "X-Ratelimit-Reset")
+        
+        with self.condition:
+            now = time.time()
+            self._refill(now)
+            pause_until = 0.0
+            if retry_after is not None:
+                pause_until = now + retry_after
+            if remaining is not None:
+                self.server_remaining = int(remaining)
+                # Never spend more tokens than the server says are left in its window
+                self.tokens = min(self.tokens, remaining)
+                if remaining <= 0 and reset_ms:
+                    pause_until = max(pause_until, reset_ms / 1000)
+                elif reset_ms and reset_ms / 1000 > now and status_code != 429:
+                    # Spread what is left of the server's window evenly up to its reset
+                    self._set_base_rate(remaining / (reset_ms / 1000 - now) * 60)
+            
+            if status_code == 429:
+                self.throttle_count += 1
+                self.rate_per_minute = max(APIConfig.MIN_REQUESTS_PER_MINUTE, self.rate_per_minute / 2)
+                if not pause_until:
+                    pause_until = now + 60 / self.rate_per_minute
+            elif status_code < 400 and self.rate_per_minute < self.base_rate:
+                # Additive recovery towards the configured rate
+                self.rate_per_minute = min(self.base_rate, self.rate_per_minute + self.base_rate / 10)
+            
+            if pause_until > self.paused_until:
+                self.paused_until = min(pause_until, now + APIConfig.RATE_LIMIT_MAX_WAIT)
+            self.condition.notify_all()
+    
+    def _set_base_rate(self, rate_per_minute: float):
+        # Caller holds the lock; lowering takes effect at once, raising goes through recovery
+        self.base_rate = max(APIConfig.MIN_REQUESTS_PER_MINUTE,
+                             min(APIConfig.MAX_REQUESTS_PER_MINUTE, rate_per_minute))
+        self.max_tokens = self.base_rate
+        self.rate_per_minute = min(self.rate_per_minute, self.base_rate)
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                "rate_per_minute": round(self.rate_per_minute, 1),
+                "tokens": round(self.tokens, 2),
+                "waiting": len(self.waiters),
+                "background_waiting": len(self.background_waiters),
+                "paused_for": round(max(0.0, self.paused_until - time.time()), 2),
+                "server_remaining": self.server_remaining,
+                "throttled": self.throttle_count
+            }
+
+class ServerErrorRetry(Retry):
+    """urllib3 retry policy that hands 429s back to the caller.
+
+    Retry also retries any 429 carrying Retry-After, whatever status_forcelist says.
+    """
+    RETRY_AFTER_STATUS_CODES = frozenset({413, 503})
+
+def _header_float(headers, name: str) -> Optional[float]:
+    try:
+        value = headers.get(name)
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+class AdaptiveBackoff:
+    """Shared back-off gate for bulk scans.
+
+    Every worker waits on the gate before issuing a request. A 429 (or exhausted retries)
+    doubles the pause for all workers, honouring Retry-After; successes relax it again.
+    """
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self.resume_at = 0.0
+        self.throttle_count = 0
+        self.lock = Lock()
+    
+    def wait(self):
+        """Block until the gate is open"""
+        with self.lock:
+            remaining = self.resume_at - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+    
+    def on_throttled(self, retry_after: Optional[float] = None):
+        with self.lock:
+            now = time.time()
+            self.throttle_count += 1
+            # Requests already in flight when the gate closed should not escalate it again
+            if now >= self.resume_at:
+                self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+            pause = max(self.delay, retry_after or 0)
+            self.resume_at = max(self.resume_at, now + pause)
+    
+    def on_success(self):
+        with self.lock:
+            if self.delay:
+                self.delay = self.delay / 2 if self.delay > self.base_delay else 0.0
+
+class CoalescedProgress:
+    """Rate-limit progress callbacks coming from many worker threads"""
+    def __init__(self, callback: Optional[Callable], interval: float = 0.25):
+        self.callback = callback
+        self.interval = interval
+        self.last_emit = 0.0
+        self.lock = Lock()
+    
+    def update(self, current: int, total: int, flag_key: str):
+        if not self.callback:
+            return
+        with self.lock:
+            now = time.time()
+            if current < total and current != 1 and now - self.last_emit < self.interval:
+                return
+            self.last_emit = now
+        self.callback(current, total, flag_key)
 
 class APICache:
-    """Thread-safe API response cache with TTL"""
-    def __init__(self):
-        self.cache: Dict[str, CacheEntry] = {}
+    """Thread-safe API response cache with TTL, LRU bounds and tag-based invalidation.
+
+    Entries are evicted least-recently-used first once either the entry count or the
+    approximate size (serialized JSON length) exceeds its bound. Expired entries are
+    dropped lazily on access and by an optional background sweeper.
+    """
+    def __init__(self, max_entries: int = APIConfig.CACHE_MAX_ENTRIES,
+                 max_bytes: int = APIConfig.CACHE_MAX_BYTES):
+        self.cache: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.tags: Dict[str, Set[Hashable]] = {}
         self.lock = Lock()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes_in_use = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._sweeper: Optional[Thread] = None
+        self._stop_sweeper = Event()
+    
+    @staticmethod
+    def estimate_size(data: Any) -> int:
+        """Approximate memory footprint as the length of the compact JSON encoding"""
+        try:
+            return len(json.dumps(data, separators=(",", ":"), default=str))
+        except (TypeError, ValueError):
+            return len(repr(data))
     
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: Hashable) -> Optional[Any]:
         with self.lock:
             entry = self.cache.get(key)
             if entry and not entry.is_expired:
+                self.cache.move_to_end(key)
                 return entry.data
             elif entry:
                 # Remove expired entry
-                del self.cache[key]
+                self._discard(key)
+                self.expirations += 1
             return None
     
-    def set(self, key: str, data: Any, ttl_seconds: int = 300):
+    def set(self, key: Hashable, data: Any, ttl_seconds: int = 300, tags: Iterable[str] = ()):
+        size = self.estimate_size(data)
         with self.lock:
+            self._discard(key)
             self.cache[key] = CacheEntry(
                 data=data,
                 timestamp=datetime.now(),
-                ttl_seconds=ttl_seconds
+                ttl_seconds=ttl_seconds,
+                tags=frozenset(tags),
+                size_bytes=size
             )
+            self.bytes_in_use += size
+            for tag in self.cache[key].tags:
+                self.tags.setdefault(tag, set()).add(key)
+            self._evict_over_limits()
+    
+    def replace(self, key: Hashable, data: Any) -> bool:
+        """Swap the data of a live entry, keeping its original expiry and tags"""
+        with self.lock:
+            entry = self.cache.get(key)
+            if not entry or entry.is_expired:
+                return False
+            size = self.estimate_size(data)
+            self.bytes_in_use += size - entry.size_bytes
+            entry.data = data
+            entry.size_bytes = size
+            self.cache.move_to_end(key)
+            self._evict_over_limits()
+            return True
+    
+    def entries_with_tag(self, tag: str) -> List[Tuple[Hashable, Any]]:
+        """Live (key, data) pairs carrying tag"""
+        with self.lock:
+            return [(key, self.cache[key].data) for key in self.tags.get(tag, ())
+                    if not self.cache[key].is_expired]
+    
+    def invalidate_tag(self, tag: str) -> int:
+        """Remove every entry carrying tag; returns how many were dropped"""
+        with self.lock:
+            keys = list(self.tags.get(tag, ()))
+            for key in keys:
+                self._discard(key)
+            return len(keys)
     
     def clear(self):
         with self.lock:
             self.cache.clear()
+            self.tags.clear()
+            self.bytes_in_use = 0
+    
+    def remove(self, key: Hashable):
+        with self.lock:
+            self._discard(key)
+    
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        with self.lock:
+            expired = [key for key, entry in self.cache.items() if entry.is_expired]
+            for key in expired:
+                self._discard(key)
+            self.expirations += len(expired)
+            return len(expired)
+    
+    def start_sweeper(self, interval: float = APIConfig.CACHE_SWEEP_INTERVAL):
+        """Start a daemon thread that purges expired entries every interval seconds"""
+        if self._sweeper and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+        
+        def sweep():
+            while not self._stop_sweeper.wait(interval):
+                self.purge_expired()
+        
+        self._sweeper = Thread(target=sweep, name="api-cache-sweeper", daemon=True)
+        self._sweeper.start()
+    
+    def stop_sweeper(self):
+        self._stop_sweeper.set()
+        if self._sweeper and self._sweeper.is_alive() and self._sweeper is not current_thread():
+            self._sweeper.join(timeout=1)
+        self._sweeper = None
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                "entries": len(self.cache),
+                "bytes_in_use": self.bytes_in_use,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+    
+    def _evict_over_limits(self):
+        # Caller holds the lock; oldest (least recently used) entries go first
+        while self.cache and (len(self.cache) > self.max_entries or self.bytes_in_use > self.max_bytes):
+            oldest = next(iter(self.cache))
+            self._discard(oldest)
+            self.evictions += 1
+    
+    def _discard(self, key: Hashable):
+        # Caller holds the lock
+        entry = self.cache.pop(key, None)
+        if not entry:
+            return
+        self.bytes_in_use -= entry.size_bytes
+        for tag in entry.tags:
+            keys = self.tags.get(tag)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[tag]
+
+@dataclass
+class ValidatorEntry:
+    """Conditional-request validators for a URL plus the body they validate"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content: bytes
+    headers: Dict[str, str]
+    encoding: Optional[str]
+
+class ConditionalRequestStore:
+    """Thread-safe, bounded (LRU) store of ETag/Last-Modified validators per URL.
+
+    Each entry keeps the full body it validates, so the store is bounded by both
+    entry count and approximate size (body plus headers), like APICache.
+    """
+    def __init__(self, max_entries: int = APIConfig.VALIDATOR_MAX_ENTRIES,
+                 max_bytes: int = APIConfig.VALIDATOR_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, ValidatorEntry]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.bytes_in_use = 0
+        self.evictions = 0
+        self.lock = Lock()
+    
+    @staticmethod
+    def estimate_size(entry: ValidatorEntry) -> int:
+        return len(entry.content or b"") + APICache.estimate_size(entry.headers)
+    
+    def get(self, url: str) -> Optional[ValidatorEntry]:
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry:
+                self.entries.move_to_end(url)
+            return entry
+    
+    def put(self, url: str, entry: ValidatorEntry):
+        size = self.estimate_size(entry)
+        with self.lock:
+            self._discard(url)
+            if size > self.max_bytes:
+                # Revalidating this body would evict everything else; just don't keep it
+                return
+            self.entries[url] = entry
+            self.sizes[url] = size
+            self.bytes_in_use += size
+            # Least recently used entries go first
+            while len(self.entries) > self.max_entries or self.bytes_in_use > self.max_bytes:
+                self._discard(next(iter(self.entries)))
+                self.evictions += 1
     
-    def remove(self, key: str):
+    def remove(self, url: str):
         with self.lock:
-            self.cache.pop(key, None)
+            self._discard(url)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.bytes_in_use = 0
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes_in_use": self.bytes_in_use,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions
+            }
+    
+    def _discard(self, url: str):
+        # Caller holds the lock
+        if self.entries.pop(url, None) is not None:
+            self.bytes_in_use -= self.sizes.pop(url, 0)
+
+def _freeze(value: Any) -> Hashable:
+    """Turn call arguments into a hashable, order-independent cache key part"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+def build_cache_key(name: str, signature: inspect.Signature, instance: Any,
+                    args: tuple, kwargs: Dict) -> Tuple[Tuple, Dict[str, Any]]:
+    """Cache key and bound arguments (defaults applied, ``self`` dropped) for a call"""
+    bound = signature.bind(instance, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    arguments.pop("self", None)
+    cache_key = (name,) + tuple((param, _freeze(value)) for param, value in arguments.items())
+    return cache_key, arguments
 
-def cached_request(ttl_seconds: int = 300):
-    """Decorator for caching API requests"""
+def cached_request(ttl_seconds: int = 300, tags: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None):
+    """Decorator for caching API requests.
+
+    Keys are ``(function name, (param, value), ...)`` tuples built from the bound
+    arguments with defaults applied, so ``get_flag("a")`` and ``get_flag(flag_key="a")``
+    share an entry. ``tags`` receives the bound arguments and returns the tags to attach
+    (e.g. ``flag:<key>``) for invalidation via ``APICache.invalidate_tag``.
+    """
     def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            # Create cache key from function name and arguments
-            cache_key = f"{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
+            cache_key, arguments = build_cache_key(func.__name__, signature, self, args, kwargs)
             
             # Try to get from cache first
             cached_result = self.cache.get(cache_key)
+            self.metrics.record_cache(cached_result is not None)
             if cached_result is not None:
                 return cached_result
             
             # Execute function and cache result
             result = func(self, *args, **kwargs)
             if result is not None:
-                self.cache.set(cache_key, result, ttl_seconds)
+                entry_tags = tags(arguments) if tags else ()
+                self.cache.set(cache_key, result, ttl_seconds, tags=entry_tags)
             
             return result
         return wrapper
     return decorator
 
-class LaunchDarklyClient:
+def cache_key_argument(cache_key: Hashable, name: str, default: Any = None) -> Any:
+    """Read a named argument back out of a cached_request key"""
+    if isinstance(cache_key, tuple):
+        for part in cache_key[1:]:
+            if isinstance(part, tuple) and len(part) == 2 and part[0] == name:
+                return part[1]
+    return default
+
+class LaunchDarklyClient(FlagDataMixin):
     """Centralized, high-performance LaunchDarkly API client"""
     
     def __init__(self, api_key: str = None, project_key: str = None):
@@ -123,14 +602,16 @@ class LaunchDarklyClient:
         # Initialize session with connection pooling and retries
         self.session = requests.Session()
         
-        # Configure retry strategy
-        retry_strategy = Retry(
+        # Configure retry strategy. 429s are left to the rate limiter (see _make_request):
+        # retried inside urllib3 they would never reach it to slow the client down.
+        retry_strategy = ServerErrorRetry(
             total=3,
             backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST", "PATCH", "PUT"]
         )
         
+        self.retry_strategy = retry_strategy
         adapter = HTTPAdapter(
             max_retries=retry_strategy,
             pool_connections=10,
@@ -149,210 +630,264 @@ class LaunchDarklyClient:
         
         # Initialize cache and rate limiter
         self.cache = APICache()
-        self.rate_limiter = RateLimiter(rate_per_minute=50)  # Conservative rate limit
+        self.cache.start_sweeper()
+        # ETag/Last-Modified validators survive clear_cache() so refreshes can revalidate cheaply
+        self.validators = ConditionalRequestStore()
+        # Separate budgets so bulk reads (scans, listings) never starve interactive writes
+        self.read_limiter = RateLimiter(rate_per_minute=APIConfig.READ_REQUESTS_PER_MINUTE, name="read")
+        self.write_limiter = RateLimiter(rate_per_minute=APIConfig.WRITE_REQUESTS_PER_MINUTE, name="write")
+        self.rate_limiter = self.read_limiter
         
         # Performance tracking
         self.stats = {
             "requests_made": 0,
-            "cache_hits": 0,
-            "cache_misses": 0,
-            "errors": 0
+            "errors": 0,
+            "pages_fetched": 0,
+            "conditional_requests": 0,
+            "not_modified": 0,
+            "bytes_revalidated": 0
         }
+        self._stats_lock = Lock()
+        # Per-page latency (ms) of recent flag list pages, and timings of the last full listing
+        self.page_latencies = deque(maxlen=200)
+        self.last_page_timings: List[Dict] = []
+        # Per-endpoint latency/bytes/retries, rate-limiter waits and cache hit ratio
+        self.metrics = ClientMetrics()
         
         # Logger
         self.logger = logging.getLogger(__name__)
-    
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[requests.Response]:
-        """Make rate-limited HTTP request with error handling"""
-        # Rate limiting
-        if not self.rate_limiter.acquire():
-            wait_time = self.rate_limiter.wait_time()
-            if wait_time > 0:
-                time.sleep(wait_time)
-                if not self.rate_limiter.acquire():
-                    raise Exception("Rate limit exceeded")
-        
-        self.stats["requests_made"] += 1
         
+        # Persistent snapshots for warm starts (optional; the client works without them)
         try:
-            url = f"{self.base_url}{endpoint}"
-            response = self.session.request(method, url, timeout=APIConfig.DEFAULT_TIMEOUT, **kwargs)
-            response.raise_for_status()
-            return response
-            
-        except requests.exceptions.RequestException as e:
-            self.stats["errors"] += 1
-            self.logger.error(f"API request failed: {method} {endpoint} - {str(e)}")
-            raise
+            self.snapshots = SnapshotStore(SNAPSHOT_FILE)
+        except Exception as e:
+            self.logger.warning(f"Flag snapshot store unavailable: {e}")
+            self.snapshots = None
     
-    @cached_request(ttl_seconds=300)  # 5-minute cache
-    def get_all_flags(self, include_archived: bool = True, limit: int = 100, sort_by: str = "modified") -> List[Dict]:
-        """Get all feature flags with caching, pagination, and smart sorting"""
-        all_flags = []
-        offset = 0
-        
-        while True:
-            # Get flags - API doesn't provide environment data reliably
-            endpoint = f"/flags/{self.project_key}?limit={limit}&offset={offset}&summary=0"
-            
-            response = self._make_request("GET", endpoint)
-            if not response:
-                break
-                
-            data = response.json()
-            flags = data.get("items", [])
+    def _limiter_for(self, method: str) -> RateLimiter:
+        return self.read_limiter if method.upper() in ("GET", "HEAD", "OPTIONS") else self.write_limiter
+    
+    def _acquire_rate_limit(self, method: str, blocking: bool = True, background: bool = False,
+                            cancelled: Optional[Callable[[], bool]] = None):
+        """Take a token from the read or write budget, waiting in turn unless non-blocking.
+
+        ``background`` requests (bulk scans) wait behind every interactive request, and a
+        caller whose ``cancelled`` check turns True stops waiting (RequestCancelled).
+        """
+        limiter = self._limiter_for(method)
+        if not blocking:
+            if not limiter.acquire():
+                raise RateLimitExceeded(f"{limiter.name} rate limit exhausted")
+            return
+        waited = limiter.acquire_blocking(timeout=APIConfig.RATE_LIMIT_MAX_WAIT, background=background,
+                                          cancelled=cancelled)
+        if waited is None:
+            raise RateLimitExceeded(f"Timed out waiting for the {limiter.name} rate limit")
+        if waited > 0.001:
+            self.metrics.record_rate_limit_wait(waited)
+    
+    def _make_request(self, method: str, endpoint: str, blocking: bool = True, background: bool = False,
+                      cancelled: Optional[Callable[[], bool]] = None, **kwargs) -> Optional[requests.Response]:
+        """Make rate-limited HTTP request with error handling.
+
+        By default the call waits its turn for a rate-limit token; with ``blocking=False``
+        it raises RateLimitExceeded instead of waiting, and ``background`` requests (bulk
+        scans) wait behind every interactive one. ``cancelled`` is checked before every
+        attempt and while queued; once it returns True the request is abandoned with
+        RequestCancelled without taking a token. A request already on the wire cannot
+        be aborted. A 429 has already paused and slowed the limiter by the time it gets
+        here, so the request queues for a fresh token and is sent again, up to
+        APIConfig.MAX_RETRIES times.
+        """
+        url = f"{self.base_url}{endpoint}"
+        for attempt in range(APIConfig.MAX_RETRIES + 1):
+            if cancelled and cancelled():
+                raise RequestCancelled(f"{method} {endpoint} cancelled")
+            self._acquire_rate_limit(method, blocking, background, cancelled)
             
-            all_flags.extend(flags)
+            with self._stats_lock:
+                self.stats["requests_made"] += 1
             
-            # Check if we have more pages
-            if len(flags) < limit:
-                break
-            offset += limit
-        
-        # Enrich flags with additional metadata
-        for flag in all_flags:
-            self._enrich_flag_data(flag)
-        
-        # Smart sorting based on user preference
-        return self._sort_flags(all_flags, sort_by)
-    
-    def _sort_flags(self, flags: List[Dict], sort_by: str) -> List[Dict]:
-        """Sort flags based on specified criteria"""
-        try:
-            if sort_by == "modified":
-                # Sort by last modified date (newest first)
-                return sorted(flags, key=lambda x: x.get("lastModifiedDateTime", datetime.min), reverse=True)
-            elif sort_by == "created":
-                # Sort by creation date (newest first)
-                return sorted(flags, key=lambda x: x.get("creationDateTime", datetime.min), reverse=True)
-            elif sort_by == "name":
-                # Sort alphabetically by name
-                return sorted(flags, key=lambda x: x.get("name", "").lower())
-            elif sort_by == "key":
-                # Sort alphabetically by key
-                return sorted(flags, key=lambda x: x.get("key", "").lower())
-            elif sort_by == "health":
-                # Sort by health score (highest first)
-                return sorted(flags, key=lambda x: x.get("healthScore", 0), reverse=True)
-            elif sort_by == "status":
-                # Sort by status (Active first, then Archived)
-                return sorted(flags, key=lambda x: (x.get("status", "") != "Active", x.get("name", "").lower()))
-            else:
-                # Default to modified date
-                return sorted(flags, key=lambda x: x.get("lastModifiedDateTime", datetime.min), reverse=True)
-        except Exception as e:
-            self.logger.warning(f"Failed to sort flags by {sort_by}: {str(e)}")
-            return flags
+            try:
+                response = self._conditional_send(method, url, **kwargs)
+                if response.status_code == 429 and attempt < APIConfig.MAX_RETRIES:
+                    self.logger.warning(f"Rate limited: {method} {endpoint} (attempt {attempt + 1}), "
+                                        f"waiting for the {self._limiter_for(method).name} limiter")
+                    continue
+                response.raise_for_status()
+                return response
+                
+            except requests.exceptions.RequestException as e:
+                with self._stats_lock:
+                    self.stats["errors"] += 1
+                self.logger.error(f"API request failed: {method} {endpoint} - {str(e)}")
+                raise
     
-    def _enrich_flag_data(self, flag: Dict):
-        """Enrich flag data with computed fields"""
-        # Set flag status based on archived field
-        flag["status"] = "Archived" if flag.get("archived", False) else "Active"
-        
-        # Calculate creation date
-        creation_date = flag.get("creationDate")
-        if creation_date:
-            flag["creationDateTime"] = datetime.fromtimestamp(creation_date / 1000)
-        
-        # Find most recent modification across environments
-        environments = flag.get("environments", {})
-        latest_modified = 0
+    def _conditional_send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, revalidating GETs with stored ETag/Last-Modified validators.
+
+        A 304 Not Modified is turned into a 200 response carrying the stored body, so
+        callers see the same Response either way.
+        """
+        kwargs.setdefault("timeout", APIConfig.DEFAULT_TIMEOUT)
+        if method.upper() != "GET":
+            return self._send(method, url, **kwargs)
         
-        # Environment data processing (reduced logging since we know API doesn't provide this data)
-        flag_key = flag.get("key", "unknown")
+        # Key validators by the full URL including query parameters
+        prepared = requests.models.PreparedRequest()
+        prepared.prepare_url(url, kwargs.get("params"))
+        validator_key = prepared.url
         
-        for env_key, env_data in environments.items():
-            last_modified = env_data.get("lastModified", 0)
-            if last_modified > latest_modified:
-                latest_modified = last_modified
+        validator = self.validators.get(validator_key)
+        if validator:
+            headers = dict(kwargs.pop("headers", None) or {})
+            if validator.etag:
+                headers["If-None-Match"] = validator.etag
+            if validator.last_modified:
+                headers["If-Modified-Since"] = validator.last_modified
+            kwargs["headers"] = headers
+            with self._stats_lock:
+                self.stats["conditional_requests"] += 1
         
-        # Fallback to creation date if no environment modifications
-        if latest_modified:
-            flag["lastModifiedDateTime"] = datetime.fromtimestamp(latest_modified / 1000)
-        elif creation_date:
-            flag["lastModifiedDateTime"] = flag["creationDateTime"]
+        response = self._send(method, url, **kwargs)
         
-        # Calculate flag health score
-        flag["healthScore"] = self._calculate_health_score(flag)
+        if response.status_code == 304 and validator:
+            with self._stats_lock:
+                self.stats["not_modified"] += 1
+                self.stats["bytes_revalidated"] += len(validator.content)
+            return self._response_from_validator(response, validator)
         
-        # Detect orphaned flags
-        flag["isOrphaned"] = self._is_orphaned_flag(flag)
+        if response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.validators.put(validator_key, ValidatorEntry(
+                    etag=etag,
+                    last_modified=last_modified,
+                    content=response.content,
+                    headers=dict(response.headers),
+                    encoding=response.encoding
+                ))
         
-        # Calculate environment status
-        flag["environmentStatus"] = self._get_environment_status(flag)
+        return response
     
-    def _calculate_health_score(self, flag: Dict) -> int:
-        """Calculate flag health score (0-100)"""
-        score = 100
-        
-        # Deduct points for missing description
-        if not flag.get("description", "").strip():
-            score -= 20
-        
-        # Deduct points for no tags
-        if not flag.get("tags", []):
-            score -= 10
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send one request on the pooled session and record it in the client metrics"""
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.metrics.record_request(method, url, (time.perf_counter() - started) * 1000,
+                                        retries=self._retries_before_failure(e), error=True)
+            raise
         
-        # Check if flag has rules/targeting
-        environments = flag.get("environments", {})
-        has_rules = False
+        self._limiter_for(method).update_from_headers(response.headers, response.status_code)
         
-        for env_data in environments.values():
-            if env_data.get("rules", []) or env_data.get("targets", []):
-                has_rules = True
-                break
+        # urllib3 keeps the Retry object used for this call; its history lists each retry
+        retries = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+        self.metrics.record_request(
+            method, url, (time.perf_counter() - started) * 1000,
+            status=response.status_code,
+            bytes_received=len(response.content or b""),
+            retries=len(retries),
+            error=response.status_code >= 400
+        )
+        return response
+    
+    def _retries_before_failure(self, error: requests.exceptions.RequestException) -> int:
+        """Retries spent on a request that raised; urllib3 only raises MaxRetryError once the budget is used up"""
+        reason = error.args[0] if error.args else None
+        if isinstance(reason, MaxRetryError):
+            return self.retry_strategy.total or 0
+        return 0
+    
+    @staticmethod
+    def _response_from_validator(not_modified: requests.Response, validator: ValidatorEntry) -> requests.Response:
+        """Build a 200 response from the body stored alongside the validators"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK (revalidated)"
+        response._content = validator.content
+        response.headers = CaseInsensitiveDict(validator.headers)
+        response.encoding = validator.encoding
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        return response
+    
+    @cached_request(ttl_seconds=300, tags=lambda args: ["flags"])  # 5-minute cache
+    def get_all_flags(self, include_archived: bool = True, limit: int = 100, sort_by: str = "modified",
+                      concurrent: bool = True) -> List[Dict]:
+        """Get all feature flags with caching, pagination, and smart sorting.
+
+        With ``concurrent`` enabled the first page supplies ``totalCount`` and the remaining
+        offsets are fetched on a bounded worker pool (still going through the rate limiter).
+        Pages are merged in offset order, so the result matches a sequential walk.
+        """
+        timings: List[Dict] = []
+        first_page = self._fetch_flags_page(limit, 0, timings)
+        flags = first_page.get("items", [])
+        all_flags = list(flags)
+        offset = limit
+
+        total_count = first_page.get("totalCount")
+        if concurrent and isinstance(total_count, int) and len(flags) >= limit and total_count > limit:
+            offsets = list(range(limit, total_count, limit))
+            workers = max(1, min(APIConfig.MAX_PAGE_WORKERS, len(offsets)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ld-pages") as pool:
+                # map() yields results in submission order, keeping pages in offset order
+                pages = list(pool.map(lambda off: self._fetch_flags_page(limit, off, timings), offsets))
+            for page in pages:
+                flags = page.get("items", [])
+                all_flags.extend(flags)
+            offset = offsets[-1] + limit
+
+        # Sequential walk (also picks up flags created after totalCount was read)
+        while len(flags) >= limit:
+            page = self._fetch_flags_page(limit, offset, timings)
+            flags = page.get("items", [])
+            all_flags.extend(flags)
+            offset += limit
+
+        self.last_page_timings = sorted(timings, key=lambda t: t["offset"])
         
-        if not has_rules:
-            score -= 30
+        # Persist the raw listing (before enrichment adds datetime fields)
+        self._save_snapshot(SnapshotStore.make_key(self.project_key, "flags"), all_flags)
         
-        # Check if flag is temporary but old
-        if flag.get("temporary", False):
-            creation_date = flag.get("creationDateTime")
-            if creation_date and (datetime.now() - creation_date).days > 30:
-                score -= 20
+        # Enrich flags with additional metadata
+        for flag in all_flags:
+            self._enrich_flag_data(flag)
         
-        return max(0, score)
+        # Smart sorting based on user preference
+        return self._sort_flags(all_flags, sort_by)
     
-    def _is_orphaned_flag(self, flag: Dict) -> bool:
-        """Check if flag is orphaned (no rules, no targeting, not actively serving traffic)"""
-        environments = flag.get("environments", {})
+    def _fetch_flags_page(self, limit: int, offset: int, timings: Optional[List[Dict]] = None) -> Dict:
+        """Fetch one page of the flag listing and record its latency"""
+        # Get flags - API doesn't provide environment data reliably
+        endpoint = f"/flags/{self.project_key}?limit={limit}&offset={offset}&summary=0"
         
-        # If no environment data available, assume flag is NOT orphaned (conservative approach)
-        # Individual orphaned detection will be done on-demand when user selects orphaned filter
-        if not environments:
-            return False
+        started = time.perf_counter()
+        response = self._make_request("GET", endpoint)
+        data = response.json() if response else {}
+        elapsed_ms = (time.perf_counter() - started) * 1000
         
-        for env_data in environments.values():
-            # Check for rules
-            if env_data.get("rules", []):
-                return False
-            
-            # Check for individual targeting
-            if env_data.get("targets", []):
-                return False
-            
-            # Check for context targets
-            if env_data.get("contextTargets", []):
-                return False
-            
-            # Check if flag is actively serving traffic (enabled with fallthrough)
-            if env_data.get("on", False) and env_data.get("fallthrough"):
-                return False
-            
-            # Check if flag is enabled at all
-            if env_data.get("on", False):
-                return False
+        with self._stats_lock:
+            self.stats["pages_fetched"] += 1
+            self.page_latencies.append(elapsed_ms)
+            if timings is not None:
+                timings.append({"offset": offset, "latency_ms": round(elapsed_ms, 1)})
         
-        # Only mark as orphaned if we have environment data and confirmed no usage
-        return True
+        return data or {}
     
-    def export_orphaned_flags_bg(self, progress_callback=None, completion_callback=None):
+    def export_orphaned_flags_bg(self, progress_callback=None, completion_callback=None, max_workers: int = None):
         """
         Export orphaned flags to CSV in background with progress callbacks.
         
         Args:
-            progress_callback: Function called with (current, total, flag_key) for progress updates
+            progress_callback: Function called with (current, total, flag_key) for progress updates.
+                Calls are coalesced to at most one per APIConfig.SCAN_PROGRESS_INTERVAL.
             completion_callback: Function called with (orphaned_flags, csv_filename) when complete
+            max_workers: Concurrent flag fetches (defaults to APIConfig.SCAN_WORKERS)
         """
         self.logger.info("ORPHANED EXPORT: Starting background orphaned flags detection...")
         
@@ -361,31 +896,41 @@ class LaunchDarklyClient:
             bulk_flags = self.get_all_flags()
             flag_keys = [flag.get("key") for flag in bulk_flags if flag.get("key")]
             
-            orphaned_flags = []
             total_flags = len(flag_keys)
+            workers = max(1, int(max_workers or APIConfig.SCAN_WORKERS))
             
-            self.logger.info(f"ORPHANED EXPORT: Processing {total_flags} flags...")
+            self.logger.info(f"ORPHANED EXPORT: Processing {total_flags} flags with {workers} workers...")
             
-            for i, flag_key in enumerate(flag_keys):
-                try:
-                    # Progress callback every flag (UI can choose to display every N)
-                    if progress_callback:
-                        progress_callback(i + 1, total_flags, flag_key)
-                    
-                    # Fetch individual flag with full environment data
-                    individual_flag = self._get_individual_flag(flag_key)
-                    
-                    if individual_flag and individual_flag.get("environments"):
-                        # Use the accurate orphaned detection with environment data
-                        if self._is_orphaned_flag_with_env_data(individual_flag):
-                            # Enrich flag data for export
-                            enriched_flag = self._enrich_flag_for_export(individual_flag)
-                            orphaned_flags.append(enriched_flag)
-                            self.logger.warning(f"ORPHANED EXPORT: Found orphaned flag: {flag_key}")
-                    
-                except Exception as e:
-                    self.logger.error(f"ORPHANED EXPORT: Error checking {flag_key}: {e}")
-                    continue
+            backoff = AdaptiveBackoff()
+            progress = CoalescedProgress(progress_callback, APIConfig.SCAN_PROGRESS_INTERVAL)
+            # Results are stored by position so the CSV keeps the bulk listing order
+            results: List[Optional[Dict]] = [None] * total_flags
+            
+            def check_flag(index: int, flag_key: str):
+                # Fetch individual flag with full environment data
+                individual_flag = self._get_individual_flag(flag_key, backoff=backoff)
+                
+                if individual_flag and individual_flag.get("environments"):
+                    # Use the accurate orphaned detection with environment data
+                    if self._is_orphaned_flag_with_env_data(individual_flag):
+                        # Enrich flag data for export
+                        results[index] = self._enrich_flag_for_export(individual_flag)
+                        self.logger.warning(f"ORPHANED EXPORT: Found orphaned flag: {flag_key}")
+            
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ld-scan") as pool:
+                futures = {pool.submit(check_flag, i, key): key for i, key in enumerate(flag_keys)}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    flag_key = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.logger.error(f"ORPHANED EXPORT: Error checking {flag_key}: {e}")
+                    progress.update(done, total_flags, flag_key)
+            
+            orphaned_flags = [flag for flag in results if flag is not None]
+            
+            if backoff.throttle_count:
+                self.logger.info(f"ORPHANED EXPORT: Backed off {backoff.throttle_count} times on rate limiting")
             
             # Generate CSV export
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -408,152 +953,53 @@ class LaunchDarklyClient:
                 completion_callback(None, None, str(e))
             return None, None
     
-    def _enrich_flag_for_export(self, flag: Dict) -> Dict:
-        """Enrich flag data with export-friendly information"""
-        enriched = flag.copy()
-        environments = flag.get("environments", {})
-        
-        # Add environment summary
-        env_summary = []
-        for env_name, env_data in environments.items():
-            enabled = "✅" if env_data.get("on", False) else "❌"
-            env_summary.append(f"{env_data.get('_environmentName', env_name)}: {enabled}")
-        
-        enriched["environment_summary"] = " | ".join(env_summary)
-        enriched["total_environments"] = len(environments)
-        enriched["enabled_environments"] = len([e for e in environments.values() if e.get("on", False)])
-        
-        return enriched
-    
-    def _write_orphaned_csv(self, orphaned_flags: List[Dict], filename: str):
-        """Write orphaned flags to CSV file"""
-        if not orphaned_flags:
-            # Create empty file with headers
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["No orphaned flags found", "All flags are actively used!"])
-            return
-        
-        headers = [
-            "Flag Key",
-            "Flag Name", 
-            "Description",
-            "Tags",
-            "Status",
-            "Environment Summary",
-            "Total Environments",
-            "Enabled Environments",
-            "Creation Date",
-            "Last Modified",
-            "Reason Orphaned"
-        ]
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(headers)
-            
-            for flag in orphaned_flags:
-                # Format dates
-                created = flag.get("creationDate", 0)
-                created_str = datetime.fromtimestamp(created/1000).strftime("%Y-%m-%d %H:%M") if created else "Unknown"
-                
-                modified = flag.get("lastModified", 0)
-                modified_str = datetime.fromtimestamp(modified/1000).strftime("%Y-%m-%d %H:%M") if modified else "Unknown"
-                
-                # Determine why it's orphaned
-                environments = flag.get("environments", {})
-                reason_parts = []
-                if not any(env.get("on", False) for env in environments.values()):
-                    reason_parts.append("Disabled in all environments")
-                if not any(env.get("rules", []) for env in environments.values()):
-                    reason_parts.append("No targeting rules")
-                if not any(env.get("targets", []) for env in environments.values()):
-                    reason_parts.append("No individual targets")
-                
-                reason = " + ".join(reason_parts) if reason_parts else "Unknown"
-                
-                row = [
-                    flag.get("key", ""),
-                    flag.get("name", ""),
-                    flag.get("description", ""),
-                    " | ".join(flag.get("tags", [])),
-                    "Archived" if flag.get("archived", False) else "Active",
-                    flag.get("environment_summary", ""),
-                    flag.get("total_environments", 0),
-                    flag.get("enabled_environments", 0),
-                    created_str,
-                    modified_str,
-                    reason
-                ]
-                writer.writerow(row)
-    
-    def _is_orphaned_flag_with_env_data(self, flag: Dict) -> bool:
-        """Check if flag is orphaned using full environment data from individual API call"""
-        environments = flag.get("environments", {})
-        
-        if not environments:
-            return False
+    def _get_individual_flag(self, flag_key: str, backoff: Optional[AdaptiveBackoff] = None) -> Dict:
+        """Fetch individual flag with full environment data.
+
+        When a back-off gate is given, throttled requests (429 or exhausted retries) widen the
+        shared pause and are retried up to APIConfig.SCAN_MAX_ATTEMPTS times.
+        """
+        endpoint = f"/flags/{self.project_key}/{flag_key}"
+        attempts = APIConfig.SCAN_MAX_ATTEMPTS if backoff else 1
         
-        for env_data in environments.values():
-            # Check for rules
-            if env_data.get("rules", []):
-                return False
-            
-            # Check for individual targeting
-            if env_data.get("targets", []):
-                return False
-            
-            # Check for context targets
-            if env_data.get("contextTargets", []):
-                return False
-            
-            # Check if flag is actively serving traffic (enabled with fallthrough)
-            if env_data.get("on", False) and env_data.get("fallthrough"):
-                return False
+        for attempt in range(attempts):
+            if backoff:
+                backoff.wait()
+            try:
+                # Scans yield to interactive reads instead of queueing ahead of them
+                response = self._make_request("GET", endpoint, background=True)
+            except requests.exceptions.RetryError:
+                # urllib3 gave up after repeated 5xx responses
+                if backoff:
+                    backoff.on_throttled()
+                    continue
+                return {}
+            except requests.exceptions.HTTPError as e:
+                # _make_request already retried 429s through the limiter; widen the shared pause too
+                if backoff and e.response is not None and e.response.status_code == 429:
+                    backoff.on_throttled(self._retry_after_seconds(e.response))
+                    continue
+                return {}
+            except Exception as e:
+                self.logger.error(f"Individual flag fetch error for {flag_key}: {e}")
+                return {}
             
-            # Check if flag is enabled at all
-            if env_data.get("on", False):
-                return False
+            if backoff:
+                backoff.on_success()
+            return response.json()
         
-        # Only mark as orphaned if we have environment data and confirmed no usage
-        return True
+        self.logger.warning(f"Individual flag fetch gave up for {flag_key} after {attempts} throttled attempts")
+        return {}
     
-    def _get_individual_flag(self, flag_key: str) -> Dict:
-        """Fetch individual flag with full environment data"""
+    @staticmethod
+    def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+        """Parse a numeric Retry-After header"""
         try:
-            url = f"{self.base_url}/flags/{self.project_key}/{flag_key}"
-            response = self.session.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result
-            else:
-                self.logger.warning(f"Individual flag fetch failed for {flag_key}: {response.status_code}")
-                return {}
-        except Exception as e:
-            self.logger.error(f"Individual flag fetch error for {flag_key}: {e}")
-            return {}
-    
-    def _get_environment_status(self, flag: Dict) -> Dict[str, Dict]:
-        """Get status for each environment"""
-        environments = flag.get("environments", {})
-        status = {}
-        
-        for env_key, env_data in environments.items():
-            # Determine environment display name
-            env_name = env_data.get("_environmentName", env_key.upper())
-            
-            status[env_name] = {
-                "enabled": env_data.get("on", False),
-                "archived": env_data.get("archived", False),
-                "has_rules": bool(env_data.get("rules", [])),
-                "has_targeting": bool(env_data.get("targets", []) or env_data.get("contextTargets", [])),
-                "last_modified": env_data.get("lastModified", 0)
-            }
-        
-        return status
+            return float(response.headers.get("Retry-After", ""))
+        except (TypeError, ValueError):
+            return None
     
-    @cached_request(ttl_seconds=60)  # 1-minute cache for single flag
+    @cached_request(ttl_seconds=60, tags=lambda args: [f"flag:{args['flag_key']}"])  # 1-minute cache for single flag
     def get_flag(self, flag_key: str) -> Optional[Dict]:
         """Get a specific flag"""
         endpoint = f"/flags/{self.project_key}/{flag_key}"
@@ -561,11 +1007,103 @@ class LaunchDarklyClient:
         
         if response:
             flag = response.json()
+            self._save_snapshot(SnapshotStore.make_key(self.project_key, "flag", flag_key), flag)
             self._enrich_flag_data(flag)
             return flag
         
         return None
     
+    @cached_request(ttl_seconds=APIConfig.SEGMENT_CACHE_TTL,
+                    tags=lambda args: ["segments", f"segments:{args['env_key']}"])
+    def get_segments(self, env_key: str) -> Dict[str, Dict]:
+        """All segments of an environment keyed by segment key.
+
+        Fetched in bulk (a few paged requests per environment) so local evaluation of
+        segmentMatch clauses never needs a request per segment or per context. Pages
+        are revalidated with ETags once the cached listing expires.
+        """
+        segments: Dict[str, Dict] = {}
+        limit = APIConfig.SEGMENT_PAGE_SIZE
+        offset = 0
+        while True:
+            endpoint = f"/segments/{self.project_key}/{env_key}?limit={limit}&offset={offset}"
+            response = self._make_request("GET", endpoint)
+            data = response.json() if response else {}
+            items = data.get("items", []) or []
+            for segment in items:
+                if segment.get("key"):
+                    segments[segment["key"]] = segment
+            total_count = data.get("totalCount")
+            offset += limit
+            if len(items) < limit or (isinstance(total_count, int) and offset >= total_count):
+                break
+        
+        self.logger.debug(f"Fetched {len(segments)} segments for {env_key}")
+        return segments
+    
+    def get_segment(self, env_key: str, segment_key: str) -> Optional[Dict]:
+        """One segment, served from the cached bulk listing of its environment"""
+        return self.get_segments(env_key).get(segment_key)
+    
+    def get_flag_raw(self, flag_key: str, cancelled: Optional[Callable[[], bool]] = None) -> Optional[Dict]:
+        """Get a flag exactly as LaunchDarkly returns it (no enrichment, no TTL cache).
+    
+        Still goes through the pooled session, rate limiter and ETag revalidation, so
+        re-checking an unchanged flag costs a 304. See _make_request for ``cancelled``.
+        """
+        endpoint = f"/flags/{self.project_key}/{flag_key}"
+        response = self._make_request("GET", endpoint, cancelled=cancelled)
+        return response.json() if response else None
+    
+    def _save_snapshot(self, key: str, payload: Any):
+        """Best-effort write of a raw payload to the snapshot store"""
+        if not self.snapshots:
+            return
+        try:
+            self.snapshots.put(key, payload)
+        except Exception as e:
+            self.logger.debug(f"Snapshot write failed for {key}: {e}")
+    
+    def load_flags_snapshot(self, sort_by: str = "modified") -> Optional[Dict]:
+        """Load the last persisted flag listing for a warm start.
+
+        Returns {"flags", "saved_at", "is_expired"} or None when no snapshot exists.
+        The flags are enriched and sorted exactly like get_all_flags results.
+        """
+        if not self.snapshots:
+            return None
+        try:
+            entry = self.snapshots.get(SnapshotStore.make_key(self.project_key, "flags"))
+        except Exception as e:
+            self.logger.debug(f"Snapshot read failed: {e}")
+            return None
+        if not entry or not isinstance(entry.payload, list):
+            return None
+        
+        flags = entry.payload
+        for flag in flags:
+            self._enrich_flag_data(flag)
+        return {
+            "flags": self._sort_flags(flags, sort_by),
+            "saved_at": datetime.fromtimestamp(entry.saved_at),
+            "is_expired": entry.is_expired
+        }
+    
+    def load_flag_snapshot(self, flag_key: str) -> Optional[Dict]:
+        """Load the last persisted body of a single flag (enriched), if any"""
+        if not self.snapshots:
+            return None
+        try:
+            entry = self.snapshots.get(SnapshotStore.make_key(self.project_key, "flag", flag_key))
+        except Exception as e:
+            self.logger.debug(f"Snapshot read failed for {flag_key}: {e}")
+            return None
+        if not entry or not isinstance(entry.payload, dict):
+            return None
+        flag = entry.payload
+        self._enrich_flag_data(flag)
+        return flag
+    
     def test_orphaned_detection(self, flag_keys: list = None) -> Dict:
         """Test orphaned flag detection with individual flag calls"""
         if not flag_keys:
@@ -623,8 +1161,13 @@ class LaunchDarklyClient:
         self.logger.info(f"SUMMARY: {results['orphaned_count']}/{len(flag_keys)} flags are orphaned")
         return results
     
-    def update_flag(self, flag_key: str, environment: str, operations: List[Dict], comment: str = None) -> bool:
-        """Update flag using semantic patch with user attribution"""
+    def update_flag(self, flag_key: str, environment: str, operations: List[Dict], comment: str = None,
+                    raise_errors: bool = False) -> bool:
+        """Update flag using semantic patch with user attribution.
+
+        Failures are logged and reported as False; with ``raise_errors=True`` the
+        underlying exception is re-raised so batch callers can report it per item.
+        """
         from shared.user_session import get_api_comment
         
         endpoint = f"/flags/{self.project_key}/{flag_key}"
@@ -639,15 +1182,51 @@ class LaunchDarklyClient:
             "instructions": operations
         }
         
+        # Instructions are only understood with the semantic patch content type
+        headers = {"Content-Type": "application/json; domain-model=launchdarkly.semanticpatch"}
+        
         try:
-            response = self._make_request("PATCH", endpoint, json=payload)
+            response = self._make_request("PATCH", endpoint, json=payload, headers=headers)
             if response:
-                # Invalidate cache for this flag
-                self.cache.remove(f"get_flag:{hash(flag_key)}")
-                self.cache.remove(f"get_all_flags:{hash('')}")  # Invalidate all flags cache
+                self._apply_flag_write(flag_key, response)
                 return True
         except Exception as e:
             self.logger.error(f"Failed to update flag {flag_key}: {str(e)}")
+            if raise_errors:
+                raise
+        
+        return False
+    
+    def patch_flag(self, flag_key: str, operations: List[Dict], comment: str = None) -> bool:
+        """Update flag using JSON Patch operations with user attribution.
+
+        Raises PatchConflict when the operations include test ops and LaunchDarkly
+        rejects them (the flag changed since it was read), and PatchRejected when
+        such a guarded patch is refused for any other reason.
+        """
+        from shared.user_session import get_api_comment
+        
+        endpoint = f"/flags/{self.project_key}/{flag_key}"
+        payload = {
+            "comment": comment or get_api_comment(f"Flag configuration update for {flag_key}"),
+            "patch": operations
+        }
+        
+        try:
+            response = self._make_request("PATCH", endpoint, json=payload)
+            if response:
+                self._apply_flag_write(flag_key, response)
+                return True
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            body = e.response.text if e.response is not None else ""
+            if is_patch_conflict(status_code, operations, body):
+                raise PatchConflict(f"{flag_key} changed since it was read ({status_code})") from e
+            if is_guarded_patch(operations) and status_code in (400, 422):
+                raise PatchRejected(patch_error_message(e.response)) from e
+            self.logger.error(f"Failed to patch flag {flag_key}: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"Failed to patch flag {flag_key}: {str(e)}")
         
         return False
     
@@ -658,73 +1237,163 @@ class LaunchDarklyClient:
         try:
             response = self._make_request("POST", endpoint, json=flag_data)
             if response:
-                # Invalidate all flags cache
-                self.cache.remove(f"get_all_flags:{hash('')}")
+                self._apply_flag_write(flag_data.get("key"), response)
                 return True
         except Exception as e:
             self.logger.error(f"Failed to create flag: {str(e)}")
         
         return False
     
-    def get_flag_statistics(self) -> Dict:
-        """Get flag usage statistics"""
-        flags = self.get_all_flags()
-        
-        stats = {
-            "total_flags": len(flags),
-            "active_flags": len([f for f in flags if f.get("status") == "Active"]),
-            "archived_flags": len([f for f in flags if f.get("status") == "Archived"]),
-            "orphaned_flags": len([f for f in flags if f.get("isOrphaned", False)]),
-            "flags_with_rules": len([f for f in flags if not f.get("isOrphaned", False)]),
-            "temporary_flags": len([f for f in flags if f.get("temporary", False)]),
-            "health_score_avg": sum(f.get("healthScore", 0) for f in flags) / len(flags) if flags else 0,
-            "recently_modified": len([f for f in flags if self._is_recently_modified(f)]),
-            "environment_distribution": self._get_environment_distribution(flags)
-        }
-        
-        return stats
+    def _apply_flag_write(self, flag_key: Optional[str], response: requests.Response):
+        """Update cached entries from the flag body returned by a successful write"""
+        try:
+            flag = response.json()
+        except ValueError:
+            flag = None
+        self._apply_written_flag(flag_key, flag)
     
-    def _is_recently_modified(self, flag: Dict, days: int = 7) -> bool:
-        """Check if flag was modified recently"""
-        last_modified = flag.get("lastModifiedDateTime")
-        if last_modified:
-            return (datetime.now() - last_modified).days <= days
-        return False
+    def get_sync_cursor(self) -> Dict:
+        """Starting position for sync_flag_changes, in LaunchDarkly's time rather than the local clock.
+
+        Take it before loading the listing. Returns {"cursor", "seen"}: the newest flag
+        audit entry's date (the response Date header when there are none) and the ids of
+        entries the first sync's overlap window would otherwise report again.
+        """
+        spec = f"proj/{self.project_key}:env/*:flag/*"
+        response = self._make_request("GET", "/auditlog", params=self._audit_log_params(limit=20, spec=spec))
+        items = (response.json() or {}).get("items", []) if response else []
+        fetched: Dict[str, int] = {}
+        self._unseen_audit_entries(items if isinstance(items, list) else [], set(), fetched)
+        return self._sync_position(fetched, date_header=response.headers.get("Date") if response else None)
     
-    def _get_environment_distribution(self, flags: List[Dict]) -> Dict:
-        """Get distribution of flags across environments"""
-        env_counts = {}
+    def sync_flag_changes(self, flags: List[Dict], since_ms: int, sort_by: str = "modified",
+                          seen: Iterable[str] = ()) -> Dict:
+        """Incrementally bring a flag listing up to date using the audit log.
+
+        ``since_ms`` is a server-side cursor (epoch milliseconds, see get_sync_cursor) and
+        ``seen`` the entry ids the previous sync returned. The audit log is queried from
+        DELTA_SYNC_OVERLAP_MS before the cursor, so entries indexed late are still picked
+        up, and entries already in ``seen`` are skipped. Only the flags the new entries
+        reference are refetched, so the cost is O(changed flags) instead of a full
+        listing. Flags that now return 404 are dropped.
+
+        Returns {"flags", "changed", "removed", "cursor", "seen", "full_refresh"}; when the
+        audit log holds more changes than DELTA_SYNC_MAX_PAGES pages, ``full_refresh`` is
+        True and the caller should fall back to get_all_flags.
+        """
+        result = {"flags": flags, "changed": [], "removed": [], "cursor": since_ms, "seen": list(seen),
+                  "full_refresh": False}
+        spec = f"proj/{self.project_key}:env/*:flag/*"
         
-        for flag in flags:
-            env_status = flag.get("environmentStatus", {})
-            for env_name, status in env_status.items():
-                if env_name not in env_counts:
-                    env_counts[env_name] = {"total": 0, "enabled": 0, "disabled": 0}
-                
-                env_counts[env_name]["total"] += 1
-                if status["enabled"]:
-                    env_counts[env_name]["enabled"] += 1
+        changed_keys: List[str] = []
+        fetched: Dict[str, int] = {}
+        seen = set(seen)
+        after = self._sync_after(since_ms)
+        before = None
+        for _ in range(APIConfig.DELTA_SYNC_MAX_PAGES):
+            entries = self.get_audit_log_entries(limit=20, after=str(after), before=before, spec=spec)
+            for entry in self._unseen_audit_entries(entries, seen, fetched):
+                for flag_key in self._flag_keys_from_audit_entry(entry):
+                    if flag_key not in changed_keys:
+                        changed_keys.append(flag_key)
+            if len(entries) < 20:
+                break
+            # Entries come newest first; page further back from the oldest one seen
+            before = str(min(e.get("date") or 0 for e in entries))
+        else:
+            result["full_refresh"] = True
+            return result
+        
+        result.update(self._sync_position(fetched, since_ms))
+        if not changed_keys:
+            return result
+        
+        updated: List[Dict] = []
+        removed: List[str] = []
+        workers = max(1, min(APIConfig.SCAN_WORKERS, len(changed_keys)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ld-sync") as pool:
+            for flag_key, flag in zip(changed_keys, pool.map(self._refetch_flag, changed_keys)):
+                if flag is None:
+                    removed.append(flag_key)
                 else:
-                    env_counts[env_name]["disabled"] += 1
+                    updated.append(flag)
         
-        return env_counts
+        self._patch_cached_listings(updated, removed)
+        result.update({
+            "flags": self.merge_flags(flags, updated, removed, sort_by),
+            "changed": [f.get("key") for f in updated],
+            "removed": removed
+        })
+        return result
+    
+    def _refetch_flag(self, flag_key: str) -> Optional[Dict]:
+        """Fetch a flag bypassing the response cache; None when it no longer exists"""
+        self.cache.invalidate_tag(f"flag:{flag_key}")
+        try:
+            return self.get_flag(flag_key)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+    
+    def invalidate_cache(self, tag: str):
+        """Drop cached entries carrying tag ("flags" for listings, "flag:<key>" for one flag)"""
+        self.cache.invalidate_tag(tag)
+    
+    def get_flag_statistics(self, flags: Optional[List[Dict]] = None) -> Dict:
+        """Get flag usage statistics (for the given flags, or the current listing)"""
+        if flags is None:
+            flags = self.get_all_flags()
+        return self._flag_statistics(flags)
     
     def get_performance_stats(self) -> Dict:
         """Get API client performance statistics"""
-        cache_total = self.stats["cache_hits"] + self.stats["cache_misses"]
-        cache_hit_rate = (self.stats["cache_hits"] / cache_total * 100) if cache_total > 0 else 0
+        metrics = self.metrics.snapshot()
+        
+        with self._stats_lock:
+            latencies = list(self.page_latencies)
+        cache_stats = self.cache.get_stats()
+        conditional = self.stats["conditional_requests"]
+        not_modified_rate = (self.stats["not_modified"] / conditional * 100) if conditional > 0 else 0
         
         return {
             "requests_made": self.stats["requests_made"],
-            "cache_hits": self.stats["cache_hits"],
-            "cache_misses": self.stats["cache_misses"],
-            "cache_hit_rate": round(cache_hit_rate, 2),
+            "cache_hits": metrics["cache_hits"],
+            "cache_misses": metrics["cache_misses"],
+            "cache_hit_rate": metrics["cache_hit_rate"],
             "errors": self.stats["errors"],
-            "cached_items": len(self.cache.cache)
+            "cached_items": cache_stats["entries"],
+            "cache_bytes": cache_stats["bytes_in_use"],
+            "cache_evictions": cache_stats["evictions"],
+            "cache_expirations": cache_stats["expirations"],
+            "pages_fetched": self.stats["pages_fetched"],
+            "page_latency_avg_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0,
+            "page_latency_max_ms": round(max(latencies), 1) if latencies else 0,
+            "last_page_timings": list(self.last_page_timings),
+            "conditional_requests": conditional,
+            "not_modified": self.stats["not_modified"],
+            "not_modified_rate": round(not_modified_rate, 2),
+            "bytes_revalidated": self.stats["bytes_revalidated"],
+            "validators_stored": len(self.validators.entries),
+            "validator_bytes": self.validators.get_stats()["bytes_in_use"],
+            "latency_p50_ms": metrics["latency"]["p50_ms"],
+            "latency_p95_ms": metrics["latency"]["p95_ms"],
+            "latency_p99_ms": metrics["latency"]["p99_ms"],
+            "bytes_received": metrics["bytes_received"],
+            "retries": metrics["retries"],
+            "rate_limit_waits": metrics["rate_limit_waits"],
+            "rate_limit_wait_seconds": metrics["rate_limit_wait_seconds"],
+            "endpoints": metrics["endpoints"],
+            "read_limiter": self.read_limiter.get_stats(),
+            "write_limiter": self.write_limiter.get_stats()
         }
     
     def clear_cache(self):
-        """Clear all cached data"""
+        """Clear all cached data.
+
+        ETag/Last-Modified validators are kept, so the next fetch is a cheap conditional
+        request that returns 304 when nothing changed.
+        """
         self.cache.clear()
     
     def get_audit_log_entries(
@@ -743,33 +1412,7 @@ class LaunchDarklyClient:
         If 'spec' is not given and 'env_key' is provided, builds a collection spec for all flags in that environment.
         Results are limited and returned as a list of entries (raw API items).
         """
-        # LaunchDarkly enforces 1..20 for audit log 'limit'
-        try:
-            safe_limit = int(limit)
-        except Exception:
-            safe_limit = 20
-        if safe_limit < 1:
-            safe_limit = 1
-        if safe_limit > 20:
-            safe_limit = 20
-        params: Dict[str, Any] = {"limit": safe_limit}
-        if before:
-            params["before"] = str(before)
-        if after:
-            params["after"] = str(after)
-        # Prefer explicit spec if provided
-        if spec:
-            params["spec"] = spec
-        else:
-            proj = project_key or self.project_key
-            if env_key:
-                # Collection of all flags within a specific environment of a project
-                # Example per LD support doc: spec=my-project:env/my-env:flag/*
-                params["spec"] = f"proj/{proj}:env/{env_key}:flag/*"
-            else:
-                # No spec -> organization-wide; keep limit small
-                pass
-
+        params = self._audit_log_params(project_key, env_key, limit, before, after, spec)
         response = self._make_request("GET", "/auditlog", params=params)
         if response:
             data = response.json() or {}
@@ -791,5 +1434,8 @@ def reset_client():
     """Reset client instance (useful for testing)"""
     global _client_instance
     if _client_instance:
+        _client_instance.cache.stop_sweeper()
         _client_instance.session.close()
+        if _client_instance.snapshots:
+            _client_instance.snapshots.close()
     _client_instance = None
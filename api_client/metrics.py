@@ -0,0 +1,134 @@
+"""
+API Client Metrics
+Per-endpoint request counts, latency percentiles, transfer sizes, retries,
+rate-limiter waits and cache effectiveness for the LaunchDarkly client
+"""
+
+import math
+from collections import deque
+from threading import Lock
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Path segments kept literally when templating endpoints; everything else
+# (project keys, flag keys, environment keys) becomes "*"
+KNOWN_PATH_SEGMENTS = {
+    "flags", "auditlog", "segments", "projects", "environments", "members",
+    "tokens", "metrics", "flag-statuses", "copy", "dependent-flags", "contexts"
+}
+
+def endpoint_template(method: str, url: str) -> str:
+    """Collapse a request URL into a stable endpoint name, e.g. "GET /flags/*/*" """
+    path = urlparse(url).path
+    if path.startswith("/api/v2"):
+        path = path[len("/api/v2"):]
+    segments = [s if s in KNOWN_PATH_SEGMENTS else "*" for s in path.strip("/").split("/") if s]
+    return f"{method.upper()} /" + "/".join(segments)
+
+class LatencyHistogram:
+    """Recent latency samples (ms) with nearest-rank percentiles"""
+
+    def __init__(self, max_samples: int = 1000):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def record(self, elapsed_ms: float):
+        self.samples.append(elapsed_ms)
+        self.count += 1
+        self.total_ms += elapsed_ms
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 1),
+            "p95_ms": round(self.percentile(95), 1),
+            "p99_ms": round(self.percentile(99), 1)
+        }
+
+class EndpointMetrics:
+    """Counters for one templated endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.status_codes: Dict[int, int] = {}
+        self.latency = LatencyHistogram()
+
+class ClientMetrics:
+    """Thread-safe instrumentation shared by every request the client makes"""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self.latency = LatencyHistogram()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
+
+    def record_request(self, method: str, url: str, elapsed_ms: float, status: Optional[int] = None,
+                       bytes_received: int = 0, retries: int = 0, error: bool = False):
+        name = endpoint_template(method, url)
+        with self.lock:
+            endpoint = self.endpoints.get(name)
+            if endpoint is None:
+                endpoint = self.endpoints[name] = EndpointMetrics()
+            endpoint.requests += 1
+            endpoint.bytes_received += bytes_received
+            endpoint.retries += retries
+            endpoint.latency.record(elapsed_ms)
+            if status is not None:
+                endpoint.status_codes[status] = endpoint.status_codes.get(status, 0) + 1
+            if error:
+                endpoint.errors += 1
+            self.latency.record(elapsed_ms)
+
+    def record_cache(self, hit: bool):
+        with self.lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def record_rate_limit_wait(self, seconds: float):
+        with self.lock:
+            self.rate_limit_waits += 1
+            self.rate_limit_wait_seconds += seconds
+
+    def snapshot(self) -> Dict:
+        """Plain-dict view of all metrics, safe to hand to the UI thread"""
+        with self.lock:
+            lookups = self.cache_hits + self.cache_misses
+            endpoints = {
+                name: {
+                    "requests": m.requests,
+                    "errors": m.errors,
+                    "bytes_received": m.bytes_received,
+                    "retries": m.retries,
+                    "status_codes": dict(m.status_codes),
+                    **m.latency.summary()
+                }
+                for name, m in sorted(self.endpoints.items())
+            }
+            return {
+                "endpoints": endpoints,
+                "latency": self.latency.summary(),
+                "bytes_received": sum(m.bytes_received for m in self.endpoints.values()),
+                "retries": sum(m.retries for m in self.endpoints.values()),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "cache_hit_rate": round(self.cache_hits / lookups * 100, 2) if lookups else 0,
+                "rate_limit_waits": self.rate_limit_waits,
+                "rate_limit_wait_seconds": round(self.rate_limit_wait_seconds, 3)
+            }
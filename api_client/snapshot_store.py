@@ -0,0 +1,117 @@
+"""
+Persistent Flag Snapshot Store
+SQLite-backed snapshots of flag payloads so the app can warm start from disk
+"""
+
+import json
+import os
+import sqlite3
+import time
+import logging
+from threading import Lock
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Bump when the stored payload shape changes; older rows are ignored and purged
+SNAPSHOT_SCHEMA_VERSION = 1
+
+# How long a snapshot may still be used for a warm start
+DEFAULT_SNAPSHOT_TTL = 7 * 24 * 3600  # seconds
+
+@dataclass
+class SnapshotEntry:
+    """A stored payload with its TTL metadata"""
+    key: str
+    payload: Any
+    saved_at: float
+    ttl_seconds: int
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.saved_at)
+
+    @property
+    def is_expired(self) -> bool:
+        return self.age_seconds > self.ttl_seconds
+
+class SnapshotStore:
+    """Thread-safe key/value snapshot store backed by a single SQLite file"""
+
+    def __init__(self, path: str, default_ttl: int = DEFAULT_SNAPSHOT_TTL):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.lock = Lock()
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " key TEXT PRIMARY KEY,"
+                " schema_version INTEGER NOT NULL,"
+                " saved_at REAL NOT NULL,"
+                " ttl_seconds INTEGER NOT NULL,"
+                " payload TEXT NOT NULL)"
+            )
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a versioned key, e.g. v1:my-project:flags"""
+        return ":".join([f"v{SNAPSHOT_SCHEMA_VERSION}"] + [str(p) for p in parts])
+
+    def put(self, key: str, payload: Any, ttl_seconds: Optional[int] = None):
+        """Store a JSON-serializable payload under key"""
+        data = json.dumps(payload, separators=(",", ":"), default=str)
+        ttl = int(ttl_seconds if ttl_seconds is not None else self.default_ttl)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots (key, schema_version, saved_at, ttl_seconds, payload)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, SNAPSHOT_SCHEMA_VERSION, time.time(), ttl, data)
+            )
+
+    def get(self, key: str, allow_expired: bool = True) -> Optional[SnapshotEntry]:
+        """Load a snapshot; expired entries are returned (flagged) unless allow_expired is False"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT saved_at, ttl_seconds, payload FROM snapshots WHERE key = ? AND schema_version = ?",
+                (key, SNAPSHOT_SCHEMA_VERSION)
+            ).fetchone()
+        if not row:
+            return None
+
+        try:
+            entry = SnapshotEntry(key=key, payload=json.loads(row[2]), saved_at=row[0], ttl_seconds=row[1])
+        except ValueError as e:
+            self.logger.warning(f"Discarding unreadable snapshot {key}: {e}")
+            self.delete(key)
+            return None
+
+        if entry.is_expired and not allow_expired:
+            return None
+        return entry
+
+    def delete(self, key: str):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM snapshots WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        """Drop expired rows and rows written by another schema version"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM snapshots WHERE schema_version != ? OR saved_at + ttl_seconds < ?",
+                (SNAPSHOT_SCHEMA_VERSION, time.time())
+            )
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM snapshots")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -167,10 +167,45 @@ class APIConfig:
     # Rate limiting
     REQUESTS_PER_MINUTE = 60
     REQUESTS_PER_HOUR = 1000
+    READ_REQUESTS_PER_MINUTE = 50   # starting budget for GETs until X-Ratelimit-* headers arrive
+    WRITE_REQUESTS_PER_MINUTE = 20  # separate budget for PATCH/POST so toggles are never starved
+    MIN_REQUESTS_PER_MINUTE = 5     # floor when adapting down after 429s
+    MAX_REQUESTS_PER_MINUTE = 600   # ceiling for rates learned from X-Ratelimit-* headers
+    RATE_LIMIT_MAX_WAIT = 120       # seconds a request may queue for a token
     
     # Pagination
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
+    MAX_PAGE_WORKERS = 4  # concurrent page fetches for flag listing
+    
+    # Bulk scans (orphaned flag export)
+    SCAN_WORKERS = 8            # concurrent per-flag fetches
+    SCAN_MAX_ATTEMPTS = 4       # attempts per flag when throttled
+    SCAN_PROGRESS_INTERVAL = 0.25  # seconds between coalesced progress callbacks
+    
+    # Bulk flag toggles (release nights); requests still share the write rate limiter
+    BULK_TOGGLE_WORKERS = 4
+    
+    # Response cache bounds
+    CACHE_MAX_ENTRIES = 256
+    CACHE_MAX_BYTES = 64 * 1024 * 1024  # approximate, measured as serialized JSON
+    CACHE_SWEEP_INTERVAL = 60  # seconds between expired-entry sweeps
+    
+    # ETag/Last-Modified validators (each keeps the body it revalidates)
+    VALIDATOR_MAX_ENTRIES = 500
+    VALIDATOR_MAX_BYTES = 32 * 1024 * 1024  # approximate: body length plus headers
+    
+    # Segments (fetched in bulk per environment for local segmentMatch evaluation)
+    SEGMENT_PAGE_SIZE = 50
+    SEGMENT_CACHE_TTL = 300  # seconds; expired listings are revalidated with ETags
+    
+    # Audit-log delta sync (auto-refresh)
+    DELTA_SYNC_MAX_PAGES = 10  # audit pages of 20 before falling back to a full refresh
+    DELTA_SYNC_OVERLAP_MS = 60 * 1000  # re-query this far behind the cursor for late-indexed entries
+    
+    # Async client connection pool
+    ASYNC_MAX_CONNECTIONS = 20
+    ASYNC_KEEPALIVE_TIMEOUT = 30  # seconds an idle pooled connection is kept open
 
 # Environment-specific URLs
 class EnvironmentURLs:
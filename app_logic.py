@@ -1,10 +1,12 @@
 import requests
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from api_config.api_endpoints import FeatureFlagEndpoints, APIHeaders, APIConfig, URLBuilder, LAUNCHDARKLY_BASE_URL
 from shared.constants import ENVIRONMENT_MAPPINGS
 from shared.config_loader import LOG_FILE
 from shared.user_session import get_api_comment, get_current_user
-from notifications.teams import notify_flag_change
+from notifications.teams import notify_flag_change, notify_bulk_flag_change
 from shared.audit import audit_event
 
 # Module logger (configuration is handled by the main app)
@@ -185,6 +187,139 @@ def update_flag(env_key, feature_key, update_value):
         pass
     return False
 
+def parse_bulk_changes(text):
+    """Parse bulk toggle lines of ``<flag> <env> <on|off>`` (comma or whitespace separated).
+    Returns (changes, errors): (feature_key, env, enabled) tuples and messages for bad lines.
+    Blank lines and lines starting with # are ignored.
+    """
+    truthy = {"on", "true", "enable", "enabled", "1"}
+    falsy = {"off", "false", "disable", "disabled", "0"}
+    changes = []
+    errors = []
+    for line_no, line in enumerate((text or "").splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = [p for p in line.replace(",", " ").split() if p]
+        if len(parts) != 3 or parts[2].lower() not in truthy | falsy:
+            errors.append(f"Line {line_no}: expected '<flag> <env> <on|off>', got '{line}'")
+            continue
+        feature_key, env_key, state = parts
+        changes.append((feature_key, env_key.upper() if env_key.upper() in ENVIRONMENT_MAPPINGS else env_key,
+                        state.lower() in truthy))
+    return changes, errors
+
+def bulk_update_flags(changes, max_workers=None, progress_callback=None, comment=None):
+    """Toggle many (feature_key, env_key, enabled) tuples concurrently.
+
+    Requests go through the shared API client, so they are paced by its write rate
+    limiter and retried on 429/5xx like any other write. Instead of one Teams message
+    and one audit entry per flag, a single summarised notification and audit event
+    are written for the whole batch. ``progress_callback(done, total, result)`` is
+    called from worker threads as items finish.
+
+    Returns {"results": [...], "succeeded": n, "failed": n, "comment": str}; results
+    keep the input order and carry feature_key, environment, enabled, success, error
+    and elapsed_ms.
+    """
+    from api_client import get_client
+
+    items = []
+    seen = set()
+    for feature_key, env_key, enabled in changes:
+        actual_env_key = ENVIRONMENT_MAPPINGS.get(env_key, env_key)
+        key = (feature_key, actual_env_key)
+        if key in seen:
+            # Last instruction for a flag/environment wins; sending both would race
+            items = [i for i in items if (i[0], i[1]) != key]
+        seen.add(key)
+        items.append((feature_key, actual_env_key, bool(enabled)))
+
+    total = len(items)
+    summary = {"results": [], "succeeded": 0, "failed": 0, "comment": comment}
+    if not total:
+        return summary
+
+    comment = comment or get_api_comment(f"Bulk flag update ({total} changes)")
+    summary["comment"] = comment
+    client = get_client()
+
+    def toggle(item):
+        feature_key, actual_env_key, enabled = item
+        started = time.perf_counter()
+        error = None
+        ok = False
+        try:
+            ok = client.update_flag(
+                feature_key,
+                actual_env_key,
+                [{"kind": "turnFlagOn" if enabled else "turnFlagOff"}],
+                comment=comment,
+                raise_errors=True,
+            )
+            if not ok:
+                error = "Update was not applied"
+        except Exception as e:
+            error = str(e)
+        return {
+            "feature_key": feature_key,
+            "environment": actual_env_key,
+            "enabled": enabled,
+            "success": bool(ok),
+            "error": error,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    results = [None] * total
+    workers = max(1, min(max_workers or APIConfig.BULK_TOGGLE_WORKERS, total))
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(toggle, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            done += 1
+            if progress_callback:
+                try:
+                    progress_callback(done, total, result)
+                except Exception as e:
+                    logger.debug(f"Bulk progress callback error: {e}")
+
+    succeeded = sum(1 for r in results if r["success"])
+    summary.update(results=results, succeeded=succeeded, failed=total - succeeded)
+    logger.info(f"Bulk flag update: {succeeded}/{total} applied")
+
+    user_name = get_current_user()
+    # One Teams message for the whole batch (best-effort)
+    try:
+        notify_bulk_flag_change(results, user=user_name, comment=comment)
+    except Exception as notify_err:
+        logger.debug(f"Notify error (non-fatal): {notify_err}")
+
+    # One audit event for the whole batch
+    try:
+        audit_event(
+            "bulk_update_flag",
+            {
+                "feature_key": ",".join(sorted({r["feature_key"] for r in results})),
+                "environment": ",".join(sorted({r["environment"] for r in results})),
+                "count": total,
+                "succeeded": succeeded,
+                "failed": total - succeeded,
+                "comment": comment,
+                "summary": f"Bulk toggle: {succeeded}/{total} applied",
+                "items": [
+                    {k: r[k] for k in ("feature_key", "environment", "enabled", "success", "error")}
+                    for r in results
+                ],
+            },
+            ok=succeeded == total,
+        )
+    except Exception:
+        pass
+
+    return summary
+
 def get_environments():
     """Get available environments from LaunchDarkly project"""
     from shared.config_loader import LAUNCHDARKLY_API_KEY, PROJECT_KEY
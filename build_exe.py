@@ -43,6 +43,7 @@ def build_executable():
         
         # Include all necessary modules
         '--hidden-import=requests',
+        '--hidden-import=aiohttp',
         '--hidden-import=tkinter',
         '--hidden-import=ttkbootstrap',
         '--hidden-import=configparser',
@@ -62,6 +63,8 @@ def build_executable():
         '--add-data=shared;shared',
         '--add-data=constants;constants',
         '--add-data=notifications;notifications',
+        '--add-data=evaluation;evaluation',
+        '--add-data=targeting;targeting',
         
         # Version info for Windows
         '--version-file=version_info.txt',
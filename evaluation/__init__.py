@@ -0,0 +1,11 @@
+"""Evaluation package.
+Local, UI-independent LaunchDarkly flag evaluation via evaluation.evaluator.
+"""
+
+from .evaluator import (FlagEvaluator, EvaluationDetail, EvaluationTrace, compile_flag, compile_segment,
+                        evaluate_flag, bucket_context)
+from .clause_index import ClauseValueIndex, get_clause_index, normalize_clause_value
+
+__all__ = ['FlagEvaluator', 'EvaluationDetail', 'EvaluationTrace', 'compile_flag', 'compile_segment',
+           'evaluate_flag', 'bucket_context',
+           'ClauseValueIndex', 'get_clause_index', 'normalize_clause_value']
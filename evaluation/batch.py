@@ -0,0 +1,163 @@
+"""
+Batch Flag Evaluation
+Evaluate one flag for many PMC/Site contexts in a single pass: the flag is
+fetched and compiled once, contexts are streamed from CSV (or a pasted list)
+and results are streamed back out as CSV. Also evaluates one context across
+every environment of a single fetched flag payload.
+"""
+
+import csv
+import io
+import logging
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .evaluator import EvaluationDetail, FlagEvaluator
+
+logger = logging.getLogger(__name__)
+
+# Accepted (case-insensitive) header names for the input columns
+PMC_COLUMNS = ("pmcid", "pmc_id", "pmc id", "pmc")
+SITE_COLUMNS = ("siteid", "site_id", "site id", "site")
+KEY_COLUMNS = ("key", "context_key", "user_key")
+
+RESULT_COLUMNS = ["PmcId", "SiteId", "key", "variation", "value", "reason", "rule_index", "rule_description"]
+
+def build_context(pmc_id, site_id=None, key: Optional[str] = None) -> Dict:
+    """User context for a PMC/Site pair, keyed the same way as the Get tab"""
+    context = {}
+    pmc = str(pmc_id).strip() if pmc_id is not None else ""
+    site = str(site_id).strip() if site_id is not None else ""
+    if pmc:
+        try:
+            context["PmcId"] = int(pmc)  # LaunchDarkly rules often expect numeric PMC IDs
+        except ValueError:
+            context["PmcId"] = pmc
+    if site:
+        context["SiteId"] = site
+
+    if key:
+        context["key"] = key
+    elif pmc and site:
+        context["key"] = f"user-pmc{pmc}-site{site}"
+    elif pmc:
+        context["key"] = f"user-pmc{pmc}"
+    elif site:
+        context["key"] = f"user-site{site}"
+    return context
+
+def _column(header: list, names: Tuple[str, ...]) -> Optional[int]:
+    lowered = [h.strip().lower() for h in header]
+    for name in names:
+        if name in lowered:
+            return lowered.index(name)
+    return None
+
+def iter_contexts_csv(source: TextIO) -> Iterator[Dict]:
+    """Yield contexts from CSV rows.
+
+    With a header row, PmcId/SiteId/key columns are found by name; without one the first
+    column is the PMC ID and the optional second column the Site ID. Blank rows are skipped.
+    """
+    reader = csv.reader(source)
+    first = next(reader, None)
+    if first is None:
+        return
+
+    pmc_col = _column(first, PMC_COLUMNS)
+    site_col = _column(first, SITE_COLUMNS)
+    key_col = _column(first, KEY_COLUMNS)
+    has_header = pmc_col is not None or site_col is not None or key_col is not None
+    if not has_header:
+        pmc_col, site_col = 0, 1
+
+    def cell(row, index):
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    rows = reader if has_header else _prepend(first, reader)
+    for row in rows:
+        if not any(c.strip() for c in row):
+            continue
+        pmc, site, key = cell(row, pmc_col), cell(row, site_col), cell(row, key_col)
+        if pmc or site or key:
+            yield build_context(pmc, site, key or None)
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
+
+def iter_contexts_text(text: str) -> Iterator[Dict]:
+    """Contexts from pasted text: one PMC ID per line, optionally "pmc,site" or "pmc site" """
+    normalized = "\n".join(",".join(line.replace("\t", " ").split()) if "," not in line else line
+                           for line in text.splitlines())
+    return iter_contexts_csv(io.StringIO(normalized))
+
+def evaluate_batch(flag: Dict, env_key: str, contexts: Iterable[Dict],
+                   evaluator: Optional[FlagEvaluator] = None) -> Iterator[Tuple[Dict, EvaluationDetail]]:
+    """Evaluate every context against one flag; the flag is compiled and its
+    prerequisite chain resolved once up front"""
+    evaluator = evaluator or FlagEvaluator()
+    compiled = evaluator.compile(flag, env_key)
+    graph = evaluator.resolve_prerequisites(flag, env_key) if compiled.prerequisites else None
+    for context in contexts:
+        yield context, evaluator.evaluate(flag, env_key, context, prerequisites=graph)
+
+def evaluate_environments(flag: Dict, env_keys: Iterable[str], context: Dict,
+                          evaluator: Optional[FlagEvaluator] = None) -> List[Tuple[str, Optional[EvaluationDetail]]]:
+    """Evaluate one context in several environments of an already-fetched flag.
+
+    The flag body carries every environment, so no further requests are needed;
+    environments missing from the flag come back with None instead of a detail.
+    """
+    evaluator = evaluator or FlagEvaluator()
+    environments = flag.get("environments", {}) or {}
+    results = []
+    for env_key in env_keys:
+        env_data = environments.get(env_key)
+        detail = evaluator.evaluate(flag, env_key, context, env_data=env_data) if env_data is not None else None
+        results.append((env_key, detail))
+    return results
+
+def write_results_csv(results: Iterable[Tuple[Dict, EvaluationDetail]], out: TextIO,
+                      progress_callback: Optional[Callable[[int], None]] = None,
+                      progress_every: int = 500) -> Dict:
+    """Stream results to CSV; returns {"evaluated", "by_value"} counts"""
+    writer = csv.writer(out)
+    writer.writerow(RESULT_COLUMNS)
+    by_value: Counter = Counter()
+    count = 0
+    for context, detail in results:
+        writer.writerow([
+            context.get("PmcId", ""),
+            context.get("SiteId", ""),
+            context.get("key", ""),
+            "" if detail.variation_index is None else detail.variation_index,
+            _format_value(detail.value),
+            detail.kind,
+            "" if detail.rule_index is None else detail.rule_index,
+            detail.description or ""
+        ])
+        by_value[_format_value(detail.value)] += 1
+        count += 1
+        if progress_callback and count % progress_every == 0:
+            progress_callback(count)
+    if progress_callback:
+        progress_callback(count)
+    return {"evaluated": count, "by_value": dict(by_value)}
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return ""
+    return str(value)
+
+def run_batch_evaluation(flag: Dict, env_key: str, contexts: Iterable[Dict], output_path: str,
+                         evaluator: Optional[FlagEvaluator] = None,
+                         progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+    """Evaluate contexts for an already-fetched flag and write the result CSV to output_path"""
+    with open(output_path, "w", newline="", encoding="utf-8") as out:
+        summary = write_results_csv(evaluate_batch(flag, env_key, contexts, evaluator), out, progress_callback)
+    summary["output_path"] = output_path
+    logger.info(f"Batch evaluation of {flag.get('key')} in {env_key}: {summary['evaluated']} contexts")
+    return summary
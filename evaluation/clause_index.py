@@ -0,0 +1,99 @@
+"""
+Clause Value Index
+Per-flag, per-environment index from clause values to the rules containing
+them (e.g. PmcId -> rule indices), normalised so 123 and "123" are the same
+key. Built once per fetched flag version and shared by evaluation and the
+PMC targeting editor.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Attributes whose values are indexed (and compared with int/str normalisation)
+INDEXED_ATTRIBUTES = ("PmcId", "pmcId")
+
+def normalize_clause_value(value: Any) -> Hashable:
+    """Index key for a clause or context value: integral numbers and digit strings collapse together"""
+    if isinstance(value, bool):
+        return ("b", value)
+    if isinstance(value, int):
+        return ("n", value)
+    if isinstance(value, float):
+        return ("n", int(value)) if value.is_integer() else ("f", value)
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped.lstrip("-").isdigit():
+            return ("n", int(stripped))
+        return ("s", value)
+    return ("o", repr(value))
+
+class ClauseValueIndex:
+    """Maps each value of ``in`` clauses on one attribute to the rule indices holding it"""
+
+    def __init__(self, rules: List[Dict], attribute: str = "PmcId"):
+        self.attribute = attribute
+        self.rule_count = len(rules)
+        index: Dict[Hashable, List[int]] = {}
+        for i, rule in enumerate(rules):
+            for clause in rule.get("clauses", []) or []:
+                if clause.get("attribute") != attribute or clause.get("op", "in") != "in":
+                    continue
+                for value in clause.get("values", []) or []:
+                    indices = index.setdefault(normalize_clause_value(value), [])
+                    if not indices or indices[-1] != i:
+                        indices.append(i)
+        self.index: Dict[Hashable, Tuple[int, ...]] = {k: tuple(v) for k, v in index.items()}
+
+    def rules_for(self, value: Any) -> Tuple[int, ...]:
+        """Indices (ascending) of rules whose clause on this attribute lists value"""
+        return self.index.get(normalize_clause_value(value), ())
+
+    def __contains__(self, value: Any) -> bool:
+        return normalize_clause_value(value) in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+class ClauseIndexCache:
+    """Bounded cache of ClauseValueIndex keyed by (flag key, _version, environment, attribute)"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple, ClauseValueIndex]" = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, flag: Dict, env_key: Optional[str], attribute: str = "PmcId",
+            env_data: Optional[Dict] = None) -> ClauseValueIndex:
+        if env_data is None:
+            env_data = (flag.get("environments", {}) or {}).get(env_key, {}) or {}
+        version = flag.get("_version")
+        cacheable = env_key is not None and version is not None
+        cache_key = (flag.get("key"), version, env_key, attribute)
+
+        if cacheable:
+            with self.lock:
+                index = self.entries.get(cache_key)
+                if index is not None:
+                    self.entries.move_to_end(cache_key)
+                    return index
+
+        index = ClauseValueIndex(env_data.get("rules", []) or [], attribute)
+        if cacheable:
+            with self.lock:
+                self.entries[cache_key] = index
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+# Shared by the evaluator and the targeting editor
+clause_index_cache = ClauseIndexCache()
+
+def get_clause_index(flag: Dict, env_key: Optional[str], attribute: str = "PmcId",
+                     env_data: Optional[Dict] = None) -> ClauseValueIndex:
+    """Index for a flag's rules in one environment, reused while the flag version is unchanged"""
+    return clause_index_cache.get(flag, env_key, attribute, env_data)
@@ -0,0 +1,855 @@
+"""
+Local Flag Evaluation Engine
+Compiles a flag's environment configuration into a decision structure and
+evaluates contexts against it: individual targets, rules (all clauses ANDed,
+full operator set, negation), percentage rollouts with LaunchDarkly-compatible
+bucketing, prerequisites and segmentMatch clauses (against segments supplied by
+a lookup callable and cached per environment). No UI dependency.
+"""
+
+import re
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from .clause_index import INDEXED_ATTRIBUTES, ClauseValueIndex, get_clause_index, normalize_clause_value
+from .prerequisites import PrerequisiteGraph, build_prerequisite_graph, concurrent_fetcher
+
+logger = logging.getLogger(__name__)
+
+# Rollout weights are expressed in thousandths of a percent
+ROLLOUT_WEIGHT_SCALE = 100000.0
+# LaunchDarkly hashes into the first 15 hex digits of a SHA-1 digest
+BUCKET_HASH_SCALE = float(0xFFFFFFFFFFFFFFF)
+
+FlagLookup = Callable[[str], Optional[Dict]]
+# (environment key, segment key) -> segment JSON as returned by the LaunchDarkly API
+SegmentLookup = Callable[[Optional[str], str], Optional[Dict]]
+# (segment key, context) -> membership, bound to one environment by the evaluator
+SegmentMatcher = Callable[[str, Dict], bool]
+
+# Reason kinds
+OFF = "OFF"
+TARGET_MATCH = "TARGET_MATCH"
+RULE_MATCH = "RULE_MATCH"
+FALLTHROUGH = "FALLTHROUGH"
+PREREQUISITE_FAILED = "PREREQUISITE_FAILED"
+ERROR = "ERROR"
+
+@dataclass
+class EvaluationDetail:
+    """Outcome of evaluating one flag for one context"""
+    kind: str
+    variation_index: Optional[int]
+    value: Any
+    message: str
+    rule_index: Optional[int] = None
+    rule_id: Optional[str] = None
+    description: Optional[str] = None
+    target_index: Optional[int] = None
+    prerequisite_key: Optional[str] = None
+    bucket: Optional[float] = None
+    trace: Optional["EvaluationTrace"] = None
+
+    def to_dict(self) -> Dict:
+        """Result in the shape the Get tab has always used: variation/value/message/match"""
+        variation = self.variation_index
+        if self.kind == OFF:
+            label = "OFF"
+        elif self.kind == TARGET_MATCH:
+            label = f"Target Match (Variation {variation})"
+        elif self.kind == RULE_MATCH:
+            label = f"Rule Match (Variation {variation})"
+        elif self.kind == PREREQUISITE_FAILED:
+            label = f"Prerequisite Failed (Variation {variation})"
+        elif self.kind == FALLTHROUGH:
+            label = f"Fallthrough (Variation {variation})"
+        else:
+            label = "Error"
+
+        result = {"variation": label, "value": self.value, "message": self.message}
+        if self.kind == TARGET_MATCH:
+            result["match"] = {"type": "target", "index": self.target_index}
+        elif self.kind == RULE_MATCH:
+            result["match"] = {"type": "rule", "index": self.rule_index, "description": self.description}
+        elif self.kind == PREREQUISITE_FAILED:
+            result["match"] = {"type": "prerequisite", "key": self.prerequisite_key}
+        elif self.kind == FALLTHROUGH:
+            result["match"] = {"type": "fallthrough"}
+        if self.bucket is not None:
+            result["bucket"] = round(self.bucket, 5)
+        if self.trace is not None:
+            result["trace"] = self.trace.to_list()
+        return result
+
+@dataclass
+class TraceStep:
+    step: str
+    subject: str
+    matched: bool
+    elapsed_us: float
+    note: str = ""
+
+class EvaluationTrace:
+    """Compact record of what an evaluation looked at and how long each step took"""
+
+    def __init__(self):
+        self.steps: List[TraceStep] = []
+
+    def add(self, step: str, subject: Any, matched: bool, started: float, note: str = ""):
+        """Record a step that began at ``started`` (a time.perf_counter() value)"""
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        self.steps.append(TraceStep(step, str(subject), matched, elapsed_us, note))
+
+    @property
+    def total_us(self) -> float:
+        return sum(s.elapsed_us for s in self.steps)
+
+    def to_list(self) -> List[Dict]:
+        return [
+            {"step": s.step, "subject": s.subject, "matched": s.matched,
+             "us": round(s.elapsed_us, 1), **({"note": s.note} if s.note else {})}
+            for s in self.steps
+        ]
+
+    def format(self) -> str:
+        """One line per step, e.g. ``rule #1 PMCs Enabled Rule: no (3.2us) - PmcId in [...]``"""
+        lines = []
+        for s in self.steps:
+            line = f"{s.step} {s.subject}: {'yes' if s.matched else 'no'} ({s.elapsed_us:.1f}us)"
+            lines.append(f"{line} - {s.note}" if s.note else line)
+        lines.append(f"total {self.total_us:.1f}us")
+        return "\n".join(lines)
+
+# ---------------------------------------------------------------------------
+# Context access
+# ---------------------------------------------------------------------------
+
+def context_for_kind(context: Dict, kind: str) -> Optional[Dict]:
+    """The single-kind context of the given kind, or None.
+
+    Plain dicts without a ``kind`` are treated as ``user`` contexts, which is what the
+    Get tab builds from PMC/Site IDs.
+    """
+    if not isinstance(context, dict):
+        return None
+    context_kind = context.get("kind", "user")
+    if context_kind == "multi":
+        nested = context.get(kind)
+        return nested if isinstance(nested, dict) else None
+    return context if context_kind == kind else None
+
+def context_kinds(context: Dict) -> List[str]:
+    if not isinstance(context, dict):
+        return []
+    if context.get("kind") == "multi":
+        return [k for k, v in context.items() if k != "kind" and isinstance(v, dict)]
+    return [context.get("kind", "user")]
+
+_MISSING = object()
+
+def get_attribute(single: Dict, attribute: str, kind: str) -> Any:
+    """Read an attribute (plain name or /slash/reference) from a single-kind context"""
+    if attribute == "kind":
+        return kind
+    if attribute.startswith("/"):
+        value: Any = single
+        for part in attribute[1:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            if not isinstance(value, dict) or part not in value:
+                return _MISSING
+            value = value[part]
+        return value
+    if attribute in single:
+        return single[attribute]
+    custom = single.get("custom")
+    if isinstance(custom, dict) and attribute in custom:
+        return custom[attribute]
+    return _MISSING
+
+# ---------------------------------------------------------------------------
+# Operators
+# ---------------------------------------------------------------------------
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _value_key(value: Any) -> Tuple[str, Any]:
+    """Type-tagged key so `in` matches like LaunchDarkly (1 == 1.0, but 1 != "1" or True)"""
+    if isinstance(value, bool):
+        return ("b", value)
+    if _is_number(value):
+        return ("n", float(value))
+    if isinstance(value, str):
+        return ("s", value)
+    return ("o", repr(value))
+
+def _to_timestamp(value: Any) -> Optional[float]:
+    """Epoch milliseconds from a number or an RFC 3339 string"""
+    if _is_number(value):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp() * 1000
+    return None
+
+_SEMVER_RE = re.compile(
+    r"^(?P<major>0|[1-9]\d*)(\.(?P<minor>0|[1-9]\d*))?(\.(?P<patch>0|[1-9]\d*))?"
+    r"(-(?P<pre>[0-9A-Za-z\-.]+))?(\+[0-9A-Za-z\-.]+)?$"
+)
+
+def parse_semver(value: Any) -> Optional[Tuple]:
+    """Comparable semantic-version key; missing minor/patch default to 0 as in LaunchDarkly"""
+    if not isinstance(value, str):
+        return None
+    m = _SEMVER_RE.match(value.strip())
+    if not m:
+        return None
+    core = (int(m.group("major")), int(m.group("minor") or 0), int(m.group("patch") or 0))
+    pre = m.group("pre")
+    if not pre:
+        # A release sorts after any pre-release of the same version
+        return core + ((1,),)
+    parts = []
+    for ident in pre.split("."):
+        parts.append((0, int(ident), "") if ident.isdigit() else (1, 0, ident))
+    return core + ((0, tuple(parts)),)
+
+def _string_op(test: Callable[[str, str], bool]) -> Callable[[Any, Any], bool]:
+    def op(context_value, clause_value):
+        return isinstance(context_value, str) and isinstance(clause_value, str) and test(context_value, clause_value)
+    return op
+
+def _numeric_op(test: Callable[[float, float], bool]) -> Callable[[Any, Any], bool]:
+    def op(context_value, clause_value):
+        return _is_number(context_value) and _is_number(clause_value) and test(context_value, clause_value)
+    return op
+
+def _date_op(test: Callable[[float, float], bool]) -> Callable[[Any, Any], bool]:
+    def op(context_value, clause_value):
+        left, right = _to_timestamp(context_value), _to_timestamp(clause_value)
+        return left is not None and right is not None and test(left, right)
+    return op
+
+def _semver_op(test: Callable[[Tuple, Tuple], bool]) -> Callable[[Any, Any], bool]:
+    def op(context_value, clause_value):
+        left, right = parse_semver(context_value), parse_semver(clause_value)
+        return left is not None and right is not None and test(left, right)
+    return op
+
+# Pairwise operators: clause matches if any (context value, clause value) pair passes
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "endsWith": _string_op(lambda a, b: a.endswith(b)),
+    "startsWith": _string_op(lambda a, b: a.startswith(b)),
+    "contains": _string_op(lambda a, b: b in a),
+    "lessThan": _numeric_op(lambda a, b: a < b),
+    "lessThanOrEqual": _numeric_op(lambda a, b: a <= b),
+    "greaterThan": _numeric_op(lambda a, b: a > b),
+    "greaterThanOrEqual": _numeric_op(lambda a, b: a >= b),
+    "before": _date_op(lambda a, b: a < b),
+    "after": _date_op(lambda a, b: a > b),
+    "semVerEqual": _semver_op(lambda a, b: a == b),
+    "semVerLessThan": _semver_op(lambda a, b: a < b),
+    "semVerGreaterThan": _semver_op(lambda a, b: a > b),
+}
+
+# ---------------------------------------------------------------------------
+# Compiled structure
+# ---------------------------------------------------------------------------
+
+@dataclass
+class CompiledClause:
+    attribute: str
+    op: str
+    values: List[Any]
+    negate: bool
+    context_kind: str
+    value_set: FrozenSet = frozenset()
+    patterns: List[Any] = field(default_factory=list)
+    # PMC-style attributes compare 123 and "123" as equal
+    normalized: bool = False
+
+    def matches(self, context: Dict, segment_match: Optional[SegmentMatcher] = None) -> bool:
+        if self.op == "segmentMatch":
+            if segment_match is None:
+                logger.debug(f"segmentMatch clause on {self.values} without segment data; treating as no match")
+                return False
+            matched = any(segment_match(str(key), context) for key in self.values)
+            return matched != self.negate
+
+        single = context_for_kind(context, self.context_kind)
+        if single is None:
+            return False
+        if self.attribute == "kind":
+            kinds = context_kinds(context)
+            matched = any(self._match_value(k) for k in kinds)
+            return matched != self.negate
+
+        value = get_attribute(single, self.attribute, self.context_kind)
+        if value is _MISSING or value is None:
+            # A missing attribute never matches, regardless of negate
+            return False
+        if isinstance(value, list):
+            matched = any(self._match_value(v) for v in value)
+        else:
+            matched = self._match_value(value)
+        return matched != self.negate
+
+    def _match_value(self, value: Any) -> bool:
+        if self.op == "in":
+            key = normalize_clause_value(value) if self.normalized else _value_key(value)
+            return key in self.value_set
+        if self.op == "matches":
+            return isinstance(value, str) and any(p.search(value) for p in self.patterns)
+        test = OPERATORS.get(self.op)
+        if test is None:
+            return False
+        return any(test(value, clause_value) for clause_value in self.values)
+
+@dataclass
+class Rollout:
+    variations: List[Tuple[int, int]]  # (variation index, weight)
+    bucket_by: str
+    context_kind: str
+    seed: Optional[int]
+    is_experiment: bool
+
+@dataclass
+class VariationOrRollout:
+    variation: Optional[int] = None
+    rollout: Optional[Rollout] = None
+
+@dataclass
+class CompiledRule:
+    index: int
+    rule_id: Optional[str]
+    description: Optional[str]
+    clauses: List[CompiledClause]
+    serve: VariationOrRollout
+    # Set when a plain `in` clause on an indexed attribute gates the rule, so the
+    # clause index can rule it out without evaluating any clause
+    index_attribute: Optional[str] = None
+
+    def matches(self, context: Dict, segment_match: Optional[SegmentMatcher] = None) -> bool:
+        # Every clause must match (AND); an empty rule never matches
+        return bool(self.clauses) and all(clause.matches(context, segment_match) for clause in self.clauses)
+
+    def explain_miss(self, context: Dict, segment_match: Optional[SegmentMatcher] = None) -> str:
+        """Which clause stopped this rule from matching (used for traces only)"""
+        if not self.clauses:
+            return "rule has no clauses"
+        for clause in self.clauses:
+            if not clause.matches(context, segment_match):
+                values = clause.values if len(clause.values) <= 5 else clause.values[:5] + ["..."]
+                negate = "not " if clause.negate else ""
+                return f"{clause.attribute} {negate}{clause.op} {values}"
+        return ""
+
+@dataclass
+class CompiledTarget:
+    index: int
+    context_kind: str
+    keys: FrozenSet[str]
+    variation: int
+
+@dataclass
+class CompiledFlag:
+    key: str
+    version: Any
+    env_key: Optional[str]
+    on: bool
+    salt: str
+    variations: List[Any]
+    off_variation: Optional[int]
+    prerequisites: List[Tuple[str, int]]
+    targets: List[CompiledTarget]
+    rules: List[CompiledRule]
+    fallthrough: VariationOrRollout
+    clause_indexes: Dict[str, ClauseValueIndex] = field(default_factory=dict)
+    # Segments referenced by segmentMatch clauses
+    segment_keys: FrozenSet[str] = frozenset()
+
+    def variation_value(self, index: Optional[int]) -> Any:
+        if isinstance(index, int) and 0 <= index < len(self.variations):
+            return self.variations[index]
+        return None
+
+def _compile_serve(data: Dict) -> VariationOrRollout:
+    data = data or {}
+    rollout = data.get("rollout")
+    if isinstance(rollout, dict) and rollout.get("variations"):
+        return VariationOrRollout(rollout=Rollout(
+            variations=[(v.get("variation", 0), int(v.get("weight", 0))) for v in rollout["variations"]],
+            bucket_by=rollout.get("bucketBy") or "key",
+            context_kind=rollout.get("contextKind") or "user",
+            seed=rollout.get("seed"),
+            is_experiment=rollout.get("kind") == "experiment"
+        ))
+    return VariationOrRollout(variation=data.get("variation"))
+
+def _compile_clause(clause: Dict) -> CompiledClause:
+    op = clause.get("op", "")
+    values = list(clause.get("values", []) or [])
+    compiled = CompiledClause(
+        attribute=clause.get("attribute", ""),
+        op=op,
+        values=values,
+        negate=bool(clause.get("negate", False)),
+        context_kind=clause.get("contextKind") or "user"
+    )
+    if op == "in" and compiled.attribute in INDEXED_ATTRIBUTES:
+        compiled.normalized = True
+        compiled.value_set = frozenset(normalize_clause_value(v) for v in values)
+    elif op == "in" or compiled.attribute == "kind":
+        compiled.value_set = frozenset(_value_key(v) for v in values)
+    if op == "matches":
+        for pattern in values:
+            try:
+                compiled.patterns.append(re.compile(str(pattern)))
+            except re.error as e:
+                logger.debug(f"Ignoring invalid regex {pattern!r}: {e}")
+    if op not in OPERATORS and op not in ("in", "matches", "segmentMatch"):
+        logger.debug(f"Unknown clause operator {op!r}; clause will never match")
+    return compiled
+
+def _compile_targets(env_data: Dict) -> List[CompiledTarget]:
+    targets = env_data.get("targets", []) or []
+    context_targets = env_data.get("contextTargets", []) or []
+    user_targets = {t.get("variation"): (i, t) for i, t in enumerate(targets)}
+
+    if not context_targets:
+        return [CompiledTarget(i, t.get("contextKind") or "user", frozenset(str(v) for v in t.get("values", []) or []),
+                               t.get("variation", 0))
+                for i, t in enumerate(targets)]
+
+    compiled = []
+    for t in context_targets:
+        kind = t.get("contextKind") or "user"
+        values = t.get("values", []) or []
+        if kind == "user" and not values:
+            # Placeholder: user keys for this variation live in the legacy targets list
+            index, user_target = user_targets.get(t.get("variation"), (None, None))
+            if user_target is None:
+                continue
+            compiled.append(CompiledTarget(index, "user", frozenset(str(v) for v in user_target.get("values", []) or []),
+                                           t.get("variation", 0)))
+        else:
+            compiled.append(CompiledTarget(len(compiled), kind, frozenset(str(v) for v in values), t.get("variation", 0)))
+    return compiled
+
+def _compile_rule(index: int, rule: Dict) -> CompiledRule:
+    clauses = [_compile_clause(c) for c in rule.get("clauses", []) or []]
+    index_attribute = next(
+        (c.attribute for c in clauses
+         if c.normalized and not c.negate and c.context_kind == "user"),
+        None
+    )
+    return CompiledRule(
+        index=index,
+        rule_id=rule.get("_id"),
+        description=rule.get("description"),
+        clauses=clauses,
+        serve=_compile_serve(rule),
+        index_attribute=index_attribute
+    )
+
+def compile_flag(flag: Dict, env_key: Optional[str] = None, env_data: Optional[Dict] = None) -> CompiledFlag:
+    """Compile a flag's configuration for one environment"""
+    if env_data is None:
+        env_data = (flag.get("environments", {}) or {}).get(env_key, {}) or {}
+    rules = [_compile_rule(i, rule) for i, rule in enumerate(env_data.get("rules", []) or [])]
+    indexed = {rule.index_attribute for rule in rules if rule.index_attribute}
+    return CompiledFlag(
+        key=flag.get("key", ""),
+        version=flag.get("_version"),
+        env_key=env_key,
+        on=bool(env_data.get("on", False)),
+        salt=env_data.get("salt") or flag.get("salt") or "",
+        variations=[v.get("value") if isinstance(v, dict) else v for v in flag.get("variations", []) or []],
+        off_variation=env_data.get("offVariation"),
+        prerequisites=[(p.get("key"), p.get("variation")) for p in env_data.get("prerequisites", []) or [] if p.get("key")],
+        targets=_compile_targets(env_data),
+        rules=rules,
+        fallthrough=_compile_serve(env_data.get("fallthrough", {})),
+        clause_indexes={attr: get_clause_index(flag, env_key, attr, env_data) for attr in indexed},
+        segment_keys=frozenset(
+            str(key) for rule in rules for clause in rule.clauses if clause.op == "segmentMatch" for key in clause.values
+        )
+    )
+
+# ---------------------------------------------------------------------------
+# Segments
+# ---------------------------------------------------------------------------
+
+@dataclass
+class CompiledSegmentRule:
+    clauses: List[CompiledClause]
+    weight: Optional[int]  # thousandths of a percent, None = everyone matching the clauses
+    bucket_by: str
+    context_kind: str
+
+@dataclass
+class CompiledSegment:
+    key: str
+    version: Any
+    salt: str
+    included: Dict[str, FrozenSet[str]]  # context kind -> keys
+    excluded: Dict[str, FrozenSet[str]]
+    rules: List[CompiledSegmentRule]
+    unbounded: bool = False
+
+def _segment_targets(segment: Dict, legacy_field: str, context_field: str) -> Dict[str, FrozenSet[str]]:
+    """Merge the legacy user key list with per-kind context targets into {kind: frozenset(keys)}"""
+    keys: Dict[str, set] = {"user": set(str(k) for k in segment.get(legacy_field, []) or [])}
+    for target in segment.get(context_field, []) or []:
+        kind = target.get("contextKind") or "user"
+        keys.setdefault(kind, set()).update(str(k) for k in target.get("values", []) or [])
+    return {kind: frozenset(values) for kind, values in keys.items() if values}
+
+def compile_segment(segment: Dict) -> CompiledSegment:
+    """Compile a segment's targets into key sets and its rules into clauses"""
+    return CompiledSegment(
+        key=segment.get("key", ""),
+        version=segment.get("version", segment.get("_version")),
+        salt=segment.get("salt") or "",
+        included=_segment_targets(segment, "included", "includedContexts"),
+        excluded=_segment_targets(segment, "excluded", "excludedContexts"),
+        rules=[
+            CompiledSegmentRule(
+                clauses=[_compile_clause(c) for c in rule.get("clauses", []) or []],
+                weight=rule.get("weight"),
+                bucket_by=rule.get("bucketBy") or "key",
+                context_kind=rule.get("rolloutContextKind") or "user"
+            )
+            for rule in segment.get("rules", []) or []
+        ],
+        unbounded=bool(segment.get("unbounded", False))
+    )
+
+def _in_targets(targets: Dict[str, FrozenSet[str]], context: Dict) -> bool:
+    for kind, keys in targets.items():
+        single = context_for_kind(context, kind)
+        if single is not None and str(single.get("key", "")) in keys:
+            return True
+    return False
+
+# ---------------------------------------------------------------------------
+# Bucketing
+# ---------------------------------------------------------------------------
+
+def bucket_context(context: Dict, flag_key: str, salt: str, bucket_by: str = "key",
+                   context_kind: str = "user", seed: Optional[int] = None) -> Optional[float]:
+    """Deterministic bucket in [0, 1) matching LaunchDarkly's SHA-1 bucketing"""
+    single = context_for_kind(context, context_kind)
+    if single is None:
+        return None
+    value = get_attribute(single, bucket_by, context_kind)
+    if isinstance(value, bool) or value is _MISSING or value is None:
+        return 0.0
+    if isinstance(value, float):
+        if not value.is_integer():
+            return 0.0
+        value = int(value)
+    if not isinstance(value, (str, int)):
+        return 0.0
+    prefix = str(seed) if seed is not None else f"{flag_key}.{salt}"
+    digest = hashlib.sha1(f"{prefix}.{value}".encode("utf-8")).hexdigest()[:15]
+    return int(digest, 16) / BUCKET_HASH_SCALE
+
+def _resolve_serve(compiled: CompiledFlag, serve: VariationOrRollout, context: Dict) -> Tuple[Optional[int], Optional[float]]:
+    if serve.rollout is None:
+        return serve.variation, None
+    rollout = serve.rollout
+    bucket = bucket_context(context, compiled.key, compiled.salt, rollout.bucket_by, rollout.context_kind, rollout.seed)
+    if bucket is None:
+        bucket = 0.0
+    cumulative = 0.0
+    for variation, weight in rollout.variations:
+        cumulative += weight / ROLLOUT_WEIGHT_SCALE
+        if bucket < cumulative:
+            return variation, bucket
+    # Rounding gaps fall into the last bucket
+    return rollout.variations[-1][0], bucket
+
+# ---------------------------------------------------------------------------
+# Evaluator
+# ---------------------------------------------------------------------------
+
+class FlagEvaluator:
+    """Evaluates contexts against flags, caching compiled configs by (key, _version, env).
+
+    ``flag_lookup`` resolves prerequisite flags by key (e.g. the API client's get_flag);
+    without it prerequisites are reported as not met. ``segment_lookup`` resolves
+    segments for segmentMatch clauses; compiled segments are reused for
+    ``segment_ttl`` seconds, so evaluations never wait on a lookup per context.
+    """
+
+    def __init__(self, flag_lookup: Optional[FlagLookup] = None, max_compiled: int = 256,
+                 segment_lookup: Optional[SegmentLookup] = None, segment_ttl: float = 300):
+        self.flag_lookup = flag_lookup
+        self.segment_lookup = segment_lookup
+        self.segment_ttl = segment_ttl
+        self.max_compiled = max_compiled
+        self._compiled: "OrderedDict[Tuple, CompiledFlag]" = OrderedDict()
+        self._segments: "OrderedDict[Tuple, Tuple[float, Optional[CompiledSegment]]]" = OrderedDict()
+        self._lock = Lock()
+
+    def compile(self, flag: Dict, env_key: Optional[str] = None, env_data: Optional[Dict] = None) -> CompiledFlag:
+        cache_key = (flag.get("key"), flag.get("_version"), env_key)
+        cacheable = env_key is not None and flag.get("_version") is not None
+        if cacheable:
+            with self._lock:
+                compiled = self._compiled.get(cache_key)
+                if compiled is not None:
+                    self._compiled.move_to_end(cache_key)
+                    return compiled
+        compiled = compile_flag(flag, env_key, env_data)
+        if cacheable:
+            with self._lock:
+                self._compiled[cache_key] = compiled
+                while len(self._compiled) > self.max_compiled:
+                    self._compiled.popitem(last=False)
+        return compiled
+
+    def get_segment(self, env_key: Optional[str], segment_key: str) -> Optional[CompiledSegment]:
+        """Compiled segment for an environment, looked up at most once per segment_ttl"""
+        cache_key = (env_key, segment_key)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._segments.get(cache_key)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+
+        previous = cached[1] if cached is not None else None
+        segment = None
+        if self.segment_lookup:
+            try:
+                segment = self.segment_lookup(env_key, segment_key)
+            except Exception as e:
+                # Keep serving the last known segment rather than caching the failure
+                logger.debug(f"Segment lookup failed for {segment_key} in {env_key}: {e}")
+                return previous
+        compiled = None
+        if segment:
+            version = segment.get("version", segment.get("_version"))
+            if previous is not None and version is not None and previous.version == version:
+                compiled = previous
+            else:
+                compiled = compile_segment(segment)
+            if compiled.unbounded:
+                logger.debug(f"Segment {segment_key} is unbounded (big segment); membership is not evaluated locally")
+
+        with self._lock:
+            self._segments[cache_key] = (now + self.segment_ttl, compiled)
+            self._segments.move_to_end(cache_key)
+            while len(self._segments) > self.max_compiled:
+                self._segments.popitem(last=False)
+        return compiled
+
+    def clear_segments(self):
+        """Drop compiled segments so the next evaluation looks them up again"""
+        with self._lock:
+            self._segments.clear()
+
+    def _segment_matcher(self, env_key: Optional[str], visited: FrozenSet[str] = frozenset()) -> SegmentMatcher:
+        def match(segment_key: str, context: Dict) -> bool:
+            return self._match_segment(env_key, segment_key, context, visited)
+        return match
+
+    def _match_segment(self, env_key: Optional[str], segment_key: str, context: Dict,
+                       visited: FrozenSet[str]) -> bool:
+        """LaunchDarkly segment membership: included, then excluded, then rules"""
+        if segment_key in visited:
+            logger.debug(f"Segment cycle through {segment_key}")
+            return False
+        segment = self.get_segment(env_key, segment_key)
+        if segment is None or segment.unbounded:
+            return False
+        if _in_targets(segment.included, context):
+            return True
+        if _in_targets(segment.excluded, context):
+            return False
+
+        nested = self._segment_matcher(env_key, visited | {segment_key})
+        for rule in segment.rules:
+            if not rule.clauses or not all(clause.matches(context, nested) for clause in rule.clauses):
+                continue
+            if rule.weight is None:
+                return True
+            bucket = bucket_context(context, segment.key, segment.salt, rule.bucket_by, rule.context_kind)
+            if bucket is not None and bucket < rule.weight / ROLLOUT_WEIGHT_SCALE:
+                return True
+        return False
+
+    def resolve_prerequisites(self, flag: Dict, env_key: Optional[str]) -> PrerequisiteGraph:
+        """Fetch the flag's whole prerequisite chain, one concurrent batch per level.
+
+        Pass the graph to evaluate() when evaluating many contexts so the chain is
+        resolved once rather than per context.
+        """
+        fetch_many = concurrent_fetcher(self.flag_lookup) if self.flag_lookup else (lambda keys: {})
+        return build_prerequisite_graph(flag, env_key, fetch_many)
+
+    def evaluate(self, flag: Dict, env_key: Optional[str], context: Dict,
+                 env_data: Optional[Dict] = None, trace: bool = False,
+                 prerequisites: Optional[PrerequisiteGraph] = None) -> EvaluationDetail:
+        """Evaluate one context; with ``trace=True`` the detail carries an EvaluationTrace.
+
+        Prerequisites come from ``prerequisites`` or are resolved up front; each
+        prerequisite flag is evaluated at most once per call however often the
+        chain reaches it.
+        """
+        recorder = EvaluationTrace() if trace else None
+        try:
+            started = time.perf_counter() if recorder is not None else 0.0
+            compiled = self.compile(flag, env_key, env_data)
+            if recorder is not None:
+                recorder.add("compile", compiled.key, True, started, f"version {compiled.version}")
+            if compiled.prerequisites and prerequisites is None:
+                started = time.perf_counter() if recorder is not None else 0.0
+                prerequisites = self.resolve_prerequisites(flag, env_key)
+                if recorder is not None:
+                    recorder.add("resolve", f"{len(prerequisites.flags) - 1} prerequisite flags", True, started,
+                                 f"{prerequisites.fetch_batches} fetch batches")
+            detail = self._evaluate(compiled, context, visited=frozenset(), trace=recorder,
+                                    graph=prerequisites, memo={})
+        except Exception as e:
+            logger.debug(f"Evaluation of {flag.get('key')} failed: {e}")
+            detail = EvaluationDetail(ERROR, None, None, f"Evaluation error: {e}")
+        detail.trace = recorder
+        return detail
+
+    def _evaluate(self, compiled: CompiledFlag, context: Dict, visited: FrozenSet[str],
+                  trace: Optional[EvaluationTrace] = None, graph: Optional[PrerequisiteGraph] = None,
+                  memo: Optional[Dict[str, Tuple[bool, EvaluationDetail]]] = None) -> EvaluationDetail:
+        if not compiled.on:
+            if trace is not None:
+                trace.add("off", compiled.key, True, time.perf_counter())
+            return EvaluationDetail(
+                OFF, compiled.off_variation, compiled.variation_value(compiled.off_variation),
+                "Flag is disabled in this environment"
+            )
+
+        started = time.perf_counter() if trace is not None else 0.0
+        failed = self._failed_prerequisite(compiled, context, visited | {compiled.key}, graph, memo)
+        if trace is not None and compiled.prerequisites:
+            trace.add("prerequisites", ", ".join(k for k, _ in compiled.prerequisites), not failed, started,
+                      f"'{failed}' not met" if failed else "")
+        if failed:
+            if graph is not None and failed in graph.cycle_keys:
+                message = f"Prerequisite flag '{failed}' is part of a prerequisite cycle"
+            else:
+                message = f"Prerequisite flag '{failed}' is not serving the required variation"
+            return EvaluationDetail(
+                PREREQUISITE_FAILED, compiled.off_variation, compiled.variation_value(compiled.off_variation),
+                message, prerequisite_key=failed
+            )
+
+        for target in compiled.targets:
+            started = time.perf_counter() if trace is not None else 0.0
+            single = context_for_kind(context, target.context_kind)
+            matched = single is not None and str(single.get("key", "")) in target.keys
+            if trace is not None:
+                trace.add("target", f"#{target.index}", matched, started,
+                          f"{len(target.keys)} {target.context_kind} keys")
+            if matched:
+                return EvaluationDetail(
+                    TARGET_MATCH, target.variation, compiled.variation_value(target.variation),
+                    f"Context '{single.get('key')}' matches target rule",
+                    target_index=target.index
+                )
+
+        segment_match = self._segment_matcher(compiled.env_key) if compiled.segment_keys else None
+        candidates: Dict[str, FrozenSet[int]] = {}
+        for rule in compiled.rules:
+            started = time.perf_counter() if trace is not None else 0.0
+            attribute = rule.index_attribute
+            if attribute:
+                if attribute not in candidates:
+                    candidates[attribute] = self._indexed_rules(compiled, context, attribute)
+                if rule.index not in candidates[attribute]:
+                    if trace is not None:
+                        trace.add("rule", self._rule_label(rule), False, started, f"{attribute} not listed (index)")
+                    continue
+            matched = rule.matches(context, segment_match)
+            if trace is not None:
+                trace.add("rule", self._rule_label(rule), matched, started,
+                          "" if matched else rule.explain_miss(context, segment_match))
+            if matched:
+                variation, bucket = _resolve_serve(compiled, rule.serve, context)
+                message = f"User context matches rule: {rule.description or 'Custom rule'}"
+                if bucket is not None:
+                    message += f" (rollout bucket {bucket:.3%})"
+                return EvaluationDetail(
+                    RULE_MATCH, variation, compiled.variation_value(variation), message,
+                    rule_index=rule.index, rule_id=rule.rule_id, description=rule.description, bucket=bucket
+                )
+
+        started = time.perf_counter() if trace is not None else 0.0
+        variation, bucket = _resolve_serve(compiled, compiled.fallthrough, context)
+        if trace is not None:
+            trace.add("fallthrough", compiled.key, True, started,
+                      f"bucket {bucket:.5f}" if bucket is not None else "")
+        message = "User context matches fallthrough (default) behavior"
+        if bucket is not None:
+            message += f" (rollout bucket {bucket:.3%})"
+        return EvaluationDetail(FALLTHROUGH, variation, compiled.variation_value(variation), message, bucket=bucket)
+
+    @staticmethod
+    def _rule_label(rule: CompiledRule) -> str:
+        return f"#{rule.index} {rule.description}" if rule.description else f"#{rule.index}"
+
+    @staticmethod
+    def _indexed_rules(compiled: CompiledFlag, context: Dict, attribute: str) -> FrozenSet[int]:
+        """Rules whose indexed clause lists the context's value for attribute"""
+        index = compiled.clause_indexes.get(attribute)
+        single = context_for_kind(context, "user")
+        if index is None or single is None:
+            return frozenset()
+        value = get_attribute(single, attribute, "user")
+        if value is _MISSING or value is None:
+            return frozenset()
+        values = value if isinstance(value, list) else [value]
+        return frozenset(i for v in values for i in index.rules_for(v))
+
+    def _failed_prerequisite(self, compiled: CompiledFlag, context: Dict, visited: FrozenSet[str],
+                             graph: Optional[PrerequisiteGraph] = None,
+                             memo: Optional[Dict[str, Tuple[bool, EvaluationDetail]]] = None) -> Optional[str]:
+        """Key of the first prerequisite that is not met, or None.
+
+        Prerequisite flags come from the resolved graph (falling back to flag_lookup);
+        ``memo`` holds each prerequisite's (on, result) for the current context.
+        """
+        memo = {} if memo is None else memo
+        for prereq_key, required_variation in compiled.prerequisites:
+            if prereq_key in visited or (graph is not None and prereq_key in graph.cycle_keys):
+                logger.debug(f"Prerequisite cycle through {prereq_key}")
+                return prereq_key
+            if prereq_key not in memo:
+                if graph is not None:
+                    prereq_flag = graph.get(prereq_key)
+                else:
+                    prereq_flag = self.flag_lookup(prereq_key) if self.flag_lookup else None
+                if not prereq_flag:
+                    return prereq_key
+                prereq = self.compile(prereq_flag, compiled.env_key)
+                memo[prereq_key] = (prereq.on, self._evaluate(prereq, context, visited, graph=graph, memo=memo))
+            prereq_on, result = memo[prereq_key]
+            if not prereq_on or result.variation_index != required_variation:
+                return prereq_key
+        return None
+
+def evaluate_flag(flag: Dict, env_key: Optional[str], context: Dict,
+                  flag_lookup: Optional[FlagLookup] = None, trace: bool = False) -> EvaluationDetail:
+    """One-off evaluation (no compile cache)"""
+    return FlagEvaluator(flag_lookup).evaluate(flag, env_key, context, trace=trace)
@@ -0,0 +1,138 @@
+"""
+Prerequisite Graph
+Resolves the prerequisite chain of a flag in one environment: every flag the
+chain needs is fetched level by level, each level as one concurrent batch,
+and the resulting dependency graph is checked for cycles.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keys -> {key: flag JSON}; keys that cannot be fetched are simply absent
+FlagBatchLookup = Callable[[List[str]], Dict[str, Dict]]
+
+DEFAULT_FETCH_WORKERS = 8
+
+def prerequisites_of(flag: Dict, env_key: Optional[str]) -> List[Tuple[str, int]]:
+    """(prerequisite key, required variation) pairs of a flag in one environment"""
+    env_data = (flag.get("environments", {}) or {}).get(env_key, {}) or {}
+    return [(p.get("key"), p.get("variation")) for p in env_data.get("prerequisites", []) or [] if p.get("key")]
+
+def concurrent_fetcher(lookup: Callable[[str], Optional[Dict]],
+                       max_workers: int = DEFAULT_FETCH_WORKERS) -> FlagBatchLookup:
+    """Turn a single-flag lookup into a batch lookup that fetches keys concurrently"""
+    def fetch_many(keys: List[str]) -> Dict[str, Dict]:
+        if not keys:
+            return {}
+
+        def fetch(key: str) -> Optional[Dict]:
+            try:
+                return lookup(key)
+            except Exception as e:
+                logger.debug(f"Prerequisite fetch failed for {key}: {e}")
+                return None
+
+        if len(keys) == 1:
+            flags = [fetch(keys[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(keys)), thread_name_prefix="ld-prereqs") as pool:
+                flags = list(pool.map(fetch, keys))
+        return {key: flag for key, flag in zip(keys, flags) if flag}
+    return fetch_many
+
+def find_cycles(edges: Dict[str, List[str]]) -> List[List[str]]:
+    """Cycles in a dependency graph, each as the list of keys on the cycle"""
+    cycles: List[List[str]] = []
+    state: Dict[str, int] = {}  # 1 = on the current path, 2 = finished
+    path: List[str] = []
+
+    def visit(key: str):
+        state[key] = 1
+        path.append(key)
+        for child in edges.get(key, []):
+            if state.get(child) == 1:
+                cycles.append(path[path.index(child):])
+            elif child not in state:
+                visit(child)
+        path.pop()
+        state[key] = 2
+
+    for key in edges:
+        if key not in state:
+            visit(key)
+    return cycles
+
+@dataclass
+class PrerequisiteGraph:
+    """Every flag a root flag's prerequisite chain needs, plus the chain's shape"""
+    root: str
+    env_key: Optional[str]
+    flags: Dict[str, Dict] = field(default_factory=dict)
+    edges: Dict[str, List[Tuple[str, int]]] = field(default_factory=dict)
+    missing: Set[str] = field(default_factory=set)
+    cycles: List[List[str]] = field(default_factory=list)
+    fetch_batches: int = 0
+
+    @property
+    def cycle_keys(self) -> Set[str]:
+        return {key for cycle in self.cycles for key in cycle}
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.flags.get(key)
+
+    def order(self) -> List[str]:
+        """Prerequisites before their dependents (flags on a cycle are left out)"""
+        blocked = self.cycle_keys
+        ordered: List[str] = []
+        seen: Set[str] = set()
+
+        def visit(key: str):
+            if key in seen or key in blocked:
+                return
+            seen.add(key)
+            for child, _ in self.edges.get(key, []):
+                visit(child)
+            ordered.append(key)
+
+        visit(self.root)
+        return ordered
+
+def build_prerequisite_graph(flag: Dict, env_key: Optional[str], fetch_many: FlagBatchLookup,
+                             known: Optional[Dict[str, Dict]] = None) -> PrerequisiteGraph:
+    """Walk a flag's prerequisites breadth-first, fetching each level in one batch.
+
+    ``known`` flags (e.g. already-fetched listings) are used without fetching.
+    """
+    root = flag.get("key", "")
+    graph = PrerequisiteGraph(root=root, env_key=env_key, flags={root: flag})
+    known = known or {}
+    frontier = [root]
+    while frontier:
+        needed: List[str] = []
+        for key in frontier:
+            pairs = prerequisites_of(graph.flags[key], env_key)
+            graph.edges[key] = pairs
+            for prereq_key, _ in pairs:
+                if prereq_key not in graph.flags and prereq_key not in graph.missing and prereq_key not in needed:
+                    needed.append(prereq_key)
+
+        fetched = {key: known[key] for key in needed if key in known}
+        to_fetch = [key for key in needed if key not in fetched]
+        if to_fetch:
+            fetched.update(fetch_many(to_fetch))
+            graph.fetch_batches += 1
+        for key in needed:
+            if key in fetched:
+                graph.flags[key] = fetched[key]
+            else:
+                graph.missing.add(key)
+        frontier = [key for key in needed if key in fetched]
+
+    graph.cycles = find_cycles({key: [k for k, _ in pairs] for key, pairs in graph.edges.items()})
+    if graph.cycles:
+        logger.debug(f"Prerequisite cycles for {root} in {env_key}: {graph.cycles}")
+    return graph
@@ -0,0 +1,190 @@
+"""
+Evaluation Replay
+Re-evaluate recorded flag JSON against a corpus of contexts entirely offline
+and report throughput, so changes to the evaluation logic can be checked for
+performance regressions without touching the network.
+
+Usage:
+    python -m evaluation.replay flags.json contexts.csv --env DEV --repeat 5
+    python -m evaluation.replay flag.json contexts.jsonl --env onesite-general-dev --trace 3
+    python -m evaluation.replay flags.json contexts.csv --segments segments.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .batch import iter_contexts_csv
+from .evaluator import FlagEvaluator
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ReplayReport:
+    """Throughput and outcome counts for one replay run"""
+    flags: int
+    contexts: int
+    evaluations: int
+    seconds: float
+    compile_seconds: float
+    by_kind: Dict[str, int] = field(default_factory=dict)
+    by_flag: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def evals_per_sec(self) -> float:
+        return self.evaluations / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "flags": self.flags,
+            "contexts": self.contexts,
+            "evaluations": self.evaluations,
+            "seconds": round(self.seconds, 4),
+            "compile_seconds": round(self.compile_seconds, 4),
+            "evals_per_sec": round(self.evals_per_sec, 1),
+            "by_kind": self.by_kind,
+            "by_flag": self.by_flag,
+        }
+
+def load_flags(path: str) -> List[Dict]:
+    """Flags from a recorded JSON file: one flag, a list of flags, or an API listing ({"items": [...]})"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get("items"), list):
+        data = data["items"]
+    flags = data if isinstance(data, list) else [data]
+    return [flag for flag in flags if isinstance(flag, dict) and flag.get("key")]
+
+def load_segments(path: str) -> Dict[str, Dict]:
+    """Segments from a recorded JSON file (API listing, list, or {key: segment}) keyed by segment key"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get("items"), list):
+        data = data["items"]
+    if isinstance(data, dict):
+        data = list(data.values()) if "key" not in data else [data]
+    return {s["key"]: s for s in data if isinstance(s, dict) and s.get("key")}
+
+def load_contexts(path: str) -> List[Dict]:
+    """Contexts from CSV (PmcId/SiteId columns, as for batch evaluation), JSON Lines or a JSON list"""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return list(iter_contexts_csv(f))
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return [c for c in json.loads(stripped) if isinstance(c, dict)]
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def offline_evaluator(flags: List[Dict], segments: Optional[Dict[str, Dict]] = None) -> FlagEvaluator:
+    """Evaluator resolving prerequisites and segments from recorded data only"""
+    by_key = {flag["key"]: flag for flag in flags}
+    segments = segments or {}
+    return FlagEvaluator(flag_lookup=by_key.get, segment_lookup=lambda env_key, key: segments.get(key))
+
+def replay(flags: List[Dict], env_key: str, contexts: List[Dict], repeat: int = 1,
+           evaluator: Optional[FlagEvaluator] = None, segments: Optional[Dict[str, Dict]] = None) -> ReplayReport:
+    """Evaluate every context against every flag ``repeat`` times and time it.
+
+    Prerequisites and segments are resolved from the recorded data only. Compilation
+    and prerequisite resolution are timed separately so the throughput figure
+    reflects evaluation alone.
+    """
+    evaluator = evaluator or offline_evaluator(flags, segments)
+
+    started = time.perf_counter()
+    graphs = {}
+    for flag in flags:
+        if evaluator.compile(flag, env_key).prerequisites:
+            graphs[flag["key"]] = evaluator.resolve_prerequisites(flag, env_key)
+    compile_seconds = time.perf_counter() - started
+
+    by_kind: Counter = Counter()
+    by_flag: Dict[str, Counter] = {flag["key"]: Counter() for flag in flags}
+    evaluations = 0
+    started = time.perf_counter()
+    for _ in range(max(1, repeat)):
+        for flag in flags:
+            counts = by_flag[flag["key"]]
+            graph = graphs.get(flag["key"])
+            for context in contexts:
+                kind = evaluator.evaluate(flag, env_key, context, prerequisites=graph).kind
+                counts[kind] += 1
+                by_kind[kind] += 1
+                evaluations += 1
+    seconds = time.perf_counter() - started
+
+    return ReplayReport(
+        flags=len(flags),
+        contexts=len(contexts),
+        evaluations=evaluations,
+        seconds=seconds,
+        compile_seconds=compile_seconds,
+        by_kind=dict(by_kind),
+        by_flag={key: dict(counts) for key, counts in by_flag.items()}
+    )
+
+def _resolve_env(env: str) -> str:
+    try:
+        from shared.constants import ENVIRONMENT_MAPPINGS
+    except ImportError:
+        return env
+    return ENVIRONMENT_MAPPINGS.get(env.upper(), env)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m evaluation.replay",
+        description="Re-evaluate recorded flags against a context corpus offline and report evaluations/sec.")
+    parser.add_argument("flags", help="Recorded flag JSON (single flag, list, or API listing)")
+    parser.add_argument("contexts", help="Context corpus: .csv (PmcId/SiteId), .jsonl or JSON list")
+    parser.add_argument("--segments", default=None,
+                        help="Recorded segment JSON for segmentMatch clauses (API listing or list)")
+    parser.add_argument("--env", default="DEV", help="Environment label (DEV/OCRT/SAT/PROD) or key")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the corpus this many times")
+    parser.add_argument("--trace", type=int, default=0, metavar="N",
+                        help="Print evaluation traces for the first N contexts of each flag")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--min-evals-per-sec", type=float, default=None,
+                        help="Exit with status 1 if throughput falls below this rate")
+    args = parser.parse_args(argv)
+
+    env_key = _resolve_env(args.env)
+    flags = load_flags(args.flags)
+    contexts = load_contexts(args.contexts)
+    segments = load_segments(args.segments) if args.segments else {}
+    if not flags or not contexts:
+        print("Nothing to replay: no flags or no contexts loaded", file=sys.stderr)
+        return 2
+
+    if args.trace:
+        # Separate evaluator so the traced runs do not pre-warm the timed replay
+        evaluator = offline_evaluator(flags, segments)
+        for flag in flags:
+            for context in contexts[:args.trace]:
+                detail = evaluator.evaluate(flag, env_key, context, trace=True)
+                print(f"{flag['key']} {json.dumps(context)} -> {detail.kind} variation={detail.variation_index}")
+                print("  " + detail.trace.format().replace("\n", "\n  "))
+
+    report = replay(flags, env_key, contexts, args.repeat, segments=segments)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(f"{report.evaluations:,} evaluations ({report.flags} flags x {report.contexts:,} contexts x "
+              f"{max(1, args.repeat)}) in {report.seconds:.3f}s: {report.evals_per_sec:,.0f} evals/sec "
+              f"(compile {report.compile_seconds * 1000:.1f}ms)")
+        for kind, count in sorted(report.by_kind.items()):
+            print(f"  {kind}: {count:,}")
+
+    if args.min_evals_per_sec is not None and report.evals_per_sec < args.min_evals_per_sec:
+        print(f"Throughput {report.evals_per_sec:,.0f}/s is below {args.min_evals_per_sec:,.0f}/s", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""Featureflag package.
+Headless command line entry point (``python -m featureflag``); no tkinter/ttkbootstrap imports.
+"""
+
+from .cli import main
+
+__all__ = ['main']
@@ -0,0 +1,489 @@
+"""
+Headless Command Line Interface
+Get, evaluate, toggle (one or many), PMC-target, promote, list and export flags
+without a display.
+Nothing here imports tkinter or ttkbootstrap: commands reuse the API client,
+the local evaluator and the targeting package, and stream one JSON object per
+line to stdout (logs go to stderr) so runbooks and automation can parse the
+output and run several invocations in parallel.
+
+Usage:
+    python -m featureflag get my-flag --env ALL
+    python -m featureflag evaluate my-flag --env DEV --pmc 4341841 --site 4341842
+    python -m featureflag evaluate my-flag --env ALL --contexts contexts.csv
+    python -m featureflag toggle my-flag --env DEV --on
+    python -m featureflag bulk-toggle release-night.txt --user jdoe
+    python -m featureflag pmc-target my-flag --env SAT --pmc 4341841 4341842 --off
+    python -m featureflag pmc-target my-flag --env DEV --pmc-file pmcs.txt --on
+    python -m featureflag pmc-target my-flag --env DEV --pmc 4341841 --on --dry-run
+    python -m featureflag promote my-flag other-flag --from DEV --to OCRT --dry-run
+    python -m featureflag list --env PROD
+    python -m featureflag export --format csv --output flags.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import logging
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from shared.constants import ENVIRONMENT_MAPPINGS, READ_ENVIRONMENT_OPTIONS, UPDATE_ENVIRONMENT_OPTIONS
+from targeting.pipeline import DEFAULT_GUARD, DEFAULT_MAX_ATTEMPTS, GUARDS
+
+logger = logging.getLogger(__name__)
+
+ALL_ENVIRONMENTS = "ALL"
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+EXPORT_COLUMNS = ["key", "name", "status", "temporary", "tags", "lastModified"]
+
+def emit(record: Dict, out=None):
+    """Write one JSON Lines record and flush so consumers see it immediately"""
+    out = out or sys.stdout
+    out.write(json.dumps(record, default=str) + "\n")
+    out.flush()
+
+def resolve_environments(environment: str) -> List[str]:
+    """LaunchDarkly environment keys for a label (DEV/OCRT/SAT/PROD), key, or ALL"""
+    if environment.upper() == ALL_ENVIRONMENTS:
+        return [ENVIRONMENT_MAPPINGS[label] for label in READ_ENVIRONMENT_OPTIONS]
+    return [ENVIRONMENT_MAPPINGS.get(environment.upper(), environment)]
+
+def _client():
+    from api_client import get_client
+    return get_client()
+
+def _login(username: Optional[str]):
+    """Attribute write comments and audit entries to a user, as the login window does"""
+    if not username:
+        return
+    from shared.user_session import user_session
+    # login() announces the session on stdout; keep stdout pure JSON Lines
+    with contextlib.redirect_stdout(sys.stderr):
+        user_session.login(username)
+
+def _environment_summary(flag: Dict, env_key: str) -> Dict:
+    env_data = (flag.get("environments", {}) or {}).get(env_key)
+    if env_data is None:
+        return {"flag": flag.get("key"), "environment": env_key, "found": False}
+    return {
+        "flag": flag.get("key"),
+        "environment": env_key,
+        "found": True,
+        "on": env_data.get("on"),
+        "version": env_data.get("_version"),
+        "rules": len(env_data.get("rules", []) or []),
+        "targets": len(env_data.get("targets", []) or []),
+        "prerequisites": len(env_data.get("prerequisites", []) or []),
+        "fallthrough": env_data.get("fallthrough"),
+        "offVariation": env_data.get("offVariation"),
+        "lastModified": env_data.get("lastModified"),
+    }
+
+def _flag_summary(flag: Dict, env_keys: Iterable[str]) -> Dict:
+    environments = flag.get("environments", {}) or {}
+    return {
+        "key": flag.get("key"),
+        "name": flag.get("name"),
+        "status": "Archived" if flag.get("archived") else "Active",
+        "temporary": flag.get("temporary"),
+        "tags": flag.get("tags", []),
+        "lastModified": flag.get("lastModifiedDateTime"),
+        "environments": {env_key: (environments.get(env_key) or {}).get("on") for env_key in env_keys},
+    }
+
+def _fetch_flag(client, flag_key: str) -> Optional[Dict]:
+    """Raw flag JSON, or None (after emitting a not-found record) when it cannot be fetched"""
+    try:
+        flag = client.get_flag_raw(flag_key)
+    except Exception as e:
+        logger.debug(f"Fetching {flag_key} failed: {e}")
+        flag = None
+    if not flag:
+        emit({"flag": flag_key, "found": False})
+    return flag
+
+def cmd_get(args) -> int:
+    client = _client()
+    status = EXIT_OK
+    for flag_key in args.flags:
+        flag = _fetch_flag(client, flag_key)
+        if not flag:
+            status = EXIT_FAILED
+            continue
+        if not args.env:
+            emit(flag)
+            continue
+        for env_key in resolve_environments(args.env):
+            emit(_environment_summary(flag, env_key))
+    return status
+
+def _contexts(args) -> List[Dict]:
+    from evaluation.batch import build_context
+    from evaluation.replay import load_contexts
+    if args.contexts:
+        return load_contexts(args.contexts)
+    if args.context:
+        return [json.loads(args.context)]
+    return [build_context(args.pmc, args.site)]
+
+def cmd_evaluate(args) -> int:
+    from evaluation import FlagEvaluator
+
+    client = _client()
+    evaluator = FlagEvaluator(flag_lookup=client.get_flag_raw, segment_lookup=client.get_segment)
+    env_keys = resolve_environments(args.env)
+    contexts = _contexts(args)
+    status = EXIT_OK
+    for flag_key in args.flags:
+        flag = _fetch_flag(client, flag_key)
+        if not flag:
+            status = EXIT_FAILED
+            continue
+        environments = flag.get("environments", {}) or {}
+        # Resolve each environment's prerequisite chain once for the whole corpus
+        graphs = {env_key: evaluator.resolve_prerequisites(flag, env_key)
+                  for env_key in env_keys if env_key in environments}
+        for context in contexts:
+            for env_key in env_keys:
+                record = {"flag": flag_key, "environment": env_key, "context": context}
+                if env_key not in graphs:
+                    record["found"] = False
+                    emit(record)
+                    continue
+                detail = evaluator.evaluate(flag, env_key, context, trace=args.trace,
+                                            prerequisites=graphs[env_key])
+                record.update(detail.to_dict())
+                record["kind"] = detail.kind
+                emit(record)
+    return status
+
+def _update_environment(environment: str) -> Optional[str]:
+    """Writes are limited to the Update tab's environments (no PROD)"""
+    label = environment.upper()
+    if label in UPDATE_ENVIRONMENT_OPTIONS:
+        return label
+    for option in UPDATE_ENVIRONMENT_OPTIONS:
+        if ENVIRONMENT_MAPPINGS[option] == environment:
+            return option
+    return None
+
+def _emit_bulk_results(summary: Dict) -> int:
+    """One record per toggle, in input order; failed when any toggle failed"""
+    for result in summary["results"]:
+        emit({
+            "flag": result["feature_key"],
+            "environment": result["environment"],
+            "on": result["enabled"],
+            "success": result["success"],
+            "error": result["error"],
+            "elapsed_ms": result["elapsed_ms"],
+        })
+    return EXIT_FAILED if summary["failed"] else EXIT_OK
+
+def cmd_toggle(args) -> int:
+    from app_logic import bulk_update_flags, update_flag
+
+    environment = _update_environment(args.env)
+    if not environment:
+        emit({"error": f"Updates are limited to {', '.join(UPDATE_ENVIRONMENT_OPTIONS)}", "environment": args.env})
+        return EXIT_USAGE
+    _login(args.user)
+    if args.default is not None and args.on:
+        return _toggle_with_default(args, environment, args.default == "true")
+    if len(args.flags) > 1:
+        # Several flags run concurrently with one summarised notification and audit entry
+        changes = [(flag_key, environment, args.on) for flag_key in args.flags]
+        return _emit_bulk_results(bulk_update_flags(changes, max_workers=args.workers))
+
+    flag_key = args.flags[0]
+    success = update_flag(environment, flag_key, args.on)
+    emit({
+        "flag": flag_key,
+        "environment": ENVIRONMENT_MAPPINGS[environment],
+        "on": args.on,
+        "success": bool(success),
+    })
+    return EXIT_OK if success else EXIT_FAILED
+
+def _toggle_with_default(args, environment: str, default_value: bool) -> int:
+    """Turn flags ON and set their default rule: one GET and one JSON Patch per flag"""
+    from targeting import apply_toggle
+
+    client = _client()
+    status = EXIT_OK
+    for flag_key in args.flags:
+        success, message, _ = apply_toggle(flag_key, environment, True, fetch_flag=client.get_flag_raw,
+                                           send_patch=client.patch_flag, default_value=default_value)
+        emit({
+            "flag": flag_key,
+            "environment": ENVIRONMENT_MAPPINGS[environment],
+            "on": True,
+            "default": default_value,
+            "success": bool(success),
+            "message": message,
+        })
+        if not success:
+            status = EXIT_FAILED
+    return status
+
+def cmd_bulk_toggle(args) -> int:
+    from app_logic import bulk_update_flags, parse_bulk_changes
+
+    if args.file == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.file, encoding="utf-8-sig") as f:
+            text = f.read()
+    changes, errors = parse_bulk_changes(text)
+    normalized = []
+    for flag_key, env, enabled in changes:
+        environment = _update_environment(env)
+        if not environment:
+            errors.append(f"{flag_key}: updates are limited to {', '.join(UPDATE_ENVIRONMENT_OPTIONS)}, got '{env}'")
+        normalized.append((flag_key, environment, enabled))
+    if errors or not normalized:
+        for error in errors or ["No changes given"]:
+            emit({"error": error})
+        return EXIT_USAGE
+    _login(args.user)
+    return _emit_bulk_results(bulk_update_flags(normalized, max_workers=args.workers))
+
+def _pmc_ids(args) -> List:
+    from evaluation.batch import PMC_COLUMNS
+    from targeting import parse_pmc_ids
+    text = " ".join(args.pmc or [])
+    if args.pmc_file:
+        with open(args.pmc_file, newline="", encoding="utf-8-sig") as f:
+            text += "\n" + f.read()
+    # A "PmcId" header line in the file is not an ID
+    return [p for p in parse_pmc_ids(text) if not (isinstance(p, str) and p.lower() in PMC_COLUMNS)]
+
+def _preview_pmc_target(args, environment: str, pmc_ids: List, default_value: Optional[bool]) -> int:
+    """Dry run: emit the guarded JSON Patch and rule diff without sending anything"""
+    from targeting import preview_pmc_targeting
+
+    flag = _fetch_flag(_client(), args.flag)
+    if not flag:
+        return EXIT_FAILED
+    preview = preview_pmc_targeting(flag, environment, pmc_ids, args.on, default_value, guard=args.guard)
+    emit({"dry_run": True, "pmc_ids": pmc_ids, "on": args.on, **preview.to_dict()})
+    return EXIT_FAILED if preview.error else EXIT_OK
+
+def cmd_pmc_target(args) -> int:
+    from targeting import apply_bulk_pmc_targeting, apply_pmc_targeting
+
+    environment = _update_environment(args.env)
+    if not environment:
+        emit({"error": f"Updates are limited to {', '.join(UPDATE_ENVIRONMENT_OPTIONS)}", "environment": args.env})
+        return EXIT_USAGE
+    pmc_ids = _pmc_ids(args)
+    if not pmc_ids:
+        emit({"error": "No PMC IDs given (--pmc or --pmc-file)"})
+        return EXIT_USAGE
+    default_value = None if args.default is None else args.default == "true"
+    if args.dry_run:
+        return _preview_pmc_target(args, environment, pmc_ids, default_value)
+    _login(args.user)
+    client = _client()
+    # One PMC keeps the single-ID path; a list is fetched once and sent as one PATCH
+    apply = apply_pmc_targeting if len(pmc_ids) == 1 else apply_bulk_pmc_targeting
+    success, message, api_responses = apply(
+        args.flag,
+        environment,
+        pmc_ids[0] if len(pmc_ids) == 1 else pmc_ids,
+        args.on,
+        fetch_flag=client.get_flag_raw,
+        send_patch=client.patch_flag,
+        site_id=args.site,
+        default_value=default_value,
+        guard=args.guard,
+        max_attempts=args.max_attempts
+    )
+    record = {
+        "flag": args.flag,
+        "environment": ENVIRONMENT_MAPPINGS[environment],
+        "pmc_ids": pmc_ids,
+        "on": args.on,
+        "success": bool(success),
+        "message": message,
+    }
+    if args.verbose_responses:
+        record["api_responses"] = [r for r in api_responses if r.get("operation") != "get_flag_config"]
+    emit(record)
+    return EXIT_OK if success else EXIT_FAILED
+
+def cmd_promote(args) -> int:
+    from targeting import promote_flags
+
+    target = _update_environment(args.target)
+    if not target:
+        emit({"error": f"Updates are limited to {', '.join(UPDATE_ENVIRONMENT_OPTIONS)}", "environment": args.target})
+        return EXIT_USAGE
+    source = ENVIRONMENT_MAPPINGS.get(args.source.upper(), args.source)
+    if source == ENVIRONMENT_MAPPINGS[target]:
+        emit({"error": "Source and target environments are the same"})
+        return EXIT_USAGE
+    flag_keys = list(args.flags or [])
+    if args.flags_file:
+        with open(args.flags_file, encoding="utf-8-sig") as f:
+            flag_keys += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not flag_keys:
+        emit({"error": "No flags given (flag keys or --flags-file)"})
+        return EXIT_USAGE
+    if not args.dry_run:
+        _login(args.user)
+    client = _client()
+    results = promote_flags(flag_keys, source, target, fetch_flag=client.get_flag_raw, send_patch=client.patch_flag,
+                            mirror=args.mirror, dry_run=args.dry_run, guard=args.guard,
+                            max_attempts=args.max_attempts, max_workers=args.workers)
+    for result in results:
+        emit(result)
+    return EXIT_OK if all(r.get("success") for r in results) else EXIT_FAILED
+
+def _all_flags(args) -> List[Dict]:
+    return _client().get_all_flags(include_archived=args.archived)
+
+def cmd_list(args) -> int:
+    env_keys = resolve_environments(args.env)
+    for flag in _all_flags(args):
+        emit(_flag_summary(flag, env_keys))
+    return EXIT_OK
+
+def cmd_export(args) -> int:
+    env_keys = resolve_environments(args.env)
+    flags = _all_flags(args)
+    with (open(args.output, "w", newline="", encoding="utf-8") if args.output
+          else contextlib.nullcontext(sys.stdout)) as out:
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(EXPORT_COLUMNS + env_keys)
+            for flag in flags:
+                summary = _flag_summary(flag, env_keys)
+                row = [summary[column] for column in EXPORT_COLUMNS]
+                row[EXPORT_COLUMNS.index("tags")] = ";".join(summary["tags"] or [])
+                writer.writerow(row + [summary["environments"][env_key] for env_key in env_keys])
+        else:
+            for flag in flags:
+                emit(flag, out)
+    if args.output:
+        emit({"exported": len(flags), "format": args.format, "output": args.output})
+    return EXIT_OK
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m featureflag",
+        description="Headless LaunchDarkly flag operations with JSON Lines output.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Debug logging on stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get = commands.add_parser("get", help="Fetch flags (raw JSON, or per-environment summaries with --env)")
+    get.add_argument("flags", nargs="+", help="Flag key(s)")
+    get.add_argument("--env", default=None, help="Environment label (DEV/OCRT/SAT/PROD), key, or ALL")
+    get.set_defaults(handler=cmd_get)
+
+    evaluate = commands.add_parser("evaluate", help="Evaluate flags locally for PMC/Site contexts")
+    evaluate.add_argument("flags", nargs="+", help="Flag key(s)")
+    evaluate.add_argument("--env", default="DEV", help="Environment label (DEV/OCRT/SAT/PROD), key, or ALL")
+    evaluate.add_argument("--pmc", default=None, help="PMC ID")
+    evaluate.add_argument("--site", default=None, help="Site ID")
+    evaluate.add_argument("--context", default=None, help="Context as a JSON object (instead of --pmc/--site)")
+    evaluate.add_argument("--contexts", default=None,
+                          help="Context corpus: .csv (PmcId/SiteId), .jsonl or JSON list")
+    evaluate.add_argument("--trace", action="store_true", help="Include the evaluation trace")
+    evaluate.set_defaults(handler=cmd_evaluate)
+
+    toggle = commands.add_parser("toggle", help="Turn flags ON or OFF in one environment")
+    toggle.add_argument("flags", nargs="+", help="Flag key(s)")
+    toggle.add_argument("--env", required=True, help=f"Environment ({'/'.join(UPDATE_ENVIRONMENT_OPTIONS)})")
+    state = toggle.add_mutually_exclusive_group(required=True)
+    state.add_argument("--on", dest="on", action="store_true")
+    state.add_argument("--off", dest="on", action="store_false")
+    toggle.add_argument("--user", default=None, help="User to attribute the change to")
+    toggle.add_argument("--workers", type=int, default=None, help="Concurrent toggles when several flags are given")
+    toggle.add_argument("--default", choices=["true", "false"], default=None,
+                        help="With --on, also set the default rule (fallthrough/offVariation) in the same PATCH")
+    toggle.set_defaults(handler=cmd_toggle)
+
+    bulk_toggle = commands.add_parser("bulk-toggle", help="Turn many flags ON/OFF across environments in one run")
+    bulk_toggle.add_argument("file", help="Lines of '<flag> <env> <on|off>' ('-' reads stdin)")
+    bulk_toggle.add_argument("--user", default=None, help="User to attribute the changes to")
+    bulk_toggle.add_argument("--workers", type=int, default=None, help="Concurrent toggles")
+    bulk_toggle.set_defaults(handler=cmd_bulk_toggle)
+
+    pmc_target = commands.add_parser("pmc-target", help="Enable or disable a flag for PMC IDs (two-rule system)")
+    pmc_target.add_argument("flag", help="Flag key")
+    pmc_target.add_argument("--env", required=True, help=f"Environment ({'/'.join(UPDATE_ENVIRONMENT_OPTIONS)})")
+    pmc_target.add_argument("--pmc", nargs="+", default=None, help="PMC ID(s); several are applied in one PATCH")
+    pmc_target.add_argument("--pmc-file", default=None, help="File of PMC IDs (one per line, or comma separated)")
+    pmc_target.add_argument("--site", default=None, help="Site ID (recorded in the audit log)")
+    state = pmc_target.add_mutually_exclusive_group(required=True)
+    state.add_argument("--on", dest="on", action="store_true")
+    state.add_argument("--off", dest="on", action="store_false")
+    pmc_target.add_argument("--default", choices=["true", "false"], default=None,
+                            help="Also set the default rule (fallthrough) and offVariation")
+    pmc_target.add_argument("--guard", choices=list(GUARDS), default=DEFAULT_GUARD,
+                            help="Test ops guarding the patch: the edited rules (default), the environment "
+                                 "_version, or none")
+    pmc_target.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                            help="Attempts (refetch and re-plan on conflicting edits) before giving up")
+    pmc_target.add_argument("--user", default=None, help="User to attribute the change to")
+    pmc_target.add_argument("--responses", dest="verbose_responses", action="store_true",
+                            help="Include the individual API steps in the output")
+    pmc_target.add_argument("--dry-run", action="store_true",
+                            help="Print the JSON Patch and rule diff without sending anything")
+    pmc_target.set_defaults(handler=cmd_pmc_target)
+
+    promote = commands.add_parser("promote", help="Copy PMC Enabled/Disabled rules from one environment to another")
+    promote.add_argument("flags", nargs="*", help="Flag key(s)")
+    promote.add_argument("--flags-file", default=None, help="File with one flag key per line")
+    promote.add_argument("--from", dest="source", required=True, help="Source environment (DEV/OCRT/SAT/PROD)")
+    promote.add_argument("--to", dest="target", required=True,
+                         help=f"Target environment ({'/'.join(UPDATE_ENVIRONMENT_OPTIONS)})")
+    promote.add_argument("--mirror", action="store_true",
+                         help="Also remove PMC IDs the source does not list from the target's PMC rules")
+    promote.add_argument("--dry-run", action="store_true", help="Print the plan, JSON Patch and rule diff only")
+    promote.add_argument("--guard", choices=list(GUARDS), default=DEFAULT_GUARD,
+                         help="Test ops guarding each patch against concurrent edits")
+    promote.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                         help="Attempts (refetch and re-plan on conflicting edits) before giving up")
+    promote.add_argument("--workers", type=int, default=None, help="Flags promoted concurrently")
+    promote.add_argument("--user", default=None, help="User to attribute the changes to")
+    promote.set_defaults(handler=cmd_promote)
+
+    listing = commands.add_parser("list", help="One summary line per flag")
+    listing.add_argument("--env", default=ALL_ENVIRONMENTS, help="Environment(s) to report ON/OFF for")
+    listing.add_argument("--active-only", dest="archived", action="store_false", help="Skip archived flags")
+    listing.set_defaults(handler=cmd_list)
+
+    export = commands.add_parser("export", help="Export all flags as JSON Lines (full flags) or CSV (summaries)")
+    export.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    export.add_argument("--output", default=None, help="Output file (default: stdout)")
+    export.add_argument("--env", default=ALL_ENVIRONMENTS, help="Environment(s) for the CSV ON/OFF columns")
+    export.add_argument("--active-only", dest="archived", action="store_false", help="Skip archived flags")
+    export.set_defaults(handler=cmd_export)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from shared.config_loader import LAUNCHDARKLY_API_KEY, PROJECT_KEY
+    if not LAUNCHDARKLY_API_KEY or not PROJECT_KEY:
+        emit({"error": "LaunchDarkly API key or PROJECT_KEY is not configured"})
+        return EXIT_USAGE
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return EXIT_FAILED
+    except Exception as e:
+        logger.debug("Command failed", exc_info=True)
+        emit({"error": str(e), "command": args.command})
+        return EXIT_FAILED
@@ -7,7 +7,7 @@ import requests
 import logging
 import json
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from shared.config_loader import (
     TEAMS_ENABLED,
     GRAPH_TENANT_ID,
@@ -114,6 +114,70 @@ def build_flag_change_html(
     return "".join(html_lines)
 
 
+def _deliver(payload: dict, html: str, dry_run_override: Optional[bool] = None) -> bool:
+    """Send a prepared message via the dry-run sinks or Graph and record it in the history.
+    ``payload`` carries the history fields (type, keys, user...); ts/html/transport/ok are added here.
+    """
+    # Dry-run path: allow validation without Graph credentials
+    use_dry_run = TEAMS_DRY_RUN if dry_run_override is None else bool(dry_run_override)
+    if use_dry_run:
+        payload = dict(payload, ts=datetime.utcnow().isoformat() + "Z", html=html, transport="dry_run")
+        try:
+            if TEAMS_DRY_RUN_WEBHOOK:
+                # Post JSON to a local/dev webhook for inspection
+                r = requests.post(TEAMS_DRY_RUN_WEBHOOK, json=payload, timeout=10)
+                ok = 200 <= r.status_code < 300
+                # Always append to history as well
+                payload_hist = dict(payload)
+                payload_hist["ok"] = bool(ok)
+                payload_hist["webhook_status"] = r.status_code
+                _append_history(payload_hist)
+                if ok:
+                    logger.info("Teams dry-run webhook ok")
+                    return True
+                logger.error(f"Teams dry-run webhook failed: {r.status_code} {r.text[:200]}")
+                return False
+        except Exception as e:
+            logger.error(f"Teams dry-run webhook exception: {e}")
+            # fall through to file sink
+        try:
+            with open(TEAMS_DRY_RUN_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(payload) + "\n")
+            logger.info(f"Teams dry-run wrote to {TEAMS_DRY_RUN_FILE}")
+            # Also append to unified audit file
+            try:
+                payload_hist = dict(payload)
+                payload_hist["ok"] = True
+                _append_history(payload_hist)
+            except Exception:
+                pass
+            return True
+        except Exception as e:
+            logger.error(f"Teams dry-run file write failed: {e}")
+            return False
+
+    # Real send path
+    if not TEAMS_ENABLED:
+        return False
+    if not (TEAMS_TEAM_ID and TEAMS_CHANNEL_ID):
+        logger.info("Teams notify disabled: team/channel not configured")
+        return False
+
+    token = _get_graph_token()
+    if not token:
+        return False
+
+    ok = _post_channel_message_html(token, TEAMS_TEAM_ID, TEAMS_CHANNEL_ID, html)
+    # Append to history for visibility in Notifications tab
+    try:
+        payload_hist = dict(payload, ts=datetime.utcnow().isoformat() + "Z", html=html,
+                            transport="graph", ok=bool(ok))
+        _append_history(payload_hist)
+    except Exception:
+        pass
+    return ok
+
+
 def notify_flag_change(
     feature_key: str,
     environment: str,
@@ -138,89 +202,74 @@ def notify_flag_change(
             comment=comment,
             ld_url=ld_url,
         )
+        payload = {
+            "type": "feature_flag_change",
+            "feature_key": feature_key,
+            "environment": environment,
+            "enabled": bool(enabled),
+            "user": user,
+            "ticket": ticket or "",
+            "comment": comment or "",
+            "ld_url": ld_url or "",
+        }
+        return _deliver(payload, html, dry_run_override)
+    except Exception as e:
+        logger.error(f"notify_flag_change exception: {e}")
+        return False
 
-        # Dry-run path: allow validation without Graph credentials
-        use_dry_run = TEAMS_DRY_RUN if dry_run_override is None else bool(dry_run_override)
-        if use_dry_run:
-            payload = {
-                "ts": datetime.utcnow().isoformat() + "Z",
-                "type": "feature_flag_change",
-                "feature_key": feature_key,
-                "environment": environment,
-                "enabled": bool(enabled),
-                "user": user,
-                "ticket": ticket or "",
-                "comment": comment or "",
-                "ld_url": ld_url or "",
-                "html": html,
-                "transport": "dry_run",
-            }
-            try:
-                if TEAMS_DRY_RUN_WEBHOOK:
-                    # Post JSON to a local/dev webhook for inspection
-                    r = requests.post(TEAMS_DRY_RUN_WEBHOOK, json=payload, timeout=10)
-                    ok = 200 <= r.status_code < 300
-                    # Always append to history as well
-                    payload_hist = dict(payload)
-                    payload_hist["ok"] = bool(ok)
-                    payload_hist["webhook_status"] = r.status_code
-                    _append_history(payload_hist)
-                    if ok:
-                        logger.info("Teams dry-run webhook ok")
-                        return True
-                    logger.error(f"Teams dry-run webhook failed: {r.status_code} {r.text[:200]}")
-                    return False
-            except Exception as e:
-                logger.error(f"Teams dry-run webhook exception: {e}")
-                # fall through to file sink
-            try:
-                with open(TEAMS_DRY_RUN_FILE, "a", encoding="utf-8") as f:
-                    f.write(json.dumps(payload) + "\n")
-                logger.info(f"Teams dry-run wrote to {TEAMS_DRY_RUN_FILE}")
-                # Also append to unified audit file
-                try:
-                    payload_hist = dict(payload)
-                    payload_hist["ok"] = True
-                    _append_history(payload_hist)
-                except Exception:
-                    pass
-                return True
-            except Exception as e:
-                logger.error(f"Teams dry-run file write failed: {e}")
-                return False
 
-        # Real send path
-        if not TEAMS_ENABLED:
-            return False
-        if not (TEAMS_TEAM_ID and TEAMS_CHANNEL_ID):
-            logger.info("Teams notify disabled: team/channel not configured")
-            return False
+def build_bulk_flag_change_html(
+    results: List[dict],
+    user: str,
+    comment: Optional[str] = None,
+    max_rows: int = 100,
+) -> str:
+    ok_count = sum(1 for r in results if r.get("success"))
+    html_lines = [
+        "<b>Bulk Feature Flag Change</b>",
+        f"<div>{ok_count} of {len(results)} changes applied</div>",
+        f"<div>User: {user}</div>",
+    ]
+    if comment:
+        html_lines.append(f"<div>Comment: {comment}</div>")
+    html_lines.append("<table><tr><th>Flag</th><th>Env</th><th>Status</th><th>Result</th></tr>")
+    for r in results[:max_rows]:
+        status_text = "ON" if r.get("enabled") else "OFF"
+        result_text = "OK" if r.get("success") else f"FAILED {r.get('error') or ''}".strip()
+        html_lines.append(
+            f"<tr><td><code>{r.get('feature_key')}</code></td><td><code>{r.get('environment')}</code></td>"
+            f"<td><b>{status_text}</b></td><td>{result_text}</td></tr>"
+        )
+    html_lines.append("</table>")
+    if len(results) > max_rows:
+        html_lines.append(f"<div>... and {len(results) - max_rows} more</div>")
+    return "".join(html_lines)
 
-        token = _get_graph_token()
-        if not token:
-            return False
 
-        ok = _post_channel_message_html(token, TEAMS_TEAM_ID, TEAMS_CHANNEL_ID, html)
-        # Append to history for visibility in Notifications tab
-        try:
-            payload_hist = {
-                "ts": datetime.utcnow().isoformat() + "Z",
-                "type": "feature_flag_change",
-                "feature_key": feature_key,
-                "environment": environment,
-                "enabled": bool(enabled),
-                "user": user,
-                "ticket": ticket or "",
-                "comment": comment or "",
-                "ld_url": ld_url or "",
-                "html": html,
-                "transport": "graph",
-                "ok": bool(ok),
-            }
-            _append_history(payload_hist)
-        except Exception:
-            pass
-        return ok
+def notify_bulk_flag_change(
+    results: List[dict],
+    user: str,
+    comment: Optional[str] = None,
+    dry_run_override: Optional[bool] = None,
+) -> bool:
+    """Post one summarised message for a batch of flag toggles instead of one per flag.
+    ``results`` are the per-item dicts from app_logic.bulk_update_flags.
+    Returns True if sent, False otherwise.
+    """
+    try:
+        html = build_bulk_flag_change_html(results, user=user, comment=comment)
+        ok_count = sum(1 for r in results if r.get("success"))
+        payload = {
+            "type": "bulk_flag_change",
+            "feature_key": ",".join(sorted({str(r.get("feature_key")) for r in results})),
+            "environment": ",".join(sorted({str(r.get("environment")) for r in results})),
+            "count": len(results),
+            "failed": len(results) - ok_count,
+            "user": user,
+            "comment": comment or "",
+            "summary": f"Bulk toggle: {ok_count}/{len(results)} applied",
+        }
+        return _deliver(payload, html, dry_run_override)
     except Exception as e:
-        logger.error(f"notify_flag_change exception: {e}")
+        logger.error(f"notify_bulk_flag_change exception: {e}")
         return False
@@ -24,6 +24,7 @@ from pathlib import Path
 LOG_FILE = os.environ.get("LOG_FILE", "feature_flag.log")
 HISTORY_FILE = os.environ.get("HISTORY_FILE", "autocomplete_history.json")
 AUDIT_FILE = os.environ.get("AUDIT_FILE", "audit_events.jsonl")
+SNAPSHOT_FILE = os.environ.get("SNAPSHOT_FILE", "flag_snapshot.db")
 LAUNCHDARKLY_API_KEY = os.environ.get("LAUNCHDARKLY_API_KEY", "")
 PROJECT_KEY = os.environ.get("PROJECT_KEY", "")
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
@@ -60,6 +61,7 @@ try:
         LOG_FILE = getattr(cfg, "LOG_FILE", LOG_FILE)
         HISTORY_FILE = getattr(cfg, "HISTORY_FILE", HISTORY_FILE)
         AUDIT_FILE = getattr(cfg, "AUDIT_FILE", AUDIT_FILE)
+        SNAPSHOT_FILE = getattr(cfg, "SNAPSHOT_FILE", SNAPSHOT_FILE)
         GITHUB_TOKEN = getattr(cfg, "GITHUB_TOKEN", GITHUB_TOKEN)
         ADMIN_USERNAME = getattr(cfg, "ADMIN_USERNAME", ADMIN_USERNAME)
         ADMIN_PASSWORD = getattr(cfg, "ADMIN_PASSWORD", ADMIN_PASSWORD)
@@ -108,6 +110,7 @@ try:
                     LOG_FILE = getattr(cfg_local, "LOG_FILE", LOG_FILE)
                     HISTORY_FILE = getattr(cfg_local, "HISTORY_FILE", HISTORY_FILE)
                     AUDIT_FILE = getattr(cfg_local, "AUDIT_FILE", AUDIT_FILE)
+                    SNAPSHOT_FILE = getattr(cfg_local, "SNAPSHOT_FILE", SNAPSHOT_FILE)
                     GITHUB_TOKEN = getattr(cfg_local, "GITHUB_TOKEN", GITHUB_TOKEN)
                     ADMIN_USERNAME = getattr(cfg_local, "ADMIN_USERNAME", ADMIN_USERNAME)
                     ADMIN_PASSWORD = getattr(cfg_local, "ADMIN_PASSWORD", ADMIN_PASSWORD)
@@ -172,6 +175,7 @@ try:
                 LOG_FILE = data.get("LOG_FILE", LOG_FILE)
                 HISTORY_FILE = data.get("HISTORY_FILE", HISTORY_FILE)
                 AUDIT_FILE = data.get("AUDIT_FILE", AUDIT_FILE)
+                SNAPSHOT_FILE = data.get("SNAPSHOT_FILE", SNAPSHOT_FILE)
                 GITHUB_TOKEN = data.get("GITHUB_TOKEN", GITHUB_TOKEN)
                 ADMIN_USERNAME = data.get("ADMIN_USERNAME", ADMIN_USERNAME)
                 ADMIN_PASSWORD = data.get("ADMIN_PASSWORD", ADMIN_PASSWORD)
@@ -255,6 +259,7 @@ try:
         HISTORY_FILE = _resolve_path(_expand_path_tokens(HISTORY_FILE), ("autocomplete_history.json",))
         TEAMS_DRY_RUN_FILE = _resolve_path(_expand_path_tokens(TEAMS_DRY_RUN_FILE), ("teams_dry_run.jsonl",))
         AUDIT_FILE = _resolve_path(_expand_path_tokens(AUDIT_FILE), ("audit_events.jsonl",))
+        SNAPSHOT_FILE = _resolve_path(_expand_path_tokens(SNAPSHOT_FILE), ("flag_snapshot.db",))
 except Exception:
     pass
 
@@ -264,6 +269,7 @@ PROJECT_KEY = str(PROJECT_KEY) if PROJECT_KEY is not None else ""
 LOG_FILE = str(LOG_FILE) if LOG_FILE is not None else "feature_flag.log"
 HISTORY_FILE = str(HISTORY_FILE) if HISTORY_FILE is not None else "autocomplete_history.json"
 AUDIT_FILE = str(AUDIT_FILE) if AUDIT_FILE is not None else "audit_events.jsonl"
+SNAPSHOT_FILE = str(SNAPSHOT_FILE) if SNAPSHOT_FILE is not None else "flag_snapshot.db"
 GITHUB_TOKEN = str(GITHUB_TOKEN) if GITHUB_TOKEN is not None else ""
 ADMIN_USERNAME = str(ADMIN_USERNAME) if ADMIN_USERNAME is not None else "Admin"
 ADMIN_PASSWORD = str(ADMIN_PASSWORD) if ADMIN_PASSWORD is not None else "ia1"
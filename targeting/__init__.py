@@ -0,0 +1,25 @@
+"""Targeting package.
+UI-independent PMC targeting (two-rule system), previews and environment promotion shared by the Update tab and the CLI.
+"""
+
+from .pmc import (PmcTargetingPlan, plan_pmc_targeting, apply_pmc_targeting, build_patch_operations,
+                  pmc_targeting_operations, default_rule_operations, create_standard_pmc_rule, find_pmc_rules,
+                  boolean_variations, normalize_pmc_id, resolve_environment)
+from .pipeline import PatchOutcome, guard_operations, send_with_rebase, GUARDS, DEFAULT_GUARD
+from .bulk import (BulkPmcTargetingPlan, plan_bulk_pmc_targeting, bulk_pmc_targeting_operations,
+                   apply_bulk_pmc_targeting, parse_pmc_ids)
+from .compose import toggle_operations, apply_toggle
+from .preview import (PatchPreview, apply_json_patch, describe_environment, preview_operations,
+                      preview_pmc_targeting, preview_toggle, preview_default_rule)
+from .promote import PromotionPlan, plan_promotion, preview_promotion, apply_promotion, promote_flags
+
+__all__ = ['PmcTargetingPlan', 'plan_pmc_targeting', 'apply_pmc_targeting', 'build_patch_operations',
+           'pmc_targeting_operations', 'default_rule_operations', 'create_standard_pmc_rule', 'find_pmc_rules',
+           'boolean_variations', 'normalize_pmc_id', 'resolve_environment',
+           'PatchOutcome', 'guard_operations', 'send_with_rebase', 'GUARDS', 'DEFAULT_GUARD',
+           'BulkPmcTargetingPlan', 'plan_bulk_pmc_targeting', 'bulk_pmc_targeting_operations',
+           'apply_bulk_pmc_targeting', 'parse_pmc_ids',
+           'toggle_operations', 'apply_toggle',
+           'PatchPreview', 'apply_json_patch', 'describe_environment', 'preview_operations',
+           'preview_pmc_targeting', 'preview_toggle', 'preview_default_rule',
+           'PromotionPlan', 'plan_promotion', 'preview_promotion', 'apply_promotion', 'promote_flags']
@@ -0,0 +1,239 @@
+"""
+Bulk PMC Targeting
+Enable or disable a flag for many PMC IDs at once: the flag is fetched once,
+the minimal set of edits to the enabled/disabled PMC rules is worked out for
+the whole list, and everything is sent as a single (atomic) JSON Patch.
+"""
+
+import copy
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from evaluation import get_clause_index
+
+from .pipeline import DEFAULT_GUARD, DEFAULT_MAX_ATTEMPTS, FlagFetcher, PatchSender, send_with_rebase
+from .pmc import (PMC_ATTRIBUTE, _audit, boolean_variations, build_patch_operations, create_standard_pmc_rule,
+                  find_pmc_rules, normalize_pmc_id, resolve_environment)
+
+logger = logging.getLogger(__name__)
+
+def parse_pmc_ids(text: str) -> List:
+    """PMC IDs from free text (comma, semicolon or whitespace separated), de-duplicated in order"""
+    ids = []
+    seen = set()
+    for token in re.split(r"[\s,;]+", text or ""):
+        if not token:
+            continue
+        pmc_id = normalize_pmc_id(token)
+        if pmc_id not in seen:
+            seen.add(pmc_id)
+            ids.append(pmc_id)
+    return ids
+
+def _without_pmcs(rule: Dict, pmc_ids: Set) -> Tuple[Dict, List, bool]:
+    """Copy of a rule with the PMC IDs removed from its PmcId clause: (rule, remaining values, changed)"""
+    rule = copy.deepcopy(rule)
+    for clause in rule.get("clauses", []):
+        if clause.get("attribute") == PMC_ATTRIBUTE:
+            values = clause.get("values", [])
+            remaining = [v for v in values if normalize_pmc_id(v) not in pmc_ids]
+            clause["values"] = remaining
+            return rule, remaining, len(remaining) != len(values)
+    return rule, [], False
+
+@dataclass
+class BulkPmcTargetingPlan:
+    """Rule edits that put a list of PMC IDs into the enabled or disabled rule"""
+    pmc_ids: List
+    enable: bool
+    operations: List[Dict] = field(default_factory=list)
+    added: List = field(default_factory=list)
+    unchanged: List = field(default_factory=list)
+    removed_from: Dict[int, List] = field(default_factory=dict)
+    deleted_rules: List[int] = field(default_factory=list)
+    created_rule: bool = False
+
+    @property
+    def changes_rules(self) -> bool:
+        return bool(self.operations)
+
+    @property
+    def description(self) -> str:
+        state = "enabled" if self.enable else "disabled"
+        if not self.operations:
+            return f"All {len(self.pmc_ids)} PMC IDs already {state} - no changes needed"
+        parts = [f"{len(self.added)} PMC IDs {state}"]
+        if self.unchanged:
+            parts.append(f"{len(self.unchanged)} already {state}")
+        moved = sum(len(ids) for ids in self.removed_from.values())
+        if moved:
+            parts.append(f"{moved} removed from {len(self.removed_from)} other rule(s)")
+        if self.deleted_rules:
+            parts.append(f"deleted {len(self.deleted_rules)} empty rule(s)")
+        if self.created_rule:
+            parts.append(f"created {state} rule")
+        return ", ".join(parts)
+
+def plan_bulk_pmc_targeting(flag: Dict, env_key: str, pmc_ids: Iterable, enable: bool) -> BulkPmcTargetingPlan:
+    """Work out the minimal JSON Patch operations that move every PMC ID into the target rule.
+
+    Each PMC ID is taken out of every other rule that lists it (rules left empty are
+    removed), then the missing IDs are appended to the target rule, or a standard
+    target rule is created for them. The flag is not modified. Every changed rule
+    is replaced or removed once, whatever the number of PMC IDs. Replacements use
+    the original rule positions and come before the removals, which run from the
+    highest index down, so each operation's path is valid when it is applied.
+    """
+    env_data = (flag.get("environments", {}) or {}).get(env_key)
+    if not env_data:
+        raise ValueError(f"Environment '{env_key}' not found in flag configuration")
+
+    ids = parse_pmc_ids(" ".join(str(p) for p in pmc_ids))
+    rules = env_data.get("rules", []) or []
+    enable_variation, disable_variation = boolean_variations(flag)
+    target_variation = enable_variation if enable else disable_variation
+    enabled_rule_index, disabled_rule_index = find_pmc_rules(rules, enable_variation, disable_variation)
+    target_rule_index = enabled_rule_index if enable else disabled_rule_index
+
+    plan = BulkPmcTargetingPlan(pmc_ids=ids, enable=enable)
+    index = get_clause_index(flag, env_key, PMC_ATTRIBUTE, env_data)
+    for pmc_id in ids:
+        holding = index.rules_for(pmc_id)
+        for rule_index in holding:
+            if rule_index != target_rule_index:
+                plan.removed_from.setdefault(rule_index, []).append(pmc_id)
+        if target_rule_index >= 0 and target_rule_index in holding:
+            plan.unchanged.append(pmc_id)
+        else:
+            plan.added.append(pmc_id)
+
+    for rule_index in sorted(plan.removed_from):
+        rule, remaining, changed = _without_pmcs(rules[rule_index], set(plan.removed_from[rule_index]))
+        if not changed:
+            continue
+        if remaining:
+            plan.operations.append({"op": "replace", "path": f"/environments/{env_key}/rules/{rule_index}",
+                                    "value": rule})
+        else:
+            plan.deleted_rules.append(rule_index)
+
+    new_rule = None
+    if plan.added:
+        if target_rule_index >= 0:
+            target_rule = copy.deepcopy(rules[target_rule_index])
+            for clause in target_rule.get("clauses", []):
+                if clause.get("attribute") == PMC_ATTRIBUTE:
+                    clause.setdefault("values", []).extend(plan.added)
+                    break
+            plan.operations.append({"op": "replace", "path": f"/environments/{env_key}/rules/{target_rule_index}",
+                                    "value": target_rule})
+        else:
+            new_rule = create_standard_pmc_rule(plan.added[0], target_variation, enable)
+            new_rule["clauses"][0]["values"] = list(plan.added)
+            plan.created_rule = True
+
+    for rule_index in sorted(plan.deleted_rules, reverse=True):
+        plan.operations.append({"op": "remove", "path": f"/environments/{env_key}/rules/{rule_index}"})
+    if new_rule is not None:
+        plan.operations.append({"op": "add", "path": f"/environments/{env_key}/rules/-", "value": new_rule})
+
+    logger.debug(f"Bulk PMC plan for {flag.get('key')} in {env_key}: {len(ids)} IDs, "
+                 f"{len(plan.operations)} operations")
+    return plan
+
+def bulk_pmc_targeting_operations(flag: Dict, env_key: str, pmc_ids: Iterable, enable: bool,
+                                  default_value: Optional[bool] = None) -> Tuple[BulkPmcTargetingPlan, List[Dict]]:
+    """Plan a list of PMC IDs and the (unguarded) operations apply_bulk_pmc_targeting would send"""
+    plan = plan_bulk_pmc_targeting(flag, env_key, pmc_ids, enable)
+    if plan.changes_rules or (enable and default_value is not None):
+        return plan, build_patch_operations(flag, env_key, additional_operations=plan.operations,
+                                            default_value=default_value)
+    return plan, []
+
+def apply_bulk_pmc_targeting(flag_key: str, environment: str, pmc_ids: Iterable, enable: bool,
+                             fetch_flag: FlagFetcher, send_patch: PatchSender,
+                             site_id: Optional[str] = None,
+                             default_value: Optional[bool] = None,
+                             guard: str = DEFAULT_GUARD,
+                             max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Tuple[bool, str, List[Dict]]:
+    """Enable or disable a flag for many PMC IDs with one GET and one guarded PATCH.
+
+    Same contract as apply_pmc_targeting: returns (success, message, api_responses)
+    and writes one pmc_targeting_update audit event covering the whole list. A
+    conflicting concurrent edit costs one refetch and re-plan per retry.
+    """
+    api_responses: List[Dict] = []
+    env_key = resolve_environment(environment)
+    ids = parse_pmc_ids(" ".join(str(p) for p in pmc_ids))
+    if not ids:
+        return False, "No PMC IDs given", api_responses
+    try:
+        flag = fetch_flag(flag_key)
+        if not flag:
+            api_responses.append({"operation": "get_flag_config", "success": False,
+                                  "error": "Could not retrieve flag configuration"})
+            return False, "Could not retrieve flag configuration", api_responses
+        api_responses.append({"operation": "get_flag_config", "success": True})
+
+        if not (flag.get("environments", {}) or {}).get(env_key):
+            message = f"Environment '{env_key}' not found in flag configuration"
+            api_responses.append({"operation": "environment_check", "success": False, "error": message})
+            return False, message, api_responses
+
+        planned: Dict[str, BulkPmcTargetingPlan] = {}
+
+        def build(current: Dict) -> List[Dict]:
+            planned["plan"], operations = bulk_pmc_targeting_operations(current, env_key, ids, enable, default_value)
+            return operations
+
+        outcome = send_with_rebase(flag_key, env_key, build, fetch_flag, send_patch,
+                                   flag=flag, guard=guard, max_attempts=max_attempts)
+        plan = planned.get("plan")
+        if plan is None:
+            raise RuntimeError(outcome.error or "Could not plan bulk PMC targeting")
+        success = outcome.success
+        description = plan.description
+        apply_default = default_value is not None and (plan.changes_rules or enable)
+        if outcome.operations:
+            api_responses.append({
+                "operation": "bulk_update_flag_config",
+                "pmc_count": len(ids),
+                "added": plan.added,
+                "unchanged": plan.unchanged,
+                "removed_from": {str(k): v for k, v in plan.removed_from.items()},
+                "operations": len(outcome.operations),
+                **outcome.to_dict()
+            })
+        elif success:
+            api_responses.append({"operation": "no_changes_needed", "success": True,
+                                  "message": "PMC IDs already in correct state"})
+        if outcome.conflicts:
+            description += f" | rebased after {outcome.conflicts} conflicting edit(s)"
+
+        if apply_default:
+            _audit("default_rule_update", {
+                "feature_key": flag_key,
+                "environment": env_key,
+                "enabled": bool(default_value),
+                "note": "fallthrough/offVariation updated with bulk PMC targeting",
+            }, ok=success)
+        if not success:
+            description = f"Failed to apply bulk targeting rule changes: {outcome.error}"
+            api_responses.append({"operation": "final_result", "success": False, "error": description})
+        _audit("pmc_targeting_update", {
+            "feature_key": flag_key,
+            "environment": env_key,
+            "enabled": bool(enable),
+            "pmc_id": ",".join(str(p) for p in ids),
+            "pmc_count": len(ids),
+            "site_id": str(site_id) if site_id else "",
+            "summary": description,
+        }, ok=success)
+        return success, description, api_responses
+
+    except Exception as e:
+        logger.exception(f"Exception in bulk PMC targeting: {str(e)}")
+        api_responses.append({"operation": "exception", "success": False, "error": str(e)})
+        return False, f"Error in bulk PMC targeting: {str(e)}", api_responses
@@ -0,0 +1,110 @@
+"""
+Toggle Composition
+A global ON/OFF toggle that also sets the default rule used to be a semantic
+patch followed by a GET and a second JSON Patch. Here the toggle and the
+fallthrough/offVariation changes are composed into one JSON Patch, so the
+action is one GET plus one write, with the same audit and Teams records.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from notifications.teams import notify_flag_change
+from shared.user_session import get_current_user
+
+from .pipeline import DEFAULT_GUARD, DEFAULT_MAX_ATTEMPTS, FlagFetcher, PatchSender, send_with_rebase
+from .pmc import _audit, default_rule_operations, resolve_environment
+
+logger = logging.getLogger(__name__)
+
+def _current_value(env_data: Dict, relative_path: str):
+    target = env_data
+    for token in relative_path.split("/"):
+        if not isinstance(target, dict):
+            return None
+        target = target.get(token)
+    return target
+
+def toggle_operations(flag: Dict, env_key: str, enable: bool, default_value: Optional[bool] = None) -> List[Dict]:
+    """JSON Patch turning the environment ON/OFF, plus the default rule when enabling with ``default_value``"""
+    env_data = (flag.get("environments", {}) or {}).get(env_key)
+    if not env_data:
+        raise ValueError(f"Environment '{env_key}' not found in flag configuration")
+    operations = []
+    if bool(env_data.get("on")) != bool(enable):
+        operations.append({"op": "replace", "path": f"/environments/{env_key}/on", "value": bool(enable)})
+    if enable and default_value is not None:
+        # Only the values that actually change; an already-correct default rule costs nothing
+        operations.extend(op for op in default_rule_operations(flag, env_key, default_value)
+                          if _current_value(env_data, op["path"].split("/", 3)[-1]) != op["value"])
+    return operations
+
+def apply_toggle(flag_key: str, environment: str, enable: bool,
+                 fetch_flag: FlagFetcher, send_patch: PatchSender,
+                 default_value: Optional[bool] = None,
+                 guard: str = DEFAULT_GUARD,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Tuple[bool, str, List[Dict]]:
+    """Turn a flag ON/OFF and set the default rule in a single JSON Patch.
+
+    Writes the update_flag (and default_rule_update) audit events and the Teams
+    message that app_logic.update_flag would. Returns (success, message,
+    api_responses) like apply_pmc_targeting.
+    """
+    api_responses: List[Dict] = []
+    env_key = resolve_environment(environment)
+    state = "enabled" if enable else "disabled"
+    try:
+        flag = fetch_flag(flag_key)
+        if not flag:
+            api_responses.append({"operation": "get_flag_config", "success": False,
+                                  "error": "Could not retrieve flag configuration"})
+            return False, "Could not retrieve flag configuration", api_responses
+        api_responses.append({"operation": "get_flag_config", "success": True})
+
+        outcome = send_with_rebase(flag_key, env_key,
+                                   lambda current: toggle_operations(current, env_key, enable, default_value),
+                                   fetch_flag, send_patch, flag=flag, guard=guard, max_attempts=max_attempts)
+        success = outcome.success
+        apply_default = enable and default_value is not None
+        message = f"Flag '{flag_key}' {state} globally in {environment}"
+        if apply_default:
+            message += f", default rule {default_value}"
+        if outcome.operations:
+            api_responses.append({"operation": "toggle_with_default_rule", "operations": len(outcome.operations),
+                                  **outcome.to_dict()})
+        elif success:
+            message += " (already in requested state)"
+            api_responses.append({"operation": "no_changes_needed", "success": True})
+        if not success:
+            message = f"Failed to update flag '{flag_key}': {outcome.error}"
+
+        if success and outcome.operations:
+            try:
+                notify_flag_change(
+                    feature_key=flag_key,
+                    environment=env_key,
+                    enabled=bool(enable),
+                    user=get_current_user(),
+                    comment=message,
+                )
+            except Exception as notify_err:
+                logger.debug(f"Notify error (non-fatal): {notify_err}")
+        _audit("update_flag", {
+            "feature_key": flag_key,
+            "environment": env_key,
+            "enabled": bool(enable),
+            "summary": message,
+        }, ok=success)
+        if apply_default:
+            _audit("default_rule_update", {
+                "feature_key": flag_key,
+                "environment": env_key,
+                "enabled": bool(default_value),
+                "note": "fallthrough/offVariation updated with toggle (single patch)",
+            }, ok=success)
+        return success, message, api_responses
+
+    except Exception as e:
+        logger.exception(f"Exception in composed toggle: {str(e)}")
+        api_responses.append({"operation": "exception", "success": False, "error": str(e)})
+        return False, f"Error toggling flag: {str(e)}", api_responses
@@ -0,0 +1,151 @@
+"""
+Guarded Patch Pipeline
+Optimistic concurrency for index-based JSON Patches. Operations computed from
+a fetched flag are prefixed with test operations: the environment's _version,
+or the _id and PmcId values of every rule they touch. If someone edits the
+flag in between, LaunchDarkly rejects the patch instead of it landing on the
+wrong rule. On such a conflict the flag is refetched, the change is recomputed
+against the fresh rules and sent again, a bounded number of times.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from api_client.launchdarkly_client import PatchConflict, PatchRejected
+
+logger = logging.getLogger(__name__)
+
+# flag key -> flag JSON (None when it cannot be fetched)
+FlagFetcher = Callable[[str], Optional[Dict]]
+# (flag key, JSON Patch operations) -> success; raises PatchConflict when test ops fail
+# and PatchRejected when the guarded patch is invalid
+PatchSender = Callable[[str, List[Dict]], bool]
+
+GUARD_RULES = "rules"      # pin the rules being edited (falls back to the version guard)
+GUARD_VERSION = "version"  # pin the environment's (or flag's) _version
+GUARD_NONE = "none"
+GUARDS = (GUARD_RULES, GUARD_VERSION, GUARD_NONE)
+DEFAULT_GUARD = GUARD_RULES
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Fresh flag JSON -> operations to send (empty when nothing needs to change)
+OperationBuilder = Callable[[Dict], List[Dict]]
+
+def version_tests(flag: Dict, env_key: str) -> List[Dict]:
+    """Test op on the environment's _version, or the flag's when the environment has none"""
+    env_data = (flag.get("environments", {}) or {}).get(env_key, {}) or {}
+    if env_data.get("_version") is not None:
+        return [{"op": "test", "path": f"/environments/{env_key}/_version", "value": env_data["_version"]}]
+    if flag.get("_version") is not None:
+        return [{"op": "test", "path": "/_version", "value": flag["_version"]}]
+    return []
+
+def rule_tests(flag: Dict, env_key: str, operations: List[Dict],
+               attribute: str = "PmcId") -> Optional[List[Dict]]:
+    """Test ops pinning the _id and ``attribute`` values of every rule the operations replace or remove.
+
+    Tests run before any operation, so they address rules by their original
+    position: a replaced rule is found by the _id it carries and a removed rule
+    by its path. Returns None when the rules cannot be pinned this way, e.g. a
+    rule is added, or a touched rule has no _id.
+    """
+    rules = ((flag.get("environments", {}) or {}).get(env_key, {}) or {}).get("rules", []) or []
+    positions = {rule.get("_id"): i for i, rule in enumerate(rules) if rule.get("_id")}
+    prefix = f"/environments/{env_key}/rules/"
+    touched: List[int] = []
+    for op in operations:
+        path = op.get("path", "")
+        if not path.startswith(prefix):
+            continue
+        tail = path[len(prefix):]
+        if op.get("op") == "add" or not tail.isdigit():
+            return None
+        if op.get("op") == "replace":
+            index = positions.get((op.get("value") or {}).get("_id"))
+        else:
+            index = int(tail)
+        if index is None or index >= len(rules) or not rules[index].get("_id"):
+            return None
+        if index not in touched:
+            touched.append(index)
+
+    tests = []
+    for index in touched:
+        rule = rules[index]
+        tests.append({"op": "test", "path": f"{prefix}{index}/_id", "value": rule["_id"]})
+        for c, clause in enumerate(rule.get("clauses", []) or []):
+            if clause.get("attribute") == attribute:
+                tests.append({"op": "test", "path": f"{prefix}{index}/clauses/{c}/values",
+                              "value": clause.get("values", [])})
+    return tests
+
+def guard_operations(flag: Dict, env_key: str, operations: List[Dict], guard: str = DEFAULT_GUARD) -> List[Dict]:
+    """Prefix operations with the test ops of the chosen guard"""
+    if guard == GUARD_NONE or not operations:
+        return list(operations)
+    tests = rule_tests(flag, env_key, operations) if guard == GUARD_RULES else None
+    if tests is None:
+        tests = version_tests(flag, env_key)
+    return tests + list(operations)
+
+@dataclass
+class PatchOutcome:
+    """Result of a guarded patch, including how often it had to be rebased"""
+    success: bool = False
+    attempts: int = 0
+    conflicts: int = 0
+    operations: List[Dict] = field(default_factory=list)
+    flag: Optional[Dict] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {"success": self.success, "attempts": self.attempts, "conflicts": self.conflicts,
+                "error": self.error}
+
+def send_with_rebase(flag_key: str, env_key: str, build: OperationBuilder,
+                     fetch_flag: FlagFetcher, send_patch: PatchSender,
+                     flag: Optional[Dict] = None, guard: str = DEFAULT_GUARD,
+                     max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> PatchOutcome:
+    """Build operations from the flag, guard them and send; rebase and retry on conflicts.
+
+    ``flag`` is the already-fetched flag to build the first attempt from. After a
+    PatchConflict the flag is fetched again and ``build`` recomputes the change
+    against it. ``outcome.flag`` is the flag the last attempt was built from, and
+    ``outcome.error`` is always set when ``outcome.success`` is False.
+    """
+    outcome = PatchOutcome()
+    for attempt in range(1, max(1, max_attempts) + 1):
+        if flag is None:
+            flag = fetch_flag(flag_key)
+            if not flag:
+                outcome.error = "Could not retrieve flag configuration"
+                return outcome
+        outcome.flag = flag
+        operations = build(flag)
+        if not operations:
+            outcome.success = True
+            outcome.operations = []
+            return outcome
+
+        outcome.attempts = attempt
+        outcome.operations = guard_operations(flag, env_key, operations, guard)
+        try:
+            outcome.success = bool(send_patch(flag_key, outcome.operations))
+            if not outcome.success:
+                outcome.error = f"PATCH rejected in {env_key}"
+                logger.error(f"{outcome.error} ({flag_key})")
+            return outcome
+        except PatchRejected as e:
+            # Not a concurrent edit: the patch itself is invalid, so rebasing would fail the same way
+            outcome.error = f"PATCH rejected in {env_key}: {e}"
+            logger.error(f"{outcome.error} ({flag_key})")
+            return outcome
+        except PatchConflict as e:
+            outcome.conflicts += 1
+            logger.info(f"Patch conflict on {flag_key} in {env_key} (attempt {attempt}/{max_attempts}): {e}")
+            flag = None
+
+    outcome.error = f"Flag changed concurrently; gave up after {outcome.attempts} attempts"
+    logger.error(f"{outcome.error} ({flag_key} in {env_key})")
+    return outcome
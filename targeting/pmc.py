@@ -0,0 +1,371 @@
+"""
+PMC Targeting
+The two-rule PMC targeting system ("PMCs Enabled Rule" / "PMCs Disabled Rule")
+without any UI: planning which rules change for one PMC ID, building the JSON
+Patch operations for a flag environment, and applying them through injected
+fetch/patch callables so the Update tab and the CLI share the same logic.
+"""
+
+import copy
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from evaluation import get_clause_index
+from shared.audit import audit_event
+from shared.constants import ENVIRONMENT_MAPPINGS
+
+from .pipeline import DEFAULT_GUARD, DEFAULT_MAX_ATTEMPTS, FlagFetcher, PatchSender, send_with_rebase
+
+logger = logging.getLogger(__name__)
+
+PMC_ATTRIBUTE = "PmcId"
+ENABLED_RULE_DESCRIPTION = "PMCs Enabled Rule"
+DISABLED_RULE_DESCRIPTION = "PMCs Disabled Rule"
+
+def resolve_environment(environment: str) -> str:
+    """LaunchDarkly environment key for a label (DEV/OCRT/SAT/PROD) or key"""
+    return ENVIRONMENT_MAPPINGS.get(environment, environment)
+
+def normalize_pmc_id(pmc_id):
+    """PMC IDs are stored as numbers in the targeting rules; keep non-numeric IDs as strings"""
+    try:
+        return int(pmc_id)
+    except (TypeError, ValueError):
+        return pmc_id
+
+def boolean_variations(flag: Dict, strict: bool = False) -> Tuple[int, int]:
+    """(true index, false index) of a flag's variations, defaulting to (0, 1).
+
+    ``strict`` only accepts real booleans; otherwise values equal to True/False
+    (as the targeting rules have always matched them) count too.
+    """
+    true_index, false_index = 0, 1
+    try:
+        for i, variation in enumerate(flag.get("variations", []) or []):
+            value = variation.get("value")
+            if strict:
+                is_true, is_false = value is True, value is False
+            else:
+                is_true, is_false = value == True, value == False
+            if is_true:
+                true_index = i
+            elif is_false:
+                false_index = i
+    except Exception:
+        # Fallback to defaults if variations are unexpected
+        pass
+    return true_index, false_index
+
+def find_pmc_rules(rules: List[Dict], enable_variation: int, disable_variation: int) -> Tuple[int, int]:
+    """Indexes of the first enabled and first disabled PMC rule (-1 when absent)"""
+    enabled_rule_index = -1
+    disabled_rule_index = -1
+    for i, rule in enumerate(rules):
+        clauses = rule.get("clauses", [])
+        if not any(c.get("attribute") == PMC_ATTRIBUTE for c in clauses):
+            continue
+        description = (rule.get("description") or "").lower()
+        variation = rule.get("variation", -1)
+        if "pmcs enabled rule" in description or variation == enable_variation:
+            if enabled_rule_index == -1:
+                enabled_rule_index = i
+        elif "pmcs disabled rule" in description or variation == disable_variation:
+            if disabled_rule_index == -1:
+                disabled_rule_index = i
+    return enabled_rule_index, disabled_rule_index
+
+def create_standard_pmc_rule(pmc_id, target_variation: int, enable: bool) -> Dict:
+    """A standard PMC rule dict for the enabled/disabled state"""
+    return {
+        "variation": target_variation,
+        "description": ENABLED_RULE_DESCRIPTION if enable else DISABLED_RULE_DESCRIPTION,
+        "clauses": [
+            {
+                "attribute": PMC_ATTRIBUTE,
+                "op": "in",
+                "values": [pmc_id],
+                "negate": False
+            }
+        ],
+        "trackEvents": True
+    }
+
+def _without_pmc(rule: Dict, pmc_id) -> Tuple[Dict, List, bool]:
+    """Copy of a rule with the PMC ID removed from its PmcId clause: (rule, remaining values, changed)"""
+    rule = copy.deepcopy(rule)
+    for clause in rule.get("clauses", []):
+        if clause.get("attribute") == PMC_ATTRIBUTE:
+            values = clause.get("values", [])
+            remaining = [v for v in values if v != pmc_id and v != str(pmc_id)]
+            clause["values"] = remaining
+            return rule, remaining, len(remaining) != len(values)
+    return rule, [], False
+
+def _rule_path(env_key: str, index) -> str:
+    return f"/environments/{env_key}/rules/{index}"
+
+@dataclass
+class PmcTargetingPlan:
+    """Rule changes needed to enable or disable one PMC ID in one environment"""
+    pmc_id: object
+    enable: bool
+    target_variation: int
+    description: str
+    rule_to_apply: Optional[Dict] = None
+    rule_index: int = -1
+    operations: List[Dict] = field(default_factory=list)
+    already_targeted: bool = False
+
+    @property
+    def changes_rules(self) -> bool:
+        return self.rule_to_apply is not None or bool(self.operations)
+
+def plan_pmc_targeting(flag: Dict, env_key: str, pmc_id, enable: bool) -> PmcTargetingPlan:
+    """Work out how to move a PMC ID into the enabled or disabled rule.
+
+    The flag is not modified. ``operations`` are the removals/replacements that
+    must precede ``rule_to_apply`` (replaced at ``rule_index``, or added when -1).
+    When the PMC is already in the target rule the plan only dedupes it out of
+    the opposite rule.
+    """
+    env_data = (flag.get("environments", {}) or {}).get(env_key)
+    if not env_data:
+        raise ValueError(f"Environment '{env_key}' not found in flag configuration")
+
+    pmc_id = normalize_pmc_id(pmc_id)
+    rules = env_data.get("rules", []) or []
+    enable_variation, disable_variation = boolean_variations(flag)
+    target_variation = enable_variation if enable else disable_variation
+    enabled_rule_index, disabled_rule_index = find_pmc_rules(rules, enable_variation, disable_variation)
+    state = "enabled" if enable else "disabled"
+
+    # Which rule currently holds this PMC ID (last one wins); the index is shared
+    # with the evaluator and rebuilt only when _version changes
+    holding = get_clause_index(flag, env_key, PMC_ATTRIBUTE, env_data).rules_for(pmc_id)
+    current_rule_index = holding[-1] if holding else -1
+
+    target_rule_index = enabled_rule_index if enable else disabled_rule_index
+    source_rule_index = disabled_rule_index if enable else enabled_rule_index
+    logger.debug(f"PMC {pmc_id} in {env_key}: current rule {current_rule_index}, "
+                 f"target rule {target_rule_index}, source rule {source_rule_index}")
+
+    plan = PmcTargetingPlan(pmc_id=pmc_id, enable=enable, target_variation=target_variation, description="")
+
+    if current_rule_index == target_rule_index and target_rule_index >= 0:
+        plan.already_targeted = True
+        plan.description = f"PMC ID {pmc_id} already {state} - no changes needed"
+        # Dedupe: make sure the PMC is not also listed in the opposite rule
+        if source_rule_index >= 0:
+            source_rule, remaining, changed = _without_pmc(rules[source_rule_index], pmc_id)
+            if changed:
+                if remaining:
+                    plan.operations.append({"op": "replace", "path": _rule_path(env_key, source_rule_index),
+                                            "value": source_rule})
+                else:
+                    plan.operations.append({"op": "remove", "path": _rule_path(env_key, source_rule_index)})
+        return plan
+
+    if current_rule_index == -1 and target_rule_index == -1:
+        plan.rule_to_apply = create_standard_pmc_rule(pmc_id, target_variation, enable)
+        plan.description = f"Created first PMC targeting rule: {state} with PMC {pmc_id}"
+        return plan
+
+    # Step 1: take the PMC out of the rule that holds it, deleting the rule if it empties
+    rule_deleted = False
+    adjusted_target_index = target_rule_index
+    if current_rule_index >= 0 and current_rule_index != target_rule_index:
+        source_rule, remaining, _ = _without_pmc(rules[current_rule_index], pmc_id)
+        if not remaining:
+            plan.operations.append({"op": "remove", "path": _rule_path(env_key, current_rule_index)})
+            rule_deleted = True
+            if target_rule_index > current_rule_index:
+                adjusted_target_index = target_rule_index - 1
+        else:
+            plan.operations.append({"op": "replace", "path": _rule_path(env_key, current_rule_index),
+                                    "value": source_rule})
+
+    # Step 2: add it to the target rule, or create the target rule
+    if adjusted_target_index >= 0:
+        # The target rule's original position, so removals above it do not shift what we copy
+        target_rule = copy.deepcopy(rules[target_rule_index])
+        for clause in target_rule.get("clauses", []):
+            if clause.get("attribute") == PMC_ATTRIBUTE:
+                if pmc_id not in clause.setdefault("values", []):
+                    clause["values"].append(pmc_id)
+                break
+        plan.rule_to_apply = target_rule
+        plan.rule_index = adjusted_target_index
+        if rule_deleted:
+            plan.description = f"Deleted empty rule and moved PMC {pmc_id} to {state} rule"
+        else:
+            plan.description = f"Moved PMC {pmc_id} to {state} rule"
+    else:
+        plan.rule_to_apply = create_standard_pmc_rule(pmc_id, target_variation, enable)
+        plan.description = f"Created new {state} rule with PMC {pmc_id}"
+    return plan
+
+def default_rule_operations(flag: Dict, env_key: str, default_value: bool) -> List[Dict]:
+    """Operations serving ``default_value`` as the default rule (fallthrough) and offVariation"""
+    true_index, false_index = boolean_variations(flag, strict=True)
+    desired_index = true_index if default_value else false_index
+    env_obj = (flag.get("environments", {}) or {}).get(env_key, {}) or {}
+    fallthrough = env_obj.get("fallthrough", {}) if isinstance(env_obj, dict) else {}
+    operations = []
+    if isinstance(fallthrough, dict) and "variation" in fallthrough:
+        operations.append({"op": "replace", "path": f"/environments/{env_key}/fallthrough/variation",
+                           "value": desired_index})
+    else:
+        # Some flags (e.g. migrations) use a rollout in fallthrough; replace it with
+        # a rollout serving 100% of the selected variation
+        operations.append({
+            "op": "replace",
+            "path": f"/environments/{env_key}/fallthrough",
+            "value": {
+                "rollout": {
+                    "variations": [{"variation": desired_index, "weight": 100000}],
+                    "contextKind": "user"
+                }
+            }
+        })
+    # Also serve the selected variation while the flag is OFF
+    operations.append({"op": "replace", "path": f"/environments/{env_key}/offVariation", "value": desired_index})
+    return operations
+
+def build_patch_operations(flag: Dict, env_key: str, rule_index: int = -1, rule_to_apply: Optional[Dict] = None,
+                           additional_operations: Optional[List[Dict]] = None, ensure_on: bool = True,
+                           default_value: Optional[bool] = None) -> List[Dict]:
+    """JSON Patch operations for one environment, in the order LaunchDarkly applies them:
+    turn on, default rule, preceding removals, then the rule replace/add.
+    """
+    operations = []
+    if ensure_on:
+        operations.append({"op": "replace", "path": f"/environments/{env_key}/on", "value": True})
+    if default_value is not None:
+        try:
+            operations.extend(default_rule_operations(flag, env_key, default_value))
+        except Exception as e:
+            logger.debug(f"Skipping optional fallthrough update due to: {e}")
+    if additional_operations:
+        operations.extend(additional_operations)
+    if rule_to_apply is not None and rule_index >= 0:
+        operations.append({"op": "replace", "path": _rule_path(env_key, rule_index), "value": rule_to_apply})
+    elif rule_to_apply is not None:
+        operations.append({"op": "add", "path": _rule_path(env_key, "-"), "value": rule_to_apply})
+    return operations
+
+def pmc_targeting_operations(flag: Dict, env_key: str, pmc_id, enable: bool,
+                             default_value: Optional[bool] = None) -> Tuple[PmcTargetingPlan, List[Dict]]:
+    """Plan one PMC ID and the (unguarded) operations apply_pmc_targeting would send for it"""
+    plan = plan_pmc_targeting(flag, env_key, pmc_id, enable)
+    if plan.changes_rules:
+        # Dedupe, move and default-rule changes all go out in one patch
+        return plan, build_patch_operations(flag, env_key, plan.rule_index, plan.rule_to_apply,
+                                            plan.operations, default_value=default_value)
+    if enable and default_value is not None:
+        return plan, build_patch_operations(flag, env_key, default_value=default_value)
+    return plan, []
+
+def _audit(event_type: str, details: Dict, ok: bool):
+    try:
+        audit_event(event_type, details, ok=ok)
+    except Exception:
+        pass
+
+def apply_pmc_targeting(flag_key: str, environment: str, pmc_id, enable: bool,
+                        fetch_flag: FlagFetcher, send_patch: PatchSender,
+                        site_id: Optional[str] = None,
+                        default_value: Optional[bool] = None,
+                        guard: str = DEFAULT_GUARD,
+                        max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Tuple[bool, str, List[Dict]]:
+    """Enable or disable a flag for one PMC ID via the two-rule system.
+
+    ``fetch_flag`` returns the flag JSON and ``send_patch`` sends JSON Patch
+    operations; ``default_value`` (True/False) also sets the default rule. The
+    patch is guarded with test ops and, if the flag changed since it was read,
+    re-planned against the fresh rules (see targeting.pipeline).
+    Returns (success, message, api_responses) and writes the same audit events
+    as the Update tab.
+    """
+    api_responses: List[Dict] = []
+    env_key = resolve_environment(environment)
+    pmc_id = normalize_pmc_id(pmc_id)
+    try:
+        flag = fetch_flag(flag_key)
+        if not flag:
+            api_responses.append({"operation": "get_flag_config", "success": False,
+                                  "error": "Could not retrieve flag configuration"})
+            return False, "Could not retrieve flag configuration", api_responses
+        api_responses.append({"operation": "get_flag_config", "success": True, "data": flag})
+
+        if not (flag.get("environments", {}) or {}).get(env_key):
+            message = f"Environment '{env_key}' not found in flag configuration"
+            api_responses.append({"operation": "environment_check", "success": False, "error": message})
+            return False, message, api_responses
+
+        planned: Dict[str, PmcTargetingPlan] = {}
+
+        def build(current: Dict) -> List[Dict]:
+            planned["plan"], operations = pmc_targeting_operations(current, env_key, pmc_id, enable, default_value)
+            return operations
+
+        outcome = send_with_rebase(flag_key, env_key, build, fetch_flag, send_patch,
+                                   flag=flag, guard=guard, max_attempts=max_attempts)
+        plan = planned.get("plan")
+        if plan is None:
+            raise RuntimeError(outcome.error or "Could not plan PMC targeting")
+        success = outcome.success
+        description = plan.description
+
+        if plan.rule_to_apply is not None:
+            api_responses.append({
+                "operation": "update_flag_config",
+                "success": success,
+                "rule_index": plan.rule_index,
+                "additional_operations": plan.operations,
+                **outcome.to_dict()
+            })
+        else:
+            if plan.operations:
+                api_responses.append({
+                    "operation": "dedupe_source_rule",
+                    "success": success,
+                    "message": "Removed PMC from opposite rule to avoid duplication",
+                    **outcome.to_dict()
+                })
+                if success:
+                    description += " | deduped in opposite rule"
+            api_responses.append({"operation": "no_changes_needed", "success": True,
+                                  "message": "PMC ID already in correct state"})
+
+            # The requested default rule is applied even when no rule changes are needed
+            if enable and default_value is not None:
+                api_responses.append({"operation": "fallthrough_update", "success": success})
+                _audit("default_rule_update", {
+                    "feature_key": flag_key,
+                    "environment": env_key,
+                    "enabled": bool(default_value),
+                    "note": "fallthrough/offVariation updated in intelligent path",
+                }, ok=success)
+                if not success:
+                    logger.error("Failed to update fallthrough variation in intelligent path (no changes needed)")
+
+        if outcome.conflicts:
+            description += f" | rebased after {outcome.conflicts} conflicting edit(s)"
+        if not success:
+            description = f"Failed to apply targeting rule changes: {outcome.error}"
+            api_responses.append({"operation": "final_result", "success": False, "error": description})
+        _audit("pmc_targeting_update", {
+            "feature_key": flag_key,
+            "environment": env_key,
+            "enabled": bool(enable),
+            "pmc_id": str(pmc_id),
+            "site_id": str(site_id) if site_id else "",
+            "summary": description,
+        }, ok=success)
+        return success, description, api_responses
+
+    except Exception as e:
+        logger.exception(f"Exception in intelligent targeting: {str(e)}")
+        api_responses.append({"operation": "exception", "success": False, "error": str(e)})
+        return False, f"Error in intelligent targeting: {str(e)}", api_responses
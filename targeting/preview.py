@@ -0,0 +1,191 @@
+"""
+Dry-Run Planner
+Computes the exact JSON Patch a targeting or default-rule change would send,
+applies it locally to the fetched flag and renders a before/after diff of the
+environment's rules, so changes can be reviewed and approved before any PATCH
+is made. Planning reuses the same functions as the apply path.
+"""
+
+import copy
+import difflib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from .bulk import bulk_pmc_targeting_operations, parse_pmc_ids
+from .compose import toggle_operations
+from .pipeline import DEFAULT_GUARD, guard_operations
+from .pmc import default_rule_operations, normalize_pmc_id, pmc_targeting_operations, resolve_environment
+
+logger = logging.getLogger(__name__)
+
+class PatchTestFailed(ValueError):
+    """A test operation did not match the document it was applied to"""
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def _resolve_parent(document, path: str):
+    """(container, last token) for a JSON Pointer"""
+    tokens = [_unescape(t) for t in path.lstrip("/").split("/")] if path else []
+    if not tokens:
+        raise ValueError("Operations on the document root are not supported")
+    target = document
+    for token in tokens[:-1]:
+        target = target[int(token)] if isinstance(target, list) else target[token]
+    return target, tokens[-1]
+
+def apply_json_patch(document: Dict, operations: Iterable[Dict]) -> Dict:
+    """Apply JSON Patch operations (add/remove/replace/test) to a copy of the document.
+    Raises PatchTestFailed when a test op does not match, as LaunchDarkly would reject it.
+    """
+    document = copy.deepcopy(document)
+    for op in operations:
+        kind = op.get("op")
+        parent, token = _resolve_parent(document, op.get("path", ""))
+        if isinstance(parent, list):
+            if kind == "add" and token == "-":
+                parent.append(copy.deepcopy(op.get("value")))
+                continue
+            index = int(token)
+            if kind == "add":
+                parent.insert(index, copy.deepcopy(op.get("value")))
+            elif kind == "remove":
+                del parent[index]
+            elif kind == "replace":
+                parent[index] = copy.deepcopy(op.get("value"))
+            elif kind == "test":
+                if parent[index] != op.get("value"):
+                    raise PatchTestFailed(f"Test failed at {op.get('path')}")
+            else:
+                raise ValueError(f"Unsupported JSON Patch op '{kind}'")
+        else:
+            if kind in ("add", "replace"):
+                if kind == "replace" and token not in parent:
+                    raise ValueError(f"Cannot replace missing path {op.get('path')}")
+                parent[token] = copy.deepcopy(op.get("value"))
+            elif kind == "remove":
+                del parent[token]
+            elif kind == "test":
+                if parent.get(token) != op.get("value"):
+                    raise PatchTestFailed(f"Test failed at {op.get('path')}")
+            else:
+                raise ValueError(f"Unsupported JSON Patch op '{kind}'")
+    return document
+
+def _variation_label(flag: Dict, index) -> str:
+    variations = flag.get("variations", []) or []
+    if isinstance(index, int) and 0 <= index < len(variations):
+        return json.dumps(variations[index].get("value"))
+    return str(index)
+
+def _serve_label(flag: Dict, target: Dict) -> str:
+    if not target:
+        return "-"
+    if target.get("variation") is not None:
+        return _variation_label(flag, target.get("variation"))
+    if target.get("rollout"):
+        weights = [f"{_variation_label(flag, w.get('variation'))}:{w.get('weight', 0) / 1000:g}%"
+                   for w in target["rollout"].get("variations", [])]
+        return "rollout " + ", ".join(weights)
+    return "-"
+
+def describe_environment(flag: Dict, env_key: str) -> List[str]:
+    """Line-per-fact rendering of an environment's state and rules (one clause value per line, so diffs stay small)"""
+    env_data = (flag.get("environments", {}) or {}).get(env_key, {}) or {}
+    lines = [
+        f"on: {bool(env_data.get('on'))}",
+        f"fallthrough: {_serve_label(flag, env_data.get('fallthrough') or {})}",
+        f"offVariation: {_variation_label(flag, env_data.get('offVariation'))}",
+    ]
+    for i, rule in enumerate(env_data.get("rules", []) or []):
+        lines.append(f"rule {i}: {rule.get('description') or rule.get('_id') or '(unnamed)'} "
+                     f"-> {_serve_label(flag, rule)}")
+        for clause in rule.get("clauses", []) or []:
+            negate = "not " if clause.get("negate") else ""
+            values = clause.get("values", []) or []
+            lines.append(f"    {clause.get('attribute')} {negate}{clause.get('op')} ({len(values)} values)")
+            lines.extend(f"        {json.dumps(v)}" for v in values)
+    return lines
+
+@dataclass
+class PatchPreview:
+    """A change computed locally: the JSON Patch that would be sent and its effect on the environment"""
+    flag_key: str
+    env_key: str
+    description: str = ""
+    operations: List[Dict] = field(default_factory=list)
+    before: List[str] = field(default_factory=list)
+    after: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def changes(self) -> bool:
+        return any(op.get("op") != "test" for op in self.operations)
+
+    @property
+    def diff(self) -> List[str]:
+        return list(difflib.unified_diff(self.before, self.after, f"{self.env_key} (current)",
+                                         f"{self.env_key} (planned)", lineterm=""))
+
+    def format(self) -> str:
+        """Human-readable review text: summary, rule diff and the JSON Patch"""
+        lines = [f"Flag: {self.flag_key}", f"Environment: {self.env_key}", f"Plan: {self.description}"]
+        if self.error:
+            lines.append(f"Error: {self.error}")
+        if not self.changes:
+            lines.append("No changes would be sent.")
+            return "\n".join(lines)
+        lines += ["", "Rule diff:"] + (self.diff or ["(no visible rule changes)"])
+        lines += ["", "JSON Patch:", json.dumps(self.operations, indent=2)]
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict:
+        return {"flag": self.flag_key, "environment": self.env_key, "description": self.description,
+                "changes": self.changes, "operations": self.operations, "diff": self.diff, "error": self.error}
+
+def preview_operations(flag: Dict, env_key: str, operations: List[Dict], description: str = "",
+                       guard: str = DEFAULT_GUARD) -> PatchPreview:
+    """Guard the operations as the apply path would and apply them to a copy of the flag"""
+    preview = PatchPreview(flag_key=flag.get("key", ""), env_key=env_key, description=description)
+    preview.before = describe_environment(flag, env_key)
+    preview.operations = guard_operations(flag, env_key, operations, guard)
+    try:
+        preview.after = describe_environment(apply_json_patch(flag, preview.operations), env_key)
+    except Exception as e:
+        logger.debug(f"Local patch apply failed for {preview.flag_key}: {e}")
+        preview.error = f"Patch would not apply cleanly: {e}"
+        preview.after = list(preview.before)
+    return preview
+
+def preview_pmc_targeting(flag: Dict, environment: str, pmc_ids, enable: bool,
+                          default_value: Optional[bool] = None, guard: str = DEFAULT_GUARD) -> PatchPreview:
+    """Dry run of apply_pmc_targeting / apply_bulk_pmc_targeting against an already-fetched flag"""
+    env_key = resolve_environment(environment)
+    if isinstance(pmc_ids, (str, int)):
+        pmc_ids = [pmc_ids]
+    ids = parse_pmc_ids(" ".join(str(p) for p in pmc_ids))
+    if not (flag.get("environments", {}) or {}).get(env_key):
+        return PatchPreview(flag_key=flag.get("key", ""), env_key=env_key,
+                            error=f"Environment '{env_key}' not found in flag configuration")
+    if len(ids) == 1:
+        plan, operations = pmc_targeting_operations(flag, env_key, normalize_pmc_id(ids[0]), enable, default_value)
+    else:
+        plan, operations = bulk_pmc_targeting_operations(flag, env_key, ids, enable, default_value)
+    return preview_operations(flag, env_key, operations, plan.description, guard)
+
+def preview_toggle(flag: Dict, environment: str, enable: bool,
+                   default_value: Optional[bool] = None) -> PatchPreview:
+    """Dry run of a global ON/OFF toggle (plus the optional default rule) as the single JSON Patch apply_toggle sends"""
+    env_key = resolve_environment(environment)
+    description = f"Turn flag {'ON' if enable else 'OFF'}"
+    if enable and default_value is not None:
+        description += f", default rule {default_value}"
+    return preview_operations(flag, env_key, toggle_operations(flag, env_key, enable, default_value), description)
+
+def preview_default_rule(flag: Dict, environment: str, default_value: bool) -> PatchPreview:
+    """Dry run of applying only the default rule (fallthrough/offVariation)"""
+    env_key = resolve_environment(environment)
+    operations = default_rule_operations(flag, env_key, default_value)
+    return preview_operations(flag, env_key, operations, f"Default rule set to {default_value}")
@@ -0,0 +1,264 @@
+"""
+PMC Rule Promotion
+Replicates the PMC Enabled/Disabled rules of one environment into another
+(e.g. DEV -> OCRT -> SAT). The flag is read once, the PmcId lists of the two
+environments are diffed and the target environment gets the minimal JSON Patch
+in a single request. Any number of flags can be promoted as a batch.
+"""
+
+import copy
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from api_config.api_endpoints import APIConfig
+
+from .bulk import _without_pmcs
+from .pipeline import DEFAULT_GUARD, DEFAULT_MAX_ATTEMPTS, FlagFetcher, PatchSender, send_with_rebase
+from .pmc import (PMC_ATTRIBUTE, _audit, _rule_path, boolean_variations, create_standard_pmc_rule, find_pmc_rules,
+                  normalize_pmc_id, resolve_environment)
+from .preview import PatchPreview, preview_operations
+
+logger = logging.getLogger(__name__)
+
+def _pmc_values(rules: List[Dict], index: int) -> List:
+    if index < 0:
+        return []
+    for clause in rules[index].get("clauses", []) or []:
+        if clause.get("attribute") == PMC_ATTRIBUTE:
+            return list(clause.get("values", []) or [])
+    return []
+
+def _keys(values: Iterable) -> Set:
+    return {normalize_pmc_id(v) for v in values}
+
+def _with_values(rule: Dict, values: List) -> Dict:
+    rule = copy.deepcopy(rule)
+    for clause in rule.get("clauses", []) or []:
+        if clause.get("attribute") == PMC_ATTRIBUTE:
+            clause["values"] = list(values)
+            break
+    return rule
+
+@dataclass
+class PromotionPlan:
+    """PMC rule changes that make the target environment match the source"""
+    flag_key: str
+    source_env: str
+    target_env: str
+    mirror: bool = False
+    to_enable: List = field(default_factory=list)
+    to_disable: List = field(default_factory=list)
+    removed: List = field(default_factory=list)
+    operations: List[Dict] = field(default_factory=list)
+
+    @property
+    def in_sync(self) -> bool:
+        return not self.operations
+
+    @property
+    def description(self) -> str:
+        if self.in_sync:
+            return f"{self.target_env} PMC rules already match {self.source_env}"
+        parts = [f"{len(self.to_enable)} PMC IDs enabled", f"{len(self.to_disable)} disabled"]
+        if self.removed:
+            parts.append(f"{len(self.removed)} not in {self.source_env} removed")
+        return f"Promote {self.source_env} -> {self.target_env}: " + ", ".join(parts)
+
+    def to_dict(self) -> Dict:
+        return {"flag": self.flag_key, "source": self.source_env, "target": self.target_env,
+                "mirror": self.mirror, "to_enable": self.to_enable, "to_disable": self.to_disable,
+                "removed": self.removed, "in_sync": self.in_sync, "description": self.description}
+
+def plan_promotion(flag: Dict, source_env: str, target_env: str, mirror: bool = False) -> PromotionPlan:
+    """Work out the minimal JSON Patch that copies the source's PMC Enabled/Disabled lists to the target.
+
+    Every PMC ID in the source's two standard rules ends up in the same rule in
+    the target, and is taken out of any other target rule listing it (rules left
+    empty are removed). With ``mirror`` the target's standard rules are also
+    cleared of IDs the source does not list; otherwise those are kept. Operations
+    use the same order as bulk targeting: replacements at original positions,
+    then removals from the highest index down, then new rules.
+    """
+    environments = flag.get("environments", {}) or {}
+    for env_key in (source_env, target_env):
+        if not environments.get(env_key):
+            raise ValueError(f"Environment '{env_key}' not found in flag configuration")
+    plan = PromotionPlan(flag_key=flag.get("key", ""), source_env=source_env, target_env=target_env, mirror=mirror)
+
+    enable_variation, disable_variation = boolean_variations(flag)
+    source_rules = environments[source_env].get("rules", []) or []
+    target_rules = environments[target_env].get("rules", []) or []
+    source_enabled, source_disabled = find_pmc_rules(source_rules, enable_variation, disable_variation)
+    target_enabled, target_disabled = find_pmc_rules(target_rules, enable_variation, disable_variation)
+
+    enabled = _pmc_values(source_rules, source_enabled)
+    disabled = _pmc_values(source_rules, source_disabled)
+    # An ID listed in both source rules is served by whichever rule comes first
+    if source_enabled >= 0 and source_disabled >= 0:
+        if source_enabled < source_disabled:
+            disabled = [v for v in disabled if normalize_pmc_id(v) not in _keys(enabled)]
+        else:
+            enabled = [v for v in enabled if normalize_pmc_id(v) not in _keys(disabled)]
+    enabled_keys, disabled_keys = _keys(enabled), _keys(disabled)
+    managed = enabled_keys | disabled_keys
+
+    current_enabled = _pmc_values(target_rules, target_enabled)
+    current_disabled = _pmc_values(target_rules, target_disabled)
+    if mirror:
+        desired_enabled, desired_disabled = list(enabled), list(disabled)
+        plan.removed = [v for v in current_enabled + current_disabled if normalize_pmc_id(v) not in managed]
+    else:
+        desired_enabled = [v for v in current_enabled if normalize_pmc_id(v) not in disabled_keys]
+        desired_enabled += [v for v in enabled if normalize_pmc_id(v) not in _keys(desired_enabled)]
+        desired_disabled = [v for v in current_disabled if normalize_pmc_id(v) not in enabled_keys]
+        desired_disabled += [v for v in disabled if normalize_pmc_id(v) not in _keys(desired_disabled)]
+    plan.to_enable = [v for v in enabled if normalize_pmc_id(v) not in _keys(current_enabled)]
+    plan.to_disable = [v for v in disabled if normalize_pmc_id(v) not in _keys(current_disabled)]
+
+    replaced: Dict[int, Dict] = {}
+    deleted: List[int] = []
+    for index, desired in ((target_enabled, desired_enabled), (target_disabled, desired_disabled)):
+        if index < 0:
+            continue
+        current = _pmc_values(target_rules, index)
+        if not desired:
+            if current:
+                deleted.append(index)
+        elif _keys(desired) != _keys(current) or len(desired) != len(current):
+            replaced[index] = _with_values(target_rules[index], desired)
+    for index, rule in enumerate(target_rules):
+        if index in (target_enabled, target_disabled):
+            continue
+        rule, remaining, changed = _without_pmcs(rule, managed)
+        if not changed:
+            continue
+        if remaining:
+            replaced[index] = rule
+        else:
+            deleted.append(index)
+
+    for index in sorted(replaced):
+        plan.operations.append({"op": "replace", "path": _rule_path(target_env, index), "value": replaced[index]})
+    for index in sorted(deleted, reverse=True):
+        plan.operations.append({"op": "remove", "path": _rule_path(target_env, index)})
+    for index, desired, enable in ((target_enabled, desired_enabled, True),
+                                   (target_disabled, desired_disabled, False)):
+        if index < 0 and desired:
+            rule = create_standard_pmc_rule(desired[0], enable_variation if enable else disable_variation, enable)
+            rule["clauses"][0]["values"] = list(desired)
+            plan.operations.append({"op": "add", "path": _rule_path(target_env, "-"), "value": rule})
+
+    logger.debug(f"Promotion plan for {plan.flag_key} {source_env} -> {target_env}: "
+                 f"{len(plan.operations)} operations")
+    return plan
+
+def _safe_fetcher(fetch_flag: FlagFetcher) -> FlagFetcher:
+    """Fetcher reporting an unknown or unreachable flag as None instead of raising"""
+    def fetch(flag_key: str) -> Optional[Dict]:
+        try:
+            return fetch_flag(flag_key)
+        except Exception as e:
+            logger.error(f"Could not fetch {flag_key}: {e}")
+            return None
+    return fetch
+
+def preview_promotion(flag: Dict, source: str, target: str, mirror: bool = False,
+                      guard: str = DEFAULT_GUARD) -> Tuple[PromotionPlan, PatchPreview]:
+    """Dry run of a promotion: the plan plus the guarded JSON Patch and rule diff of the target"""
+    plan = plan_promotion(flag, resolve_environment(source), resolve_environment(target), mirror)
+    return plan, preview_operations(flag, plan.target_env, plan.operations, plan.description, guard)
+
+def apply_promotion(flag_key: str, source: str, target: str,
+                    fetch_flag: FlagFetcher, send_patch: PatchSender,
+                    mirror: bool = False,
+                    guard: str = DEFAULT_GUARD,
+                    max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Tuple[bool, str, Dict]:
+    """Promote one flag's PMC rules with one GET and at most one (guarded) PATCH.
+
+    Returns (success, message, details) where details is the plan summary plus
+    the patch outcome, and writes one pmc_rules_promotion audit event.
+    """
+    source_env, target_env = resolve_environment(source), resolve_environment(target)
+    planned: Dict[str, PromotionPlan] = {}
+
+    def build(current: Dict) -> List[Dict]:
+        planned["plan"] = plan_promotion(current, source_env, target_env, mirror)
+        return planned["plan"].operations
+
+    try:
+        outcome = send_with_rebase(flag_key, target_env, build, _safe_fetcher(fetch_flag), send_patch,
+                                   guard=guard, max_attempts=max_attempts)
+    except Exception as e:
+        logger.exception(f"Exception promoting {flag_key}: {str(e)}")
+        return False, f"Error promoting PMC rules: {str(e)}", {"flag": flag_key, "error": str(e)}
+
+    plan = planned.get("plan")
+    success = outcome.success and plan is not None
+    message = plan.description if plan else (outcome.error or "Could not plan promotion")
+    if outcome.conflicts:
+        message += f" | rebased after {outcome.conflicts} conflicting edit(s)"
+    if not success:
+        message = f"Failed to promote PMC rules for {flag_key}: {outcome.error or 'PATCH rejected'}"
+    details = dict(plan.to_dict() if plan else {"flag": flag_key}, operations=len(outcome.operations),
+                   **outcome.to_dict())
+    if plan is None or not plan.in_sync:
+        _audit("pmc_rules_promotion", {
+            "feature_key": flag_key,
+            "environment": target_env,
+            "source_environment": source_env,
+            "mirror": bool(mirror),
+            "pmc_count": len(plan.to_enable) + len(plan.to_disable) if plan else 0,
+            "summary": message,
+        }, ok=success)
+    return success, message, details
+
+def promote_flags(flag_keys: Iterable[str], source: str, target: str,
+                  fetch_flag: FlagFetcher, send_patch: PatchSender,
+                  mirror: bool = False,
+                  dry_run: bool = False,
+                  guard: str = DEFAULT_GUARD,
+                  max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                  max_workers: Optional[int] = None,
+                  progress_callback: Optional[Callable[[int, int, Dict], None]] = None) -> List[Dict]:
+    """Promote (or with ``dry_run`` only preview) many flags concurrently; one result dict per flag, in order.
+
+    Each flag is still one GET plus at most one PATCH; the client's rate limiter
+    paces the requests. ``progress_callback(done, total, result)`` runs on worker threads.
+    """
+    keys = list(dict.fromkeys(k for k in flag_keys if k))
+
+    def run(flag_key: str) -> Dict:
+        if not dry_run:
+            success, message, details = apply_promotion(flag_key, source, target, fetch_flag, send_patch,
+                                                        mirror=mirror, guard=guard, max_attempts=max_attempts)
+            return dict(details, flag=flag_key, success=success, message=message)
+        try:
+            flag = _safe_fetcher(fetch_flag)(flag_key)
+            if not flag:
+                return {"flag": flag_key, "success": False, "message": "Could not retrieve flag configuration"}
+            plan, preview = preview_promotion(flag, source, target, mirror, guard)
+            return dict(plan.to_dict(), flag=flag_key, success=not preview.error, dry_run=True,
+                        message=preview.error or plan.description, patch=preview.operations, diff=preview.diff)
+        except Exception as e:
+            logger.debug(f"Promotion preview for {flag_key} failed: {e}")
+            return {"flag": flag_key, "success": False, "message": str(e)}
+
+    results: List[Optional[Dict]] = [None] * len(keys)
+    if not keys:
+        return []
+    workers = max(1, min(max_workers or APIConfig.BULK_TOGGLE_WORKERS, len(keys)))
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run, key): i for i, key in enumerate(keys)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            done += 1
+            if progress_callback:
+                try:
+                    progress_callback(done, len(keys), result)
+                except Exception as e:
+                    logger.debug(f"Promotion progress callback error: {e}")
+    return results
@@ -0,0 +1,77 @@
+"""
+Test Setup
+Keeps audit events and flag snapshots written during tests out of the working
+tree, makes the top-level packages importable without installing them and
+provides a local scripted HTTP server standing in for the LaunchDarkly API.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+_scratch = tempfile.mkdtemp(prefix="featureflag-tests-")
+os.environ.setdefault("AUDIT_FILE", os.path.join(_scratch, "audit_events.jsonl"))
+os.environ.setdefault("SNAPSHOT_FILE", os.path.join(_scratch, "flag_snapshot.db"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class ScriptedServer:
+    """Local HTTP server answering each request with the next scripted (status, headers, body)"""
+
+    def __init__(self):
+        self.responses = deque()
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                server.requests.append((self.command, self.path, self.rfile.read(length) if length else b""))
+                status, headers, body = server.responses.popleft() if server.responses else (200, {}, {})
+                payload = json.dumps(body).encode()
+                self.send_response_only(status)
+                if "Date" not in headers:
+                    self.send_header("Date", self.date_time_string())
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_PATCH = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api/v2"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def script(self, *responses):
+        for response in responses:
+            self.responses.append(response if isinstance(response, tuple) else (response, {}, {}))
+
+@pytest.fixture
+def ld_server():
+    server = ScriptedServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+@pytest.fixture
+def client(ld_server):
+    from api_client.launchdarkly_client import LaunchDarklyClient
+    ld_client = LaunchDarklyClient(api_key="test-key", project_key="proj")
+    ld_client.base_url = ld_server.url
+    # Same retry policy, without the back-off sleeps between attempts
+    ld_client.retry_strategy.backoff_factor = 0
+    yield ld_client
+    ld_client.cache.stop_sweeper()
+    ld_client.session.close()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from api_client import PatchConflict, PatchRejected
+from api_client.async_client import AsyncLaunchDarklyClient
+from api_config.api_endpoints import APIConfig
+
+def test_async_client_shares_budgets_with_the_threaded_client(client):
+    async_client = AsyncLaunchDarklyClient(api_key="test-key", project_key="proj", share_with=client)
+    assert async_client.read_limiter is client.read_limiter
+    assert async_client.write_limiter is client.write_limiter
+    assert async_client.cache is client.cache
+    assert async_client.validators is client.validators
+    assert async_client.metrics is client.metrics
+
+def test_async_client_for_another_token_keeps_its_own_budget(client):
+    async_client = AsyncLaunchDarklyClient(api_key="other-key", project_key="proj", share_with=client)
+    assert async_client.read_limiter is not client.read_limiter
+    assert async_client.cache is not client.cache
+
+def _run(client, ld_server, coro_factory):
+    async_client = AsyncLaunchDarklyClient(api_key="test-key", project_key="proj", share_with=client)
+    async_client.base_url = ld_server.url
+
+    async def run():
+        async with async_client:
+            return await coro_factory(async_client)
+    return asyncio.run(run())
+
+def test_async_429_retry_waits_for_a_new_token(client, ld_server):
+    ld_server.script((429, {"Retry-After": 1}, {}), (200, {}, {"key": "flag-a"}))
+    started = time.time()
+    flag = _run(client, ld_server, lambda c: c.get_flag("flag-a"))
+    assert flag["key"] == "flag-a"
+    assert time.time() - started >= 0.9
+    assert len(ld_server.requests) == 2
+    # Both attempts went through the shared read limiter
+    assert client.read_limiter.get_stats()["throttled"] == 1
+    assert client.metrics.snapshot()["rate_limit_waits"] >= 1
+
+def test_async_get_flag_raw_is_not_cached(client, ld_server):
+    ld_server.script((200, {}, {"key": "flag-a"}), (200, {}, {"key": "flag-a"}))
+    _run(client, ld_server, lambda c: c.get_flag_raw("flag-a"))
+    flag = _run(client, ld_server, lambda c: c.get_flag_raw("flag-a"))
+    assert flag == {"key": "flag-a"}
+    assert len(ld_server.requests) == 2
+
+GUARDED_OPS = [
+    {"op": "test", "path": "/environments/production/on", "value": False},
+    {"op": "replace", "path": "/environments/production/on", "value": True},
+]
+
+def test_async_patch_conflict_raises(client, ld_server):
+    ld_server.script((409, {}, {"message": "conflict"}))
+    with pytest.raises(PatchConflict):
+        _run(client, ld_server, lambda c: c.patch_flag("flag-a", GUARDED_OPS, comment="test"))
+
+def test_async_guarded_validation_error_is_rejected(client, ld_server):
+    ld_server.script((400, {}, {"message": "invalid variation"}))
+    with pytest.raises(PatchRejected, match="400 invalid variation"):
+        _run(client, ld_server, lambda c: c.patch_flag("flag-a", GUARDED_OPS, comment="test"))
+
+def test_async_get_segments_pages_until_short_page(client, ld_server, monkeypatch):
+    monkeypatch.setattr(APIConfig, "SEGMENT_PAGE_SIZE", 2)
+    ld_server.script(
+        (200, {}, {"items": [{"key": "a"}, {"key": "b"}], "totalCount": 3}),
+        (200, {}, {"items": [{"key": "c"}], "totalCount": 3}),
+    )
+    segment = _run(client, ld_server, lambda c: c.get_segment("production", "c"))
+    assert segment == {"key": "c"}
+    assert [path for _, path, _ in ld_server.requests] == [
+        "/api/v2/segments/proj/production?limit=2&offset=0",
+        "/api/v2/segments/proj/production?limit=2&offset=2",
+    ]
+
+def test_async_export_orphaned_flags_writes_csv(client, ld_server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ld_server.script(
+        (200, {}, {"items": [{"key": "flag-a"}], "totalCount": 1}),
+        (200, {}, {"key": "flag-a"}),
+    )
+    progress = []
+    orphaned, filename = _run(client, ld_server, lambda c: c.export_orphaned_flags(
+        progress_callback=lambda *args: progress.append(args)))
+    assert orphaned == []
+    assert (tmp_path / filename).read_text(encoding="utf-8").startswith("No orphaned flags found")
+    assert progress == [(1, 1, "flag-a")]
@@ -0,0 +1,36 @@
+import pytest
+import requests
+
+def _endpoint(client, name="GET /flags/*/*"):
+    return client.metrics.snapshot()["endpoints"][name]
+
+def test_retries_counted_when_request_recovers(client, ld_server):
+    ld_server.script(503, 503, (200, {}, {"key": "flag-a"}))
+    assert client.get_flag_raw("flag-a") == {"key": "flag-a"}
+    endpoint = _endpoint(client)
+    assert endpoint["retries"] == 2
+    assert endpoint["errors"] == 0
+    assert len(ld_server.requests) == 3
+
+def test_retries_counted_when_retries_exhausted(client, ld_server):
+    ld_server.script(503, 503, 503, 503)
+    with pytest.raises(requests.exceptions.RetryError):
+        client.get_flag_raw("flag-a")
+    endpoint = _endpoint(client)
+    assert endpoint["retries"] == client.retry_strategy.total == 3
+    assert endpoint["errors"] == 1
+    assert len(ld_server.requests) == 4
+
+def test_retries_counted_when_connection_fails(client, ld_server):
+    ld_server.httpd.shutdown()
+    ld_server.httpd.server_close()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get_flag_raw("flag-a")
+    assert _endpoint(client)["retries"] == 3
+
+def test_scan_requests_are_counted(client, ld_server):
+    ld_server.script((200, {}, {"key": "flag-a"}), (404, {}, {"message": "Unknown resource"}))
+    assert client._get_individual_flag("flag-a") == {"key": "flag-a"}
+    assert client._get_individual_flag("flag-b") == {}
+    assert client.stats["requests_made"] == 2
+    assert client.stats["errors"] == 1
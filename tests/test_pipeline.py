@@ -0,0 +1,43 @@
+import pytest
+
+from api_client.launchdarkly_client import PatchConflict, PatchRejected, is_patch_conflict
+from targeting.pipeline import send_with_rebase
+
+GUARDED = [{"op": "test", "path": "/environments/dev/_version", "value": 3},
+           {"op": "replace", "path": "/environments/dev/on", "value": True}]
+
+def _flag():
+    return {"key": "flag-a", "environments": {"dev": {"on": False, "_version": 3, "rules": []}}}
+
+def _build(flag):
+    return [{"op": "replace", "path": "/environments/dev/on", "value": True}]
+
+def test_only_409_or_failed_test_op_is_a_conflict():
+    assert is_patch_conflict(409, GUARDED)
+    assert is_patch_conflict(400, GUARDED, '{"code":"invalid_request","message":"Test operation failed"}')
+    assert not is_patch_conflict(400, GUARDED, '{"code":"invalid_request","message":"Invalid path /x"}')
+    assert not is_patch_conflict(409, GUARDED[1:])
+
+def test_malformed_guarded_patch_is_not_retried(client, ld_server):
+    ld_server.script((400, {}, {"code": "invalid_request", "message": "unknown path /environments/dev/nope"}))
+    with pytest.raises(PatchRejected, match="unknown path"):
+        client.patch_flag("flag-a", GUARDED)
+
+    fetches = []
+
+    def fetch(key):
+        fetches.append(key)
+        return _flag()
+
+    def send(key, operations):
+        raise PatchRejected("400 unknown path /environments/dev/nope")
+
+    outcome = send_with_rebase("flag-a", "dev", _build, fetch, send, flag=_flag())
+    assert not outcome.success
+    assert outcome.attempts == 1 and outcome.conflicts == 0 and not fetches
+    assert outcome.error == "PATCH rejected in dev: 400 unknown path /environments/dev/nope"
+
+def test_conflict_still_rebases(client, ld_server):
+    ld_server.script((409, {}, {"message": "conflict"}))
+    with pytest.raises(PatchConflict):
+        client.patch_flag("flag-a", GUARDED)
@@ -0,0 +1,37 @@
+from targeting.pipeline import send_with_rebase
+from targeting.promote import apply_promotion
+
+SOURCE = "onesite-general-dev"
+TARGET = "onesite-general-ocrt"
+
+def _flag():
+    enabled = {"_id": "r1", "variation": 0, "description": "PMC Enabled",
+               "clauses": [{"attribute": "PmcId", "op": "in", "values": ["1001", "1002"], "negate": False}]}
+    return {"key": "flag-a", "_version": 3,
+            "variations": [{"value": True}, {"value": False}],
+            "environments": {SOURCE: {"on": True, "_version": 7, "rules": [enabled]},
+                             TARGET: {"on": True, "_version": 2, "rules": []}}}
+
+def test_rejected_patch_sets_error():
+    outcome = send_with_rebase("flag-a", TARGET, lambda flag: [{"op": "replace", "path": "/x", "value": 1}],
+                               lambda key: _flag(), lambda key, ops: False, flag=_flag())
+    assert not outcome.success
+    assert outcome.error == f"PATCH rejected in {TARGET}"
+
+def test_promotion_reports_rejected_patch():
+    sent = []
+
+    def send(flag_key, operations):
+        sent.append(operations)
+        return False
+
+    success, message, details = apply_promotion("flag-a", SOURCE, TARGET, lambda key: _flag(), send)
+    assert len(sent) == 1
+    assert not success
+    assert message.startswith("Failed to promote PMC rules for flag-a: PATCH rejected")
+    assert details["error"]
+
+def test_promotion_success_message():
+    success, message, _ = apply_promotion("flag-a", SOURCE, TARGET, lambda key: _flag(), lambda key, ops: True)
+    assert success
+    assert message.startswith(f"Promote {SOURCE} -> {TARGET}: 2 PMC IDs enabled")
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from api_client.launchdarkly_client import RateLimiter, RateLimitExceeded, RequestCancelled
+
+def test_429_with_retry_after_pauses_and_halves_read_rate(client, ld_server):
+    ld_server.script((429, {"Retry-After": 30}, {"message": "rate limited"}))
+    with pytest.raises(RateLimitExceeded):
+        client._make_request("GET", "/flags/proj/flag-a", blocking=False)
+
+    stats = client.read_limiter.get_stats()
+    assert stats["throttled"] == 1
+    assert stats["rate_per_minute"] == client.read_limiter.base_rate / 2
+    assert 25 < stats["paused_for"] <= 30
+    assert client.write_limiter.get_stats()["throttled"] == 0
+    # urllib3 handed the 429 straight back instead of retrying it
+    assert len(ld_server.requests) == 1
+
+def test_429_is_retried_once_the_pause_ends(client, ld_server):
+    ld_server.script((429, {"Retry-After": 1}, {}), (200, {}, {"key": "flag-a"}))
+    started = time.time()
+    assert client.get_flag_raw("flag-a") == {"key": "flag-a"}
+    assert time.time() - started >= 0.9
+    assert len(ld_server.requests) == 2
+    assert client.read_limiter.get_stats()["throttled"] == 1
+
+def test_read_rate_follows_ratelimit_headers(client, ld_server):
+    reset_ms = int((time.time() + 10) * 1000)
+    headers = {"X-Ratelimit-Route-Remaining": 40, "X-Ratelimit-Global-Remaining": 900, "X-Ratelimit-Reset": reset_ms}
+    ld_server.script(*[(200, headers, {"key": "flag-a"})] * 12)
+    for _ in range(12):
+        client.get_flag_raw("flag-a")
+
+    stats = client.read_limiter.get_stats()
+    # 40 requests left in a 10 second window is about 240 a minute, well above the starting 50
+    assert 200 < client.read_limiter.base_rate < 245
+    assert stats["rate_per_minute"] == round(client.read_limiter.base_rate, 1)
+    assert stats["server_remaining"] == 40
+
+def test_ratelimit_headers_lower_the_rate_at_once():
+    limiter = RateLimiter(rate_per_minute=50, name="read")
+    limiter.update_from_headers({"X-Ratelimit-Route-Remaining": "2",
+                                 "X-Ratelimit-Reset": str(int((time.time() + 12) * 1000))})
+    assert limiter.get_stats()["rate_per_minute"] == 10
+    assert limiter.get_stats()["tokens"] == 2
+
+def test_background_waiters_yield_to_interactive_ones():
+    limiter = RateLimiter(rate_per_minute=120, name="read")
+    limiter.tokens = 0
+    order = []
+
+    def take(label, background):
+        limiter.acquire_blocking(timeout=5, background=background)
+        order.append(label)
+
+    scan = threading.Thread(target=take, args=("scan", True))
+    scan.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=take, args=("interactive", False))
+    interactive.start()
+    scan.join()
+    interactive.join()
+    assert order == ["interactive", "scan"]
+
+def test_cancelled_waiter_leaves_the_queue_without_a_token():
+    limiter = RateLimiter(rate_per_minute=6, name="read")
+    limiter.tokens = 0
+    superseded = threading.Event()
+    errors = []
+
+    def wait():
+        try:
+            limiter.acquire_blocking(timeout=30, cancelled=superseded.is_set)
+        except RequestCancelled as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.1)
+    superseded.set()
+    waiter.join(2)
+    assert not waiter.is_alive() and errors
+    assert limiter.get_stats()["waiting"] == 0
+
+def test_cancelled_request_is_never_sent(client, ld_server):
+    with pytest.raises(RequestCancelled):
+        client.get_flag_raw("flag-a", cancelled=lambda: True)
+    assert ld_server.requests == []
+    assert client.stats["requests_made"] == 0
@@ -0,0 +1,29 @@
+from urllib.parse import parse_qs, urlparse
+
+def _entry(entry_id, date, flag_key):
+    return {"_id": entry_id, "date": date, "target": {"resources": [f"proj/proj:env/production:flag/{flag_key}"]}}
+
+def _query(request):
+    return parse_qs(urlparse(request[1]).query)
+
+def test_cursor_seeded_from_newest_audit_entry(client, ld_server):
+    ld_server.script((200, {}, {"items": [_entry("a2", 1_000_000, "flag-a"), _entry("a1", 900_000, "flag-b")]}))
+    position = client.get_sync_cursor()
+    assert position == {"cursor": 1_000_000, "seen": ["a2"]}
+
+def test_cursor_falls_back_to_server_date_header(client, ld_server):
+    ld_server.script((200, {"Date": "Wed, 21 Oct 2015 07:28:00 GMT"}, {"items": []}))
+    assert client.get_sync_cursor() == {"cursor": 1445412480000, "seen": []}
+
+def test_sync_overlaps_the_cursor_and_skips_seen_entries(client, ld_server):
+    flags = [{"key": "flag-a", "name": "A"}, {"key": "flag-b", "name": "B"}]
+    # "late" is dated before the cursor but was indexed after the previous sync ran
+    ld_server.script((200, {}, {"items": [_entry("a2", 1_000_000, "flag-a"), _entry("late", 990_000, "flag-b")]}),
+                     (200, {}, {"key": "flag-b", "name": "B2", "environments": {}}))
+    result = client.sync_flag_changes(flags, 1_000_000, seen=["a2"])
+
+    assert _query(ld_server.requests[0])["after"] == ["940000"]
+    assert result["changed"] == ["flag-b"]
+    assert result["cursor"] == 1_000_000
+    assert sorted(result["seen"]) == ["a2", "late"]
+    assert len(ld_server.requests) == 2
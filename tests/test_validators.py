@@ -0,0 +1,25 @@
+from api_client.launchdarkly_client import ConditionalRequestStore, ValidatorEntry
+
+def _entry(size: int) -> ValidatorEntry:
+    return ValidatorEntry(etag='"v1"', last_modified=None, content=b"x" * size, headers={}, encoding="utf-8")
+
+def test_store_evicts_least_recently_used_by_size():
+    store = ConditionalRequestStore(max_entries=100, max_bytes=3000)
+    for url in ("a", "b", "c"):
+        store.put(url, _entry(900))
+    store.get("a")
+    store.put("d", _entry(900))
+
+    assert list(store.entries) == ["c", "a", "d"]
+    stats = store.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes_in_use"] <= 3000
+
+def test_store_replaces_and_skips_oversized_bodies():
+    store = ConditionalRequestStore(max_entries=100, max_bytes=1000)
+    store.put("a", _entry(400))
+    store.put("a", _entry(500))
+    assert store.get_stats()["bytes_in_use"] == ConditionalRequestStore.estimate_size(_entry(500))
+    store.put("a", _entry(5000))
+    assert store.get("a") is None
+    assert store.get_stats()["bytes_in_use"] == 0
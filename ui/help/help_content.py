@@ -9,12 +9,13 @@ HELP_CONTENT = {
     },
     "get.environment": {
         "title": "Environment",
-        "about": "The LaunchDarkly environment to read from.",
+        "about": "The LaunchDarkly environment to read from. ALL fetches the flag once and compares every environment side by side.",
         "examples": [
             "DEV",
             "OCRT",
             "SAT",
             "PROD",
+            "ALL",
         ],
     },
     "get.pmc_id": {
@@ -45,6 +46,14 @@ HELP_CONTENT = {
             "Click Reset to clear all fields.",
         ],
     },
+    "get.batch_button": {
+        "title": "Batch Evaluate",
+        "about": "Evaluates one flag for many PMC/Site IDs at once (fetched once, evaluated locally) and saves a CSV of results.",
+        "examples": [
+            "Load a CSV with PmcId and SiteId columns, or paste one PMC ID per line.",
+            "12345,4341842",
+        ],
+    },
     # Update tab
     "update.flag_key": {
         "title": "Feature Flag Key",
@@ -58,8 +67,8 @@ HELP_CONTENT = {
     },
     "update.pmc_id": {
         "title": "PMC ID",
-        "about": "Optional PMC identifier for targeted updates.",
-        "examples": ["4341841"],
+        "about": "Optional PMC identifier for targeted updates. Several IDs (comma or space separated) are updated together in one change.",
+        "examples": ["4341841", "4341841, 4341842, 4341843"],
     },
     "update.site_id": {
         "title": "Site ID",
@@ -86,6 +95,24 @@ HELP_CONTENT = {
         "about": "Clears update inputs and results.",
         "examples": ["Click Reset to clear all fields."],
     },
+    "update.preview": {
+        "title": "Preview",
+        "about": "Dry run: shows the exact JSON Patch and a before/after rule diff for the current inputs, computed locally from the flag. Nothing is sent until you click Apply.",
+        "examples": ["Enter a flag and PMC IDs, click Preview, review, then Apply"],
+    },
+    "update.promote": {
+        "title": "Promote PMC Rules",
+        "about": "Copies the PMCs Enabled/Disabled rules from one environment to another for one or more flags. Each flag is read once and the target gets the minimal change in a single request. Preview shows the rule diff first.",
+        "examples": ["From DEV to OCRT, one flag key per line", "Mirror also removes PMC IDs the source does not list"],
+    },
+    "update.bulk_toggle": {
+        "title": "Bulk Toggle",
+        "about": "Turns many flags ON/OFF in one run (concurrently, within the API rate limit) with one Teams message and one audit entry for the batch.",
+        "examples": [
+            "One change per line: <flag> <env> <on|off>",
+            "new-checkout DEV on",
+        ],
+    },
     # Create tab
     "create.flag_key": {
         "title": "Flag Key",
@@ -888,6 +888,8 @@ class FeatureFlagApp:
                 return f"Update flag enabled={'True' if enabled_val else 'False'}"
             if etype == "create_flag":
                 return "Created flag"
+            if etype in ("bulk_update_flag", "bulk_flag_change", "pmc_rules_promotion"):
+                return str(e.get("summary", "")) or f"Bulk toggle of {e.get('count', 0)} flags"
             return ""
         except Exception:
             return ""
@@ -193,6 +193,10 @@ class EnhancedViewTab:
         # Initialize API client
         self.api_client = get_client()
         
+        # asyncio client for fan-out scans, created on first use (see _async_bridge)
+        self.async_client = None
+        self.async_bridge = None
+        
         # Data storage
         self.all_flags = []
         self.displayed_flags = []
@@ -214,6 +218,11 @@ class EnhancedViewTab:
         self.auto_refresh_enabled = False
         self.auto_refresh_interval = 30  # seconds
         self.auto_refresh_job = None
+        # Audit-log cursor (server epoch ms) for incremental syncs; None forces a full refresh.
+        # sync_seen holds the ids of entries inside the next sync's overlap window.
+        self.sync_cursor = None
+        self.sync_seen = []
+        self.sync_in_progress = False
         
         # UI Components
         self.toast = ToastNotification(parent)
@@ -225,8 +234,8 @@ class EnhancedViewTab:
         self.setup_ui()
         self.setup_keyboard_shortcuts()
         
-        # Start with initial data load
-        self.refresh_data()
+        # Start with initial data load (render the on-disk snapshot first, then sync)
+        self.refresh_data(warm_start=True)
         
         # Show welcome toast notification about dramatic improvements
         self.parent.after(1000, lambda: self.toast.show_success("🎨 UI UPGRADE! Smart scaling: 20-100px rows, 8-16pt fonts! Customize in View Options! 🎉"))
@@ -569,7 +578,15 @@ class EnhancedViewTab:
         perf_stats = [
             ("cache_hit_rate", "Cache Hit Rate"),
             ("requests_made", "API Requests"),
-            ("cached_items", "Cached Items")
+            ("cached_items", "Cached Items"),
+            ("cache_bytes", "Cache Size"),
+            ("cache_evictions", "Cache Evictions"),
+            ("latency_p50_ms", "Latency p50"),
+            ("latency_p95_ms", "Latency p95"),
+            ("latency_p99_ms", "Latency p99"),
+            ("bytes_received", "Data Received"),
+            ("retries", "HTTP Retries"),
+            ("rate_limit_wait_seconds", "Rate Limit Wait")
         ]
         
         for key, label in perf_stats:
@@ -1059,10 +1076,9 @@ class EnhancedViewTab:
         
         def fetch_sorted_data():
             try:
-                # Clear cache and fetch with new sorting
-                self.api_client.clear_cache()
+                # Listings are cached per sort order and kept current after writes
                 flags = self.api_client.get_all_flags(sort_by=sort_by)
-                stats = self.api_client.get_flag_statistics()
+                stats = self.api_client.get_flag_statistics(flags)
                 perf_stats = self.api_client.get_performance_stats()
                 
                 self.operation_queue.put({
@@ -1176,15 +1192,16 @@ class EnhancedViewTab:
             self.hovered_item = None
     
     # Data Operations
-    def refresh_data(self):
-        """Refresh all data from API"""
+    def refresh_data(self, warm_start=False):
+        """Refresh all data from API.
+
+        With warm_start, the last persisted snapshot is rendered first and the API
+        fetch reconciles it in the background.
+        """
         self.show_loading("Refreshing flag data...")
         
         def fetch_data():
             try:
-                # Clear cache to get fresh data
-                self.api_client.clear_cache()
-                
                 # Get current sort preference
                 sort_option = getattr(self, 'sort_var', None)
                 if sort_option:
@@ -1200,16 +1217,34 @@ class EnhancedViewTab:
                 else:
                     sort_by = "modified"
                 
+                if warm_start:
+                    snapshot = self.api_client.load_flags_snapshot(sort_by=sort_by)
+                    if snapshot:
+                        self.operation_queue.put({
+                            "type": "snapshot_loaded",
+                            "flags": snapshot["flags"],
+                            "stats": self.api_client.get_flag_statistics(snapshot["flags"]),
+                            "saved_at": snapshot["saved_at"]
+                        })
+                
+                # Drop cached listings to get fresh data (conditional requests keep this cheap)
+                self.api_client.invalidate_cache("flags")
+                
+                # Changes made while the listing is fetched are picked up by the next sync;
+                # the cursor is in server time, so local clock skew cannot skip changes
+                sync_position = self._safe_sync_cursor()
+                
                 # Fetch flags and statistics with sorting
                 flags = self.api_client.get_all_flags(sort_by=sort_by)
-                stats = self.api_client.get_flag_statistics()
+                stats = self.api_client.get_flag_statistics(flags)
                 perf_stats = self.api_client.get_performance_stats()
                 
                 self.operation_queue.put({
                     "type": "refresh_complete",
                     "flags": flags,
                     "stats": stats,
-                    "performance": perf_stats
+                    "performance": perf_stats,
+                    "sync_position": sync_position
                 })
             except Exception as e:
                 self.operation_queue.put({
@@ -1228,15 +1263,48 @@ class EnhancedViewTab:
         try:
             result = self.operation_queue.get_nowait()
             
-            if result["type"] == "refresh_complete":
+            if result["type"] == "snapshot_loaded":
+                # Warm start: show the persisted snapshot while the API fetch continues
+                self.all_flags = result["flags"]
+                self.flag_statistics = result["stats"]
+                
+                self.update_ui_after_refresh()
+                self.hide_loading()
+                saved_at = result["saved_at"].strftime("%Y-%m-%d %H:%M")
+                self.status_var.set(f"Showing {len(self.all_flags)} flags from snapshot ({saved_at}) - syncing...")
+                
+                # Keep polling for the background reconcile
+                self.parent.after(100, self.check_operation_queue)
+                
+            elif result["type"] == "refresh_complete":
                 self.all_flags = result["flags"]
                 self.flag_statistics = result["stats"]
                 self.performance_stats = result["performance"]
+                self._set_sync_position(result.get("sync_position"))
                 
                 self.update_ui_after_refresh()
                 self.hide_loading()
                 self.toast.show_success(f"Refreshed {len(self.all_flags)} flags")
                 
+            elif result["type"] == "sync_complete":
+                self.sync_in_progress = False
+                if "error" in result:
+                    # Fall back to a full refresh on the next tick
+                    logger.warning(f"Incremental sync failed: {result['error']}")
+                    self._set_sync_position(None)
+                    return
+                
+                self._set_sync_position(result["sync_position"])
+                self.performance_stats = result["performance"]
+                changed = len(result["changed"]) + len(result["removed"])
+                if changed:
+                    self.all_flags = result["flags"]
+                    self.flag_statistics = result["stats"]
+                    self.update_ui_after_refresh()
+                    self.status_var.set(f"Loaded {len(self.all_flags)} flags - synced {changed} changed")
+                else:
+                    self.update_performance_display()
+                
             elif result["type"] == "error":
                 self.hide_loading()
                 self.toast.show_error(result["message"])
@@ -1313,6 +1381,12 @@ class EnhancedViewTab:
         for key in self.perf_labels:
             if key == "cache_hit_rate":
                 value = f"{perf.get(key, 0)}%"
+            elif key in ("cache_bytes", "bytes_received"):
+                value = f"{perf.get(key, 0) / 1024:.1f} KB"
+            elif key.startswith("latency_"):
+                value = f"{perf.get(key, 0):.0f} ms"
+            elif key == "rate_limit_wait_seconds":
+                value = f"{perf.get(key, 0):.1f} s"
             else:
                 value = str(perf.get(key, 0))
             self.perf_labels[key].config(text=value)
@@ -1320,7 +1394,8 @@ class EnhancedViewTab:
         # Update status bar performance indicator
         requests = perf.get("requests_made", 0)
         cache_rate = perf.get("cache_hit_rate", 0)
-        self.performance_var.set(f"API Requests: {requests} | Cache Hit Rate: {cache_rate}%")
+        p95 = perf.get("latency_p95_ms", 0)
+        self.performance_var.set(f"API Requests: {requests} | Cache Hit Rate: {cache_rate}% | p95: {p95:.0f} ms")
     
     def apply_filters_and_pagination(self):
         """Apply all filters and update display"""
@@ -1401,14 +1476,16 @@ class EnhancedViewTab:
             from api_client import get_client
             client = get_client()
             
-            # Progress callback (called for each flag)
+            # Progress callback (coalesced by the client, called from worker threads)
             def on_progress(current, total, flag_key):
                 self.export_progress['current'] = current
                 self.export_progress['total'] = total
-                
-                # Show toast every 50 flags
-                if current % 50 == 0 or current == 1:
-                    percentage = int((current / total) * 100)
+
+                # Show a toast for every 10% step rather than every callback
+                percentage = int((current / total) * 100) if total else 100
+                step = percentage // 10
+                if current == 1 or step > self.export_progress['last_toast']:
+                    self.export_progress['last_toast'] = step
                     self.parent.after(0, lambda: self.toast.show_info(
                         f"🔍 Analyzing flags... {current}/{total} ({percentage}%)"
                     ))
@@ -1432,7 +1509,17 @@ class EnhancedViewTab:
                         f"✅ Analysis complete! No orphaned flags found. Report saved: {filename}"
                     ))
             
-            # Start background processing
+            # Scan on the asyncio client when aiohttp is available
+            bridge = self._async_bridge()
+            if bridge:
+                bridge.submit(
+                    self.async_client.export_orphaned_flags(progress_callback=on_progress),
+                    on_success=lambda result: on_completion(*result),
+                    on_error=lambda e: on_completion(None, None, str(e))
+                )
+                return
+            
+            # Otherwise fall back to the threaded scan
             def run_export():
                 try:
                     client.export_orphaned_flags_bg(
@@ -1450,6 +1537,19 @@ class EnhancedViewTab:
         except Exception as e:
             self.toast.show_error(f"❌ Failed to start export: {str(e)}")
     
+    def _async_bridge(self):
+        """Lazily start the asyncio client and its loop thread; None without aiohttp"""
+        if self.async_bridge is None:
+            try:
+                from api_client import AsyncLaunchDarklyClient
+                from utils.async_bridge import AsyncBridge
+                self.async_client = AsyncLaunchDarklyClient(share_with=self.api_client)
+            except ImportError as e:
+                logger.info(f"Async client unavailable, using threaded scans: {e}")
+                return None
+            self.async_bridge = AsyncBridge(self.parent)
+        return self.async_bridge
+    
     def _show_export_completion(self, count, filename, orphaned_flags):
         """Show completion dialog with options to view report"""
         from tkinter import messagebox
@@ -1864,11 +1964,81 @@ LaunchDarkly URL: https://app.launchdarkly.com/{PROJECT_KEY}/features/{flag.get(
             self.auto_refresh_job = None
     
     def _auto_refresh_callback(self):
-        """Auto-refresh callback"""
+        """Auto-refresh callback: incremental audit-log sync once a full load has happened"""
         if self.auto_refresh_enabled:
-            self.refresh_data()
+            if self.sync_cursor is None:
+                self.refresh_data()
+            elif not self.sync_in_progress:
+                self.sync_changes()
             self.start_auto_refresh()  # Schedule next refresh
     
+    def sync_changes(self):
+        """Refetch only the flags changed since the last sync and merge them into the list"""
+        self.sync_in_progress = True
+        since_ms = self.sync_cursor
+        seen = list(self.sync_seen)
+        current_flags = list(self.all_flags)
+        sort_by = self._current_sort_by()
+        
+        def sync_data():
+            try:
+                result = self.api_client.sync_flag_changes(current_flags, since_ms, sort_by=sort_by, seen=seen)
+                flags = result["flags"]
+                position = {"cursor": result["cursor"], "seen": result["seen"]}
+                if result["full_refresh"]:
+                    # Too many changes for a delta; reload the whole listing
+                    position = self._safe_sync_cursor()
+                    self.api_client.invalidate_cache("flags")
+                    flags = self.api_client.get_all_flags(sort_by=sort_by)
+                    result["changed"] = [f.get("key") for f in flags]
+                
+                self.operation_queue.put({
+                    "type": "sync_complete",
+                    "flags": flags,
+                    "changed": result["changed"],
+                    "removed": result["removed"],
+                    "sync_position": position,
+                    "stats": self.api_client.get_flag_statistics(flags),
+                    "performance": self.api_client.get_performance_stats()
+                })
+            except Exception as e:
+                self.operation_queue.put({"type": "sync_complete", "error": str(e)})
+        
+        thread = threading.Thread(target=sync_data, daemon=True)
+        thread.start()
+        
+        self.check_operation_queue()
+    
+    def _safe_sync_cursor(self):
+        """Server-side sync position, or None (the next tick does a full refresh) if the audit log is unavailable"""
+        try:
+            return self.api_client.get_sync_cursor()
+        except Exception as e:
+            logger.warning(f"Could not read the audit-log sync position: {e}")
+            return None
+    
+    def _set_sync_position(self, position):
+        """Remember where the next incremental sync starts"""
+        if position:
+            self.sync_cursor = position["cursor"]
+            self.sync_seen = list(position.get("seen", []))
+        else:
+            self.sync_cursor = None
+            self.sync_seen = []
+    
+    def _current_sort_by(self):
+        """API sort key for the current sort dropdown selection"""
+        sort_mapping = {
+            "Modified ↓": "modified",
+            "Created ↓": "created",
+            "Name ↑": "name",
+            "Key ↑": "key",
+            "Health ↓": "health",
+            "Status": "status"
+        }
+        sort_option = getattr(self, 'sort_var', None)
+        return sort_mapping.get(sort_option.get(), "modified") if sort_option else "modified"
+    
     # Loading state management
     def show_loading(self, message="Loading..."):
         """Show loading spinner overlaying the content"""
@@ -2282,6 +2452,8 @@ LaunchDarkly URL: https://app.launchdarkly.com/{PROJECT_KEY}/features/{flag.get(
     def cleanup(self):
         """Cleanup resources"""
         self.stop_auto_refresh()
+        if self.async_bridge:
+            self.async_bridge.shutdown(close_coro=self.async_client.close())
         if hasattr(self.api_client, 'session'):
             self.api_client.session.close()
 
@@ -12,9 +12,15 @@ try:
 except ImportError:
     # Failsafe - define READ_ENVIRONMENT_OPTIONS locally if import fails
     READ_ENVIRONMENT_OPTIONS = ["DEV", "OCRT", "SAT", "PROD"]
-from api_client import get_client
+from api_client import RequestCancelled, get_client
+from evaluation import FlagEvaluator, compile_flag
+from evaluation.batch import (build_context, evaluate_environments, iter_contexts_csv, iter_contexts_text,
+                              run_batch_evaluation)
 import json
+import os
 import time
+import queue
+import threading
 from shared.audit import audit_event
 from ui.widgets.help_icon import HelpIcon
 from utils.settings_manager import SettingsManager
@@ -22,6 +28,11 @@ from utils.settings_manager import SettingsManager
 # Module logger for this UI module
 logger = logging.getLogger(__name__)
 
+# How often the Tk thread checks for a finished submit
+SUBMIT_POLL_MS = 50
+# Environment choice that evaluates every READ_ENVIRONMENT_OPTIONS entry from one fetch
+ALL_ENVIRONMENTS = "ALL"
+
 class GetTab:
     def __init__(self, parent, history_manager, theme_manager):
         self.parent = parent
@@ -29,11 +40,18 @@ class GetTab:
         self.theme_manager = theme_manager
         # Initialize optimized API client
         self.api_client = get_client()
+        # Local evaluation engine (compiled configs are cached per flag version/environment)
+        self.evaluator = FlagEvaluator(flag_lookup=self._lookup_prerequisite, segment_lookup=self._lookup_segment)
         # Keep last result for summary banner
         self.last_flag_data = None
         # Track running animation jobs per canvas to allow cancellation
         self._anim_jobs = {}
         self._help_icons = []
+        # Submit requests run on worker threads; results come back through this queue
+        self.submit_queue = queue.Queue()
+        self.submit_generation = 0
+        self.submit_in_flight = 0
+        self.submit_poll_job = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -180,7 +198,7 @@ class GetTab:
         self.env_entry = ttk.Combobox(
             env_frame, 
             textvariable=self.env_var,
-            values=READ_ENVIRONMENT_OPTIONS, 
+            values=READ_ENVIRONMENT_OPTIONS + [ALL_ENVIRONMENTS], 
             font=("Segoe UI", 11),
             state="readonly",
             height=8
@@ -296,6 +314,20 @@ class GetTab:
         _h6.pack(side="left", padx=(2,0))
         self._help_icons.append((_h6, {"side": "left", "padx": (2,0)}))
 
+        batch_group = ttk.Frame(button_container)
+        batch_group.pack(side="left", padx=(0, 15))
+        batch_button = ttk.Button(
+            batch_group,
+            text="📋 Batch Evaluate",
+            bootstyle="info-outline",
+            width=18,
+            command=self.open_batch_dialog
+        )
+        batch_button.pack(side="left")
+        _h7 = HelpIcon(batch_group, "get.batch_button")
+        _h7.pack(side="left", padx=(2,0))
+        self._help_icons.append((_h7, {"side": "left", "padx": (2,0)}))
+
 
         # Make sure input canvas starts at natural height (expanded)
         try:
@@ -403,11 +435,14 @@ class GetTab:
         self.visual_frame = ttk.Frame(self.view_tabs)
         self.summary_frame = ttk.Frame(self.view_tabs)
         self.json_frame = ttk.Frame(self.view_tabs)
+        self.compare_frame = ttk.Frame(self.view_tabs)
 
-        # Order: Visual (default), Summary, JSON
+        # Order: Visual (default), Summary, JSON, Compare (only shown for ALL environments)
         self.view_tabs.add(self.visual_frame, text="Visual")
         self.view_tabs.add(self.summary_frame, text="Summary")
         self.view_tabs.add(self.json_frame, text="JSON")
+        self.view_tabs.add(self.compare_frame, text="Compare")
+        self.view_tabs.hide(self.compare_frame)
 
         # Visual tab content: scrollable area (Canvas + inner frame + scrollbar)
         self.visual_container = ttk.Frame(self.visual_frame)
@@ -517,6 +552,20 @@ class GetTab:
         self.response_text.pack(side="left", fill="both", expand=True)
         json_scrollbar.pack(side="right", fill="y")
 
+        # Compare tab content: one row per environment
+        compare_cols = ("environment", "status", "result", "variation", "reason")
+        self.compare_tree = ttk.Treeview(self.compare_frame, columns=compare_cols, show="headings", height=8)
+        for col, heading, width in (
+            ("environment", "Environment", 160),
+            ("status", "Status", 70),
+            ("result", "Result", 110),
+            ("variation", "Variation", 80),
+            ("reason", "Reason", 320),
+        ):
+            self.compare_tree.heading(col, text=heading)
+            self.compare_tree.column(col, width=width, anchor="w", stretch=(col == "reason"))
+        self.compare_tree.pack(fill="both", expand=True, padx=4, pady=4)
+
         # Hide the left "Flag Status" column; we now merge summary into Visual view
         try:
             # columns_container has two children: left_column and right_column
@@ -530,10 +579,16 @@ class GetTab:
     # --- Event Handlers ---
     def on_input_data_change(self, *args):
         """Reset response when input changes"""
+        self.cancel_pending_submit()
         self.reset_response_fields()
 
     def on_submit(self):
-        """Submit the feature flag status request"""
+        """Submit the feature flag status request.
+
+        The HTTP round trip runs on a worker thread; its result comes back through
+        submit_queue and is picked up by an after() poll, so the window stays
+        responsive. Submitting again supersedes (and discards) any request in flight.
+        """
         
         feature_key = self.key_var.get().strip()
         environment = self.env_var.get()
@@ -546,25 +601,95 @@ class GetTab:
 
         # Build user context from PMCID and SITE ID
         user_context = self.build_user_context(pmcid, siteid)
+        # A new generation makes any earlier request's result stale
+        self.submit_generation += 1
+        generation = self.submit_generation
         # Show loading indicator
         try:
             self.loading_frame.pack(pady=10)
             self.loading_var.set("Fetching flag status...")
-            self.submit_button.config(state="disabled")
             self.history_manager.add_get_key(feature_key)
             
             # Start spinner animation
             self.animate_spinner()
-            
-            # Force UI update to show loading indicators immediately
-            self.parent.update_idletasks()
         except Exception as e:
             logger.debug(f"Error setting up loading indicators: {str(e)}")
 
+        threading.Thread(
+            target=self._submit_worker,
+            args=(generation, feature_key, environment, user_context),
+            name="get-flag-status",
+            daemon=True
+        ).start()
+        self.submit_in_flight += 1
+        if self.submit_poll_job is None:
+            self.submit_poll_job = self.parent.after(SUBMIT_POLL_MS, self._poll_submit_results)
+
+    def cancel_pending_submit(self):
+        """Forget any request in flight; its result is dropped when it arrives"""
+        self.submit_generation += 1
+
+    def _submit_worker(self, generation, feature_key, environment, user_context):
+        """Worker thread: fetch and evaluate the flag, then hand the outcome to the Tk thread.
+
+        A superseded submit gives up its place in the rate-limiter queue instead of
+        taking a token; one already sent still completes and is discarded.
+        """
+        try:
+            flag_data = self.get_feature_flag_status(
+                feature_key, environment, user_context,
+                cancelled=lambda: generation != self.submit_generation
+            )
+            self.submit_queue.put((generation, feature_key, environment, flag_data, None))
+        except RequestCancelled as e:
+            logger.debug(f"Skipped superseded request for {feature_key}: {e}")
+            self.submit_queue.put((generation, feature_key, environment, None, e))
+        except Exception as e:
+            self.submit_queue.put((generation, feature_key, environment, None, e))
+
+    def _poll_submit_results(self):
+        """Tk thread: apply the latest submit's result, discarding superseded ones"""
+        self.submit_poll_job = None
+        while True:
+            try:
+                generation, feature_key, environment, flag_data, error = self.submit_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.submit_in_flight -= 1
+            if generation != self.submit_generation:
+                logger.debug(f"Discarding superseded result for {feature_key}")
+                continue
+            self._show_submit_result(feature_key, environment, flag_data, error)
+            # Hide loading indicator
+            self.loading_frame.pack_forget()
+            self.loading_var.set("")
+
+        if self.submit_in_flight > 0:
+            self.submit_poll_job = self.parent.after(SUBMIT_POLL_MS, self._poll_submit_results)
+
+    def _show_submit_result(self, feature_key, environment, flag_data, error):
+        """Render a finished submit (or its error) and write the audit entry"""
+        if error is not None:
+            self.status_var.set("❌ Error occurred")
+            self.response_text.config(state="normal")
+            self.response_text.delete(1.0, tk.END)
+            self.response_text.insert(1.0, f"Error: {str(error)}")
+            logging.error(f"Error getting feature flag status: {str(error)}")
+            try:
+                audit_event(
+                    "get_flag",
+                    {
+                        "feature_key": feature_key,
+                        "environment": environment,
+                        "error": str(error),
+                    },
+                    ok=False,
+                )
+            except Exception:
+                pass
+            return
+
         try:
-            # Get flag status using LaunchDarkly API
-            flag_data = self.get_feature_flag_status(feature_key, environment, user_context)
-            
             if flag_data:
                 self.display_flag_status(flag_data)
                 # Ensure logging is configured (fallback to file if no handlers)
@@ -610,30 +735,9 @@ class GetTab:
                     )
                 except Exception:
                     pass
-                
         except Exception as e:
             self.status_var.set("❌ Error occurred")
-            self.response_text.config(state="normal")
-            self.response_text.delete(1.0, tk.END)
-            self.response_text.insert(1.0, f"Error: {str(e)}")
-            logging.error(f"Error getting feature flag status: {str(e)}")
-            try:
-                audit_event(
-                    "get_flag",
-                    {
-                        "feature_key": feature_key,
-                        "environment": environment,
-                        "error": str(e),
-                    },
-                    ok=False,
-                )
-            except Exception:
-                pass
-
-        # Hide loading indicator
-        self.loading_frame.pack_forget()
-        self.loading_var.set("")
-        self.submit_button.config(state="normal")
+            logging.error(f"Error displaying feature flag status: {str(e)}")
 
 
     def build_user_context(self, pmcid, siteid):
@@ -641,32 +745,137 @@ class GetTab:
         # If no context fields provided, return empty
         if not pmcid and not siteid:
             return ""
-        
-        context = {}
-        
-        # Add PMC ID if provided (try to convert to int if it's numeric)
-        if pmcid:
+        return json.dumps(build_context(pmcid, siteid))
+
+    def open_batch_dialog(self):
+        """Evaluate the flag for a CSV or pasted list of PMC/Site IDs and save the results as CSV"""
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("Batch Evaluate")
+        dialog.geometry("560x520")
+        dialog.transient(self.parent.winfo_toplevel())
+
+        main = ttk.Frame(dialog, padding=16)
+        main.pack(fill="both", expand=True)
+
+        form = ttk.Frame(main)
+        form.pack(fill="x")
+        ttk.Label(form, text="Flag key:").grid(row=0, column=0, sticky="w", pady=4)
+        key_var = tk.StringVar(value=self.key_var.get().strip())
+        ttk.Entry(form, textvariable=key_var, width=40).grid(row=0, column=1, sticky="we", pady=4)
+        ttk.Label(form, text="Environment:").grid(row=1, column=0, sticky="w", pady=4)
+        env_var = tk.StringVar(value=self.env_var.get())
+        ttk.Combobox(form, textvariable=env_var, values=READ_ENVIRONMENT_OPTIONS, state="readonly", width=12).grid(
+            row=1, column=1, sticky="w", pady=4)
+        form.columnconfigure(1, weight=1)
+
+        input_path = {"value": None}
+        file_label_var = tk.StringVar(value="No CSV selected - or paste PMC IDs below (pmc[,site] per line)")
+
+        def choose_file():
+            from tkinter import filedialog
+            path = filedialog.askopenfilename(
+                parent=dialog, title="Contexts CSV",
+                filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt"), ("All files", "*.*")])
+            if path:
+                input_path["value"] = path
+                file_label_var.set(os.path.basename(path))
+
+        file_row = ttk.Frame(main)
+        file_row.pack(fill="x", pady=(10, 4))
+        ttk.Button(file_row, text="Load CSV...", bootstyle="secondary", command=choose_file).pack(side="left")
+        ttk.Label(file_row, textvariable=file_label_var).pack(side="left", padx=(8, 0))
+
+        paste_text = tk.Text(main, height=12, wrap="none", font=("Consolas", 10))
+        paste_text.pack(fill="both", expand=True, pady=(4, 8))
+
+        status_var = tk.StringVar(value="")
+        ttk.Label(main, textvariable=status_var, wraplength=520, justify="left").pack(fill="x", pady=(0, 8))
+
+        buttons = ttk.Frame(main)
+        buttons.pack(fill="x")
+        run_button = ttk.Button(buttons, text="Evaluate & Save CSV...", bootstyle="primary")
+        run_button.pack(side="right")
+        ttk.Button(buttons, text="Close", bootstyle="secondary", command=dialog.destroy).pack(side="right", padx=(0, 8))
+
+        results = queue.Queue()
+
+        def poll():
             try:
-                context["PmcId"] = int(pmcid)  # LaunchDarkly rules often expect numeric PMC IDs
-            except ValueError:
-                context["PmcId"] = pmcid  # Keep as string if not numeric
-                
-        # Add Site ID if provided
-        if siteid:
-            context["SiteId"] = siteid
-            
-        # Auto-generate user key based on provided context
-        if pmcid and siteid:
-            context["key"] = f"user-pmc{pmcid}-site{siteid}"
-        elif pmcid:
-            context["key"] = f"user-pmc{pmcid}"
-        elif siteid:
-            context["key"] = f"user-site{siteid}"
-            
-        return json.dumps(context)
+                while True:
+                    kind, payload = results.get_nowait()
+                    if kind == "progress":
+                        status_var.set(f"Evaluated {payload:,} contexts...")
+                    elif kind == "done":
+                        counts = ", ".join(f"{v or '(none)'}: {n:,}" for v, n in payload["by_value"].items())
+                        status_var.set(f"Done: {payload['evaluated']:,} contexts -> {payload['output_path']}\n{counts}")
+                        run_button.config(state="normal")
+                        return
+                    elif kind == "error":
+                        status_var.set(f"Error: {payload}")
+                        run_button.config(state="normal")
+                        return
+            except queue.Empty:
+                pass
+            if dialog.winfo_exists():
+                dialog.after(100, poll)
+
+        def run():
+            flag_key = key_var.get().strip()
+            if not flag_key:
+                messagebox.showwarning("Warning", "Please enter a feature flag key.", parent=dialog)
+                return
+            pasted = paste_text.get("1.0", tk.END).strip()
+            if not input_path["value"] and not pasted:
+                messagebox.showwarning("Warning", "Load a CSV or paste PMC IDs first.", parent=dialog)
+                return
+            from tkinter import filedialog
+            output_path = filedialog.asksaveasfilename(
+                parent=dialog, title="Save results", defaultextension=".csv",
+                initialfile=f"{flag_key}_{env_var.get()}_evaluation.csv", filetypes=[("CSV files", "*.csv")])
+            if not output_path:
+                return
+            env_key = ENVIRONMENT_MAPPINGS.get(env_var.get(), env_var.get())
+            source_path = input_path["value"]
 
-    def get_feature_flag_status(self, feature_key, environment, user_context=None):
-        """Get feature flag status using LaunchDarkly API with user context evaluation"""
+            def worker():
+                try:
+                    flag = self.api_client.get_flag(flag_key)
+                    if not flag:
+                        raise ValueError(f"Flag '{flag_key}' not found")
+                    if source_path:
+                        with open(source_path, newline="", encoding="utf-8-sig") as source:
+                            summary = run_batch_evaluation(
+                                flag, env_key, iter_contexts_csv(source), output_path,
+                                evaluator=self.evaluator, progress_callback=lambda n: results.put(("progress", n)))
+                    else:
+                        summary = run_batch_evaluation(
+                            flag, env_key, iter_contexts_text(pasted), output_path,
+                            evaluator=self.evaluator, progress_callback=lambda n: results.put(("progress", n)))
+                    audit_event("batch_evaluate", {"feature_key": flag_key, "environment": env_key,
+                                                   "contexts": summary["evaluated"]}, ok=True)
+                    results.put(("done", summary))
+                except Exception as e:
+                    logger.error(f"Batch evaluation failed: {e}")
+                    results.put(("error", str(e)))
+
+            run_button.config(state="disabled")
+            status_var.set("Fetching flag...")
+            threading.Thread(target=worker, daemon=True).start()
+            poll()
+
+        run_button.config(command=run)
+
+    def get_feature_flag_status(self, feature_key, environment, user_context=None, cancelled=None):
+        """Get feature flag status using LaunchDarkly API with user context evaluation.
+
+        With environment == ALL_ENVIRONMENTS the flag is still fetched once; the first
+        read environment drives the regular views and every read environment is
+        evaluated from the same payload into "environment_matrix". ``cancelled`` lets a
+        superseded submit skip the fetch (RequestCancelled).
+        """
+        all_environments = environment == ALL_ENVIRONMENTS
+        if all_environments:
+            environment = READ_ENVIRONMENT_OPTIONS[0]
         # Environment mapping
         actual_env = ENVIRONMENT_MAPPINGS.get(environment, environment)
         
@@ -675,21 +884,13 @@ class GetTab:
             logging.error("Missing LaunchDarkly configuration (PROJECT_KEY or API key). Cannot get feature flag status.")
             return None
 
-        # Build the API URL
+        # Build the API URL (shown in the view; the request goes through the pooled client)
         url = f"{LAUNCHDARKLY_BASE_URL}/flags/{PROJECT_KEY}/{feature_key}"
         
-        headers = {
-            "Authorization": LAUNCHDARKLY_API_KEY,
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            flag_data = self.api_client.get_flag_raw(feature_key, cancelled=cancelled)
             
-            if response.status_code == 200:
-                flag_data = response.json()
-                
+            if flag_data:
                 # Extract environment-specific data
                 environments = flag_data.get("environments", {})
                 env_data = environments.get(actual_env, {})
@@ -703,7 +904,7 @@ class GetTab:
                     app_url = links.get("site", {}).get("href") or ""
                 except Exception:
                     app_url = ""
-                return {
+                result = {
                     "key": feature_key,
                     "name": flag_data.get("name", ""),
                     "description": flag_data.get("description", ""),
@@ -718,8 +919,11 @@ class GetTab:
                     "api_url": url,
                     "app_url": app_url,
                 }
+                if all_environments:
+                    result["environment_matrix"] = self.compare_environments(flag_data, user_context)
+                return result
             else:
-                logging.error(f"API Error: {response.status_code} - {response.text}")
+                logging.error(f"API Error: empty response for {feature_key}")
                 return None
                 
         except requests.exceptions.RequestException as e:
@@ -734,21 +938,14 @@ class GetTab:
                 "message": "No user context provided - showing default flag status"
             }
         
-        try:
-            # Try to parse as JSON first
-            context_data = json.loads(user_context)
-            context_type = "JSON"
-        except:
-            # If not JSON, treat as simple string
-            context_data = {"key": user_context.strip()}
-            context_type = "Simple"
+        context_data, context_type = self._parse_user_context(user_context)
         
         # Get environment data
         environments = flag_data.get("environments", {})
         env_data = environments.get(environment, {})
         
         # Determine variation based on context
-        variation_result = self.determine_variation(context_data, env_data, flag_data)
+        variation_result = self.determine_variation(context_data, env_data, flag_data, env_key=environment)
         
         return {
             "provided": True,
@@ -758,104 +955,80 @@ class GetTab:
             "message": f"User context evaluated: {variation_result['message']}"
         }
 
-    def determine_variation(self, context_data, env_data, flag_data):
-        """Determine flag variation based on user context"""
-        # Debug: Environment and context details
+    def _parse_user_context(self, user_context):
+        """(context, "JSON"|"Simple") from the context text; plain text becomes the context key"""
+        try:
+            # Try to parse as JSON first
+            return json.loads(user_context), "JSON"
+        except Exception:
+            # If not JSON, treat as simple string
+            return {"key": user_context.strip()}, "Simple"
+
+    def compare_environments(self, flag_data, user_context=None):
+        """Evaluate the context in every read environment from a single flag payload"""
+        if user_context and user_context.strip():
+            context_data = self._normalize_context(self._parse_user_context(user_context)[0])
+        else:
+            context_data = {}
+        env_keys = [ENVIRONMENT_MAPPINGS.get(env, env) for env in READ_ENVIRONMENT_OPTIONS]
+        environments = flag_data.get("environments", {}) or {}
+        evaluated = evaluate_environments(flag_data, env_keys, context_data, self.evaluator)
+
+        matrix = []
+        for label, (env_key, detail) in zip(READ_ENVIRONMENT_OPTIONS, evaluated):
+            row = {
+                "environment": label,
+                "actual_environment": env_key,
+                "present": detail is not None,
+                "enabled": bool((environments.get(env_key) or {}).get("on", False)),
+            }
+            if detail is not None:
+                row.update(detail.to_dict())
+                row["variation_index"] = detail.variation_index
+                row["reason"] = detail.kind
+            matrix.append(row)
+        return matrix
+
+    def determine_variation(self, context_data, env_data, flag_data, env_key=None):
+        """Determine flag variation based on user context (delegates to the evaluation engine)"""
         logger.debug(f"Environment data: {json.dumps(env_data, indent=2)}")
         logger.debug(f"User context: {json.dumps(context_data, indent=2)}")
         
-        # Check if flag is enabled
-        if not env_data.get("on", False):
-            return {
-                "variation": "OFF",
-                "value": False,
-                "message": "Flag is disabled in this environment"
-            }
-        
-        # Get rules and targets
-        rules = env_data.get("rules", [])
-        targets = env_data.get("targets", [])
-        
-        logger.debug(f"Found {len(rules)} rules and {len(targets)} targets")
-        
-        # Check if user matches any targets
-        user_key = context_data.get("key", "")
-        for t_idx, target in enumerate(targets):
-            if user_key in target.get("values", []):
-                variation = target.get("variation", 0)
-                return {
-                    "variation": f"Target Match (Variation {variation})",
-                    "value": self.get_variation_value(variation, flag_data),
-                    "message": f"User '{user_key}' matches target rule",
-                    "match": {"type": "target", "index": t_idx}
-                }
-        
-        # Check if user matches any rules
-        for i, rule in enumerate(rules):
-            logger.debug(f"Evaluating rule {i}: {json.dumps(rule, indent=2)}")
-            if self.evaluate_rule(context_data, rule):
-                variation = rule.get("variation", 0)
-                return {
-                    "variation": f"Rule Match (Variation {variation})",
-                    "message": f"User context matches rule: {rule.get('description', 'Custom rule')}",
-                    "value": self.get_variation_value(variation, flag_data),
-                    "match": {"type": "rule", "index": i, "description": rule.get("description")}
-                }
-        
-        # Default to fallthrough
-        fallthrough = env_data.get("fallthrough", {})
-        variation = fallthrough.get("variation", 0)
-        logger.debug(f"Using fallthrough variation {variation}")
-        return {
-            "variation": f"Fallthrough (Variation {variation})",
-            "value": self.get_variation_value(variation, flag_data),
-            "message": "User context matches fallthrough (default) behavior",
-            "match": {"type": "fallthrough"}
-        }
+        detail = self.evaluator.evaluate(flag_data, env_key, self._normalize_context(context_data),
+                                         env_data=env_data, trace=True)
+        logger.debug(f"Evaluation result: {detail.kind} variation={detail.variation_index}")
+        logger.debug(f"Evaluation trace:\n{detail.trace.format()}")
+        return detail.to_dict()
 
     def evaluate_rule(self, context_data, rule):
-        """Evaluate if user context matches a rule"""
-        clauses = rule.get("clauses", [])
-        
-        logger.debug(f"Evaluating rule with {len(clauses)} clauses")
-        logger.debug(f"Context data: {context_data}")
-        
-        for clause in clauses:
-            attribute = clause.get("attribute", "")
-            op = clause.get("op", "")
-            values = clause.get("values", [])
-            
-            # Get user attribute value
-            user_value = context_data.get(attribute, "")
-            
-            # Handle type conversion for numeric values
-            if attribute in ["PmcId", "pmcId"] and user_value:
-                try:
-                    user_value = int(user_value)
-                except (ValueError, TypeError):
-                    pass  # Keep as string if conversion fails
-                    
-            # Handle SiteId comparison
-            if attribute in ["SiteId", "siteId"] and user_value:
-                # SiteId is typically a string, no conversion needed
-                pass
-            
-            # Debug logging
-            logger.debug(f"Evaluating clause - attribute='{attribute}', op='{op}', user_value='{user_value}' (type: {type(user_value)}), values={values}")
-            
-            # Simple evaluation (can be enhanced)
-            if op == "in" and user_value in values:
-                logger.debug(f"Rule matched: {user_value} in {values}")
-                return True
-            elif op == "is" and user_value in values:
-                logger.debug(f"Rule matched: {user_value} is in {values}")
-                return True
-            elif op == "matches" and str(user_value) in [str(v) for v in values]:
-                logger.debug(f"Rule matched (string comparison): {user_value} matches {values}")
-                return True
-        
-        logger.debug("No rule match found")
-        return False
+        """Evaluate if user context matches a rule (all clauses must match)"""
+        compiled = compile_flag({"key": "", "variations": []}, env_data={"rules": [rule]}).rules[0]
+        return compiled.matches(self._normalize_context(context_data))
+
+    def _normalize_context(self, context_data):
+        """PMC IDs typed as text are compared as numbers, matching how rules store them"""
+        context = dict(context_data) if isinstance(context_data, dict) else {"key": str(context_data)}
+        for attribute in ("PmcId", "pmcId"):
+            value = context.get(attribute)
+            if isinstance(value, str) and value.strip().isdigit():
+                context[attribute] = int(value.strip())
+        return context
+
+    def _lookup_prerequisite(self, flag_key):
+        """Fetch a prerequisite flag for evaluation (served from the client cache when fresh)"""
+        try:
+            return self.api_client.get_flag(flag_key)
+        except Exception as e:
+            logger.debug(f"Prerequisite lookup failed for {flag_key}: {e}")
+            return None
+
+    def _lookup_segment(self, env_key, segment_key):
+        """Fetch a segment for segmentMatch clauses (from the client's bulk per-environment cache)"""
+        try:
+            return self.api_client.get_segment(env_key, segment_key)
+        except Exception as e:
+            logger.debug(f"Segment lookup failed for {segment_key} in {env_key}: {e}")
+            return None
 
     def get_variation_value(self, variation_index, flag_data):
         """Return the variation value for the given index from the flag data.
@@ -963,6 +1136,13 @@ class GetTab:
         if user_key:
             summary_lines.append(f"🔑 User Key: {user_key}")
 
+        matrix = flag_data.get("environment_matrix")
+        if matrix:
+            summary_lines.append("🗂️ All environments:")
+            for row in matrix:
+                _, status, result, _, _ = self._matrix_cells(row)
+                summary_lines.append(f"   {row['environment']}: {status} → {result}")
+
         # Show in FLAG STATUS section
         self.status_var.set("\n".join(summary_lines))
 
@@ -984,9 +1164,15 @@ class GetTab:
         self.response_text.insert(1.0, json.dumps(full_data, indent=2))
         self.response_text.config(state="disabled")
 
-        # Default to Visual tab
+        # Environment comparison (ALL mode only)
         try:
-            self.view_tabs.select(self.visual_frame)
+            self.render_compare_view(matrix)
+        except Exception as e:
+            logger.debug(f"render_compare_view error: {e}")
+
+        # Default to Visual tab (Compare when several environments were evaluated)
+        try:
+            self.view_tabs.select(self.compare_frame if matrix else self.visual_frame)
         except Exception:
             pass
 
@@ -1018,6 +1204,32 @@ class GetTab:
         except Exception as e:
             logger.debug(f"save last_flag history error: {e}")
 
+    def _matrix_cells(self, row):
+        """(environment, status, result, variation, reason) display values for one matrix row"""
+        environment = f"{row['environment']} ({row['actual_environment']})"
+        if not row.get("present"):
+            return environment, "-", "-", "-", "Environment not in flag"
+        value = row.get("value")
+        result = "Enabled" if value is True else ("Disabled" if value is False else str(value))
+        variation = row.get("variation_index")
+        return (
+            environment,
+            "On" if row.get("enabled") else "Off",
+            result,
+            "" if variation is None else str(variation),
+            row.get("message", ""),
+        )
+
+    def render_compare_view(self, matrix):
+        """Fill the Compare tab with one row per environment; hide it when there is no matrix"""
+        self.compare_tree.delete(*self.compare_tree.get_children())
+        if not matrix:
+            self.view_tabs.hide(self.compare_frame)
+            return
+        for row in matrix:
+            self.compare_tree.insert("", "end", values=self._matrix_cells(row))
+        self.view_tabs.add(self.compare_frame)
+
     def render_summary_view(self, flag_data):
         """Render a concise text-only summary of the flag and evaluation."""
         full = flag_data.get("full_data", {})
@@ -1073,6 +1285,8 @@ class GetTab:
                     lines.append(f"Matched: {desc}")
                 elif match.get('type') == 'target':
                     lines.append("Matched: Target list")
+                elif match.get('type') == 'prerequisite':
+                    lines.append(f"Matched: Prerequisite '{match.get('key')}' not met")
                 else:
                     lines.append("Matched: Default rule (fallthrough)")
             except Exception:
@@ -1087,6 +1301,21 @@ class GetTab:
             ctx_parts.append(f"SiteId={site}")
         if ctx_parts:
             lines.append("Context: " + ", ".join(ctx_parts))
+        trace = var.get("trace") if isinstance(var, dict) else None
+        if trace:
+            lines.append("")
+            lines.append("Evaluation trace:")
+            for step in trace:
+                outcome = "match" if step.get("matched") else "no match"
+                note = f" - {step['note']}" if step.get("note") else ""
+                lines.append(f"  {step.get('step')} {step.get('subject')}: {outcome} ({step.get('us')}us){note}")
+        matrix = flag_data.get("environment_matrix")
+        if matrix:
+            lines.append("")
+            lines.append("All environments:")
+            for row in matrix:
+                env_label, status, result, _, reason = self._matrix_cells(row)
+                lines.append(f"  {env_label}: {status}, {result} - {reason}")
 
         # Push to widget
         text = "\n".join(lines)
@@ -112,11 +112,14 @@ class NotificationsTab:
             values=[
                 "Any",
                 "feature_flag_change",
+                "bulk_flag_change",
                 "get_flag",
                 "update_flag",
+                "bulk_update_flag",
                 "create_flag",
                 "default_rule_update",
                 "pmc_targeting_update",
+                "pmc_rules_promotion",
             ],
             state="readonly",
             width=22,
@@ -4,12 +4,17 @@ from tkinter import messagebox
 import logging
 import requests
 import json
+import queue
+import threading
 from datetime import datetime
-from app_logic import update_flag
+from app_logic import bulk_update_flags, parse_bulk_changes, update_flag
 from shared.config_loader import LOG_FILE, LAUNCHDARKLY_API_KEY, PROJECT_KEY
 from api_config.api_endpoints import FeatureFlagEndpoints, APIHeaders, APIConfig, URLBuilder
-from shared.constants import UPDATE_ENVIRONMENT_OPTIONS, ENVIRONMENT_MAPPINGS
-from api_client import get_client
+from shared.constants import READ_ENVIRONMENT_OPTIONS, UPDATE_ENVIRONMENT_OPTIONS, ENVIRONMENT_MAPPINGS
+from api_client import (PatchConflict, PatchRejected, get_client, is_guarded_patch, is_patch_conflict,
+                        patch_error_message)
+from targeting import (apply_bulk_pmc_targeting, apply_pmc_targeting, apply_toggle, build_patch_operations,
+                       parse_pmc_ids, preview_default_rule, preview_pmc_targeting, preview_toggle, promote_flags)
 from shared.audit import audit_event
 from ui.widgets.help_icon import HelpIcon
 from utils.settings_manager import SettingsManager
@@ -321,6 +326,48 @@ class UpdateTab:
         _uh8.pack(side="left", padx=(2,0))
         self._help_icons.append((_uh8, {"side": "left", "padx": (2,0)}))
 
+        preview_group = ttk.Frame(button_container)
+        preview_group.pack(side="left", padx=(15, 0))
+        preview_button = ttk.Button(
+            preview_group,
+            text="🔍 Preview",
+            bootstyle="info-outline",
+            width=12,
+            command=self.open_preview_dialog
+        )
+        preview_button.pack(side="left")
+        _uh10 = HelpIcon(preview_group, "update.preview")
+        _uh10.pack(side="left", padx=(2,0))
+        self._help_icons.append((_uh10, {"side": "left", "padx": (2,0)}))
+
+        bulk_group = ttk.Frame(button_container)
+        bulk_group.pack(side="left", padx=(15, 0))
+        bulk_button = ttk.Button(
+            bulk_group,
+            text="📋 Bulk Toggle",
+            bootstyle="info-outline",
+            width=15,
+            command=self.open_bulk_toggle_dialog
+        )
+        bulk_button.pack(side="left")
+        _uh9 = HelpIcon(bulk_group, "update.bulk_toggle")
+        _uh9.pack(side="left", padx=(2,0))
+        self._help_icons.append((_uh9, {"side": "left", "padx": (2,0)}))
+
+        promote_group = ttk.Frame(button_container)
+        promote_group.pack(side="left", padx=(15, 0))
+        promote_button = ttk.Button(
+            promote_group,
+            text="⏫ Promote",
+            bootstyle="info-outline",
+            width=12,
+            command=self.open_promote_dialog
+        )
+        promote_button.pack(side="left")
+        _uh11 = HelpIcon(promote_group, "update.promote")
+        _uh11.pack(side="left", padx=(2,0))
+        self._help_icons.append((_uh11, {"side": "left", "padx": (2,0)}))
+
         # === TWO-COLUMN LAYOUT: STATUS & API RESPONSE ===
         columns_container = ttk.Frame(content_container)
         columns_container.pack(fill="both", expand=True, padx=8, pady=6)
@@ -437,6 +484,347 @@ class UpdateTab:
             self.set_help_icons_visible(False)
 
     # --- Event Handlers ---
+    def open_preview_dialog(self):
+        """Dry run: show the JSON Patch and rule diff for the current inputs without sending anything"""
+        feature_key = self.update_key_var.get().strip()
+        environment = self.environment_entry.get()
+        if not feature_key:
+            messagebox.showwarning("Warning", "Please enter a feature flag key.")
+            return
+        pmc_ids = parse_pmc_ids(self.pmcid_var.get().strip())
+        default_value = self._default_rule_choice()
+
+        dialog = tk.Toplevel(self.parent)
+        dialog.title(f"Preview - {feature_key} ({environment})")
+        dialog.geometry("760x620")
+        dialog.transient(self.parent.winfo_toplevel())
+
+        main = ttk.Frame(dialog, padding=16)
+        main.pack(fill="both", expand=True)
+
+        mode_var = tk.StringVar(value="on")
+        modes = ttk.Frame(main)
+        modes.pack(fill="x")
+        for text, value in (("Turn ON", "on"), ("Turn OFF", "off"), ("Default rule only", "default")):
+            ttk.Radiobutton(modes, text=text, variable=mode_var, value=value,
+                            command=lambda: render()).pack(side="left", padx=(0, 12))
+        target = f"PMC IDs: {', '.join(str(p) for p in pmc_ids)}" if pmc_ids else "Global toggle (no PMC ID)"
+        ttk.Label(main, text=target, wraplength=720, justify="left").pack(fill="x", pady=(6, 0))
+
+        text_frame = ttk.Frame(main)
+        text_frame.pack(fill="both", expand=True, pady=(8, 8))
+        preview_text = tk.Text(text_frame, wrap="none", font=("Consolas", 10))
+        scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=preview_text.yview)
+        preview_text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        preview_text.pack(side="left", fill="both", expand=True)
+
+        buttons = ttk.Frame(main)
+        buttons.pack(fill="x")
+        apply_button = ttk.Button(buttons, text="Apply", bootstyle="primary", state="disabled")
+        apply_button.pack(side="right")
+        ttk.Button(buttons, text="Close", bootstyle="secondary", command=dialog.destroy).pack(side="right", padx=(0, 8))
+
+        state = {"flag": None}
+        results = queue.Queue()
+
+        def show(content):
+            preview_text.config(state="normal")
+            preview_text.delete("1.0", tk.END)
+            preview_text.insert("1.0", content)
+            preview_text.config(state="disabled")
+
+        def render():
+            flag = state["flag"]
+            if not flag:
+                return
+            mode = mode_var.get()
+            try:
+                if mode == "default":
+                    if default_value is None:
+                        show("Choose True or False under 'Default rule (fallthrough)' to preview it.")
+                        apply_button.config(state="disabled")
+                        return
+                    preview = preview_default_rule(flag, environment, default_value)
+                elif pmc_ids:
+                    preview = preview_pmc_targeting(flag, environment, pmc_ids, mode == "on", default_value)
+                else:
+                    preview = preview_toggle(flag, environment, mode == "on", default_value)
+                show(preview.format())
+                apply_button.config(state="normal" if preview.changes and not preview.error else "disabled")
+            except Exception as e:
+                logger.error(f"Preview failed: {e}")
+                show(f"Preview failed: {e}")
+                apply_button.config(state="disabled")
+
+        def apply():
+            mode = mode_var.get()
+            dialog.destroy()
+            if mode == "default":
+                self.apply_default_rule()
+            else:
+                self.toggle_feature_flag(mode == "on")
+
+        def poll():
+            try:
+                kind, payload = results.get_nowait()
+            except queue.Empty:
+                if dialog.winfo_exists():
+                    dialog.after(100, poll)
+                return
+            if kind == "done":
+                state["flag"] = payload
+                render()
+            else:
+                show(f"Error: {payload}")
+
+        def worker():
+            try:
+                flag = self.get_flag_configuration(feature_key)
+                if not flag:
+                    raise ValueError("Could not retrieve flag configuration")
+                results.put(("done", flag))
+            except Exception as e:
+                results.put(("error", str(e)))
+
+        apply_button.config(command=apply)
+        show("Fetching flag configuration...")
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+
+    def open_bulk_toggle_dialog(self):
+        """Turn many flags ON/OFF in one run: one line per change, executed concurrently"""
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("Bulk Toggle")
+        dialog.geometry("560x520")
+        dialog.transient(self.parent.winfo_toplevel())
+
+        main = ttk.Frame(dialog, padding=16)
+        main.pack(fill="both", expand=True)
+
+        ttk.Label(
+            main,
+            text=f"One change per line: <flag> <env> <on|off>   (env: {', '.join(UPDATE_ENVIRONMENT_OPTIONS)})",
+            wraplength=520,
+            justify="left"
+        ).pack(fill="x")
+
+        lines_text = tk.Text(main, height=14, wrap="none", font=("Consolas", 10))
+        lines_text.pack(fill="both", expand=True, pady=(6, 8))
+        feature_key = self.update_key_var.get().strip()
+        if feature_key:
+            lines_text.insert("1.0", f"{feature_key} {self.environment_entry.get()} on\n")
+
+        status_var = tk.StringVar(value="")
+        ttk.Label(main, textvariable=status_var, wraplength=520, justify="left").pack(fill="x", pady=(0, 8))
+
+        buttons = ttk.Frame(main)
+        buttons.pack(fill="x")
+        run_button = ttk.Button(buttons, text="Apply Changes", bootstyle="primary")
+        run_button.pack(side="right")
+        ttk.Button(buttons, text="Close", bootstyle="secondary", command=dialog.destroy).pack(side="right", padx=(0, 8))
+
+        results = queue.Queue()
+
+        def poll():
+            try:
+                while True:
+                    kind, payload = results.get_nowait()
+                    if kind == "progress":
+                        done, total, item = payload
+                        state = "ok" if item["success"] else "FAILED"
+                        status_var.set(f"{done}/{total} - {item['feature_key']} ({item['environment']}) {state}")
+                    elif kind == "done":
+                        failed = [r for r in payload["results"] if not r["success"]]
+                        message = f"Done: {payload['succeeded']}/{len(payload['results'])} applied"
+                        if failed:
+                            message += "\nFailed: " + ", ".join(f"{r['feature_key']} ({r['environment']})" for r in failed[:10])
+                        status_var.set(message)
+                        self.update_response_box({
+                            "operation": "bulk_feature_flag_update",
+                            "timestamp": datetime.now().isoformat(),
+                            "success": not failed,
+                            "result_message": message,
+                            "api_responses": [
+                                {"operation": f"{r['feature_key']} {r['environment']} {'ON' if r['enabled'] else 'OFF'}",
+                                 "success": r["success"], "message": r["error"] or ""}
+                                for r in payload["results"]
+                            ],
+                            "results": payload["results"]
+                        })
+                        run_button.config(state="normal")
+                        return
+                    elif kind == "error":
+                        status_var.set(f"Error: {payload}")
+                        run_button.config(state="normal")
+                        return
+            except queue.Empty:
+                pass
+            if dialog.winfo_exists():
+                dialog.after(100, poll)
+
+        def run():
+            changes, errors = parse_bulk_changes(lines_text.get("1.0", tk.END))
+            # Writes stay limited to the update environments (no PROD)
+            errors += [f"{key}: environment '{env}' cannot be updated" for key, env, _ in changes
+                       if env not in UPDATE_ENVIRONMENT_OPTIONS]
+            if errors:
+                messagebox.showwarning("Warning", "\n".join(errors[:15]), parent=dialog)
+                return
+            if not changes:
+                messagebox.showwarning("Warning", "Enter at least one change.", parent=dialog)
+                return
+            if not messagebox.askyesno("Confirm", f"Apply {len(changes)} flag changes?", parent=dialog):
+                return
+            for key, _, _ in changes:
+                self.history_manager.add_update_key(key)
+
+            def worker():
+                try:
+                    summary = bulk_update_flags(
+                        changes, progress_callback=lambda *p: results.put(("progress", p)))
+                    results.put(("done", summary))
+                except Exception as e:
+                    logger.error(f"Bulk toggle failed: {e}")
+                    results.put(("error", str(e)))
+
+            run_button.config(state="disabled")
+            status_var.set(f"Applying {len(changes)} changes...")
+            threading.Thread(target=worker, daemon=True).start()
+            poll()
+
+        run_button.config(command=run)
+
+    def open_promote_dialog(self):
+        """Copy PMC Enabled/Disabled rules from one environment to another for one or more flags"""
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("Promote PMC Rules")
+        dialog.geometry("760x640")
+        dialog.transient(self.parent.winfo_toplevel())
+
+        main = ttk.Frame(dialog, padding=16)
+        main.pack(fill="both", expand=True)
+
+        form = ttk.Frame(main)
+        form.pack(fill="x")
+        ttk.Label(form, text="From:").grid(row=0, column=0, sticky="w", pady=4)
+        source_var = tk.StringVar(value=UPDATE_ENVIRONMENT_OPTIONS[0])
+        ttk.Combobox(form, textvariable=source_var, values=READ_ENVIRONMENT_OPTIONS, state="readonly", width=10).grid(
+            row=0, column=1, sticky="w", pady=4, padx=(6, 16))
+        ttk.Label(form, text="To:").grid(row=0, column=2, sticky="w", pady=4)
+        target_var = tk.StringVar(value=UPDATE_ENVIRONMENT_OPTIONS[min(1, len(UPDATE_ENVIRONMENT_OPTIONS) - 1)])
+        ttk.Combobox(form, textvariable=target_var, values=UPDATE_ENVIRONMENT_OPTIONS, state="readonly", width=10).grid(
+            row=0, column=3, sticky="w", pady=4, padx=(6, 16))
+        mirror_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(form, text="Mirror (remove PMC IDs the source does not list)", variable=mirror_var).grid(
+            row=0, column=4, sticky="w", pady=4)
+
+        ttk.Label(main, text="Flag keys (one per line):").pack(anchor="w", pady=(8, 0))
+        flags_text = tk.Text(main, height=6, wrap="none", font=("Consolas", 10))
+        flags_text.pack(fill="x", pady=(4, 8))
+        feature_key = self.update_key_var.get().strip()
+        if feature_key:
+            flags_text.insert("1.0", feature_key + "\n")
+
+        result_frame = ttk.Frame(main)
+        result_frame.pack(fill="both", expand=True, pady=(0, 8))
+        result_text = tk.Text(result_frame, wrap="none", font=("Consolas", 10), state="disabled")
+        scrollbar = ttk.Scrollbar(result_frame, orient="vertical", command=result_text.yview)
+        result_text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        result_text.pack(side="left", fill="both", expand=True)
+
+        status_var = tk.StringVar(value="")
+        ttk.Label(main, textvariable=status_var, wraplength=720, justify="left").pack(fill="x", pady=(0, 8))
+
+        buttons = ttk.Frame(main)
+        buttons.pack(fill="x")
+        promote_button = ttk.Button(buttons, text="Promote", bootstyle="primary")
+        promote_button.pack(side="right")
+        preview_button = ttk.Button(buttons, text="Preview", bootstyle="info")
+        preview_button.pack(side="right", padx=(0, 8))
+        ttk.Button(buttons, text="Close", bootstyle="secondary", command=dialog.destroy).pack(side="right", padx=(0, 8))
+
+        results = queue.Queue()
+
+        def show(lines):
+            result_text.config(state="normal")
+            result_text.delete("1.0", tk.END)
+            result_text.insert("1.0", "\n".join(lines))
+            result_text.config(state="disabled")
+
+        def render(items, dry_run):
+            lines = []
+            for item in items:
+                icon = "✅" if item.get("success") else "❌"
+                lines.append(f"{icon} {item.get('flag')}: {item.get('message', '')}")
+                if dry_run and item.get("diff"):
+                    lines.extend(f"    {line}" for line in item["diff"])
+                lines.append("")
+            show(lines)
+
+        def poll():
+            try:
+                while True:
+                    kind, payload = results.get_nowait()
+                    if kind == "progress":
+                        done, total, item = payload
+                        status_var.set(f"{done}/{total} - {item.get('flag')}")
+                    elif kind == "done":
+                        items, dry_run = payload
+                        render(items, dry_run)
+                        ok = sum(1 for item in items if item.get("success"))
+                        verb = "previewed" if dry_run else "promoted"
+                        status_var.set(f"Done: {ok}/{len(items)} flags {verb}")
+                        preview_button.config(state="normal")
+                        promote_button.config(state="normal")
+                        return
+                    elif kind == "error":
+                        status_var.set(f"Error: {payload}")
+                        preview_button.config(state="normal")
+                        promote_button.config(state="normal")
+                        return
+            except queue.Empty:
+                pass
+            if dialog.winfo_exists():
+                dialog.after(100, poll)
+
+        def run(dry_run):
+            flag_keys = [line.strip() for line in flags_text.get("1.0", tk.END).splitlines() if line.strip()]
+            source, target = source_var.get(), target_var.get()
+            if not flag_keys:
+                messagebox.showwarning("Warning", "Enter at least one feature flag key.", parent=dialog)
+                return
+            if ENVIRONMENT_MAPPINGS.get(source, source) == ENVIRONMENT_MAPPINGS.get(target, target):
+                messagebox.showwarning("Warning", "Choose different source and target environments.", parent=dialog)
+                return
+            if not dry_run and not messagebox.askyesno(
+                    "Confirm", f"Promote PMC rules {source} -> {target} for {len(flag_keys)} flag(s)?", parent=dialog):
+                return
+
+            def worker():
+                try:
+                    items = promote_flags(
+                        flag_keys, source, target,
+                        fetch_flag=self.api_client.get_flag_raw,
+                        send_patch=self.api_client.patch_flag,
+                        mirror=mirror_var.get(),
+                        dry_run=dry_run,
+                        progress_callback=lambda *p: results.put(("progress", p)))
+                    results.put(("done", (items, dry_run)))
+                except Exception as e:
+                    logger.error(f"Promotion failed: {e}")
+                    results.put(("error", str(e)))
+
+            preview_button.config(state="disabled")
+            promote_button.config(state="disabled")
+            status_var.set(f"{'Previewing' if dry_run else 'Promoting'} {len(flag_keys)} flag(s)...")
+            threading.Thread(target=worker, daemon=True).start()
+            poll()
+
+        preview_button.config(command=lambda: run(True))
+        promote_button.config(command=lambda: run(False))
+
     def toggle_feature_flag(self, enable):
         """Toggle feature flag on/off with intelligent PMC ID targeting"""
         feature_key = self.update_key_var.get().strip()
@@ -488,53 +876,28 @@ class UpdateTab:
                 "api_responses": []
             }
             
-            # If PMC ID is provided, use intelligent targeting
-            if pmcid:
+            # If PMC ID is provided, use intelligent targeting (several IDs go out as one bulk patch)
+            pmc_ids = parse_pmc_ids(pmcid) if pmcid else []
+            if len(pmc_ids) > 1:
+                logger.debug(f"{len(pmc_ids)} PMC IDs provided, using bulk targeting...")
+                success, message, api_responses = self.update_flag_with_bulk_pmc_targeting(feature_key, environment, pmc_ids, siteid, enable)
+                response_data["api_responses"] = api_responses
+            elif pmcid:
                 logger.debug("PMC ID provided, using intelligent targeting...")
                 success, message, api_responses = self.update_flag_with_pmcid_targeting(feature_key, environment, pmcid, siteid, enable)
                 response_data["api_responses"] = api_responses
+            elif enable and self._default_rule_choice() is not None:
+                # Toggle and default rule composed into one JSON Patch (one GET + one write)
+                logger.debug("No PMC ID provided, toggling with default rule in a single patch...")
+                success, message, api_responses = self.update_flag_with_default_rule(feature_key, environment, enable)
+                response_data["api_responses"] = api_responses
             else:
-                # Use standard flag toggle
+                # Use standard flag toggle (one semantic patch, no GET)
                 logger.debug("No PMC ID provided, using standard flag toggle...")
                 success = update_flag(environment, feature_key, enable)
                 message = f"Flag '{feature_key}' {'enabled' if enable else 'disabled'} globally in {environment}"
                 response_data["api_responses"] = [{"operation": "standard_toggle", "success": success, "message": message}]
             
-            # If user requested to set default rule (fallthrough) to True/False and we are enabling,
-            # apply a follow-up JSON Patch to set fallthrough even on the standard path and audit it.
-            try:
-                desired = ""
-                if getattr(self, 'fallthrough_option_var', None):
-                    desired = (self.fallthrough_option_var.get() or "").strip().lower()
-                if success and enable and desired in ("true", "false"):
-                    logger.debug("Applying fallthrough update after standard toggle (no PMC ID)...")
-                    flag_data_std = self.get_flag_configuration(feature_key)
-                    if flag_data_std:
-                        ft_success = self.update_flag_configuration(feature_key, flag_data_std, environment)
-                        response_data["api_responses"].append({
-                            "operation": "fallthrough_update",
-                            "success": ft_success
-                        })
-                        # Audit default rule update for Notifications tab
-                        try:
-                            actual_env = ENVIRONMENT_MAPPINGS.get(environment, environment)
-                            audit_event(
-                                "default_rule_update",
-                                {
-                                    "feature_key": feature_key,
-                                    "environment": actual_env,
-                                    "enabled": True if desired == "true" else False,
-                                    "note": "fallthrough/offVariation updated after toggle",
-                                },
-                                ok=bool(ft_success),
-                            )
-                        except Exception:
-                            pass
-                        if not ft_success:
-                            logger.error("Failed to update fallthrough variation after standard toggle")
-            except Exception as e:
-                logger.exception(f"Exception applying fallthrough update after standard toggle: {str(e)}")
-            
             # Update response data with results
             response_data["success"] = success
             response_data["result_message"] = message
@@ -732,354 +1095,54 @@ class UpdateTab:
         finally:
             self.loading_frame.pack_forget()
 
+    def _default_rule_choice(self):
+        """True/False from the 'Default rule (fallthrough)' selector, or None for 'No value'."""
+        try:
+            desired = (self.fallthrough_option_var.get() or "").strip().lower()
+        except Exception:
+            return None
+        if desired in ("true", "false"):
+            return desired == "true"
+        return None
+
     def update_flag_with_pmcid_targeting(self, feature_key, environment, pmcid, siteid, enable):
-        """Update flag with intelligent PMC ID targeting"""
+        """Update flag with intelligent PMC ID targeting (two-rule system, see targeting.pmc)"""
         logger.debug(f"Starting intelligent targeting for PMC ID: {pmcid}")
-        
-        api_responses = []
-        
-        try:
-            # First, get the current flag configuration
-            flag_data = self.get_flag_configuration(feature_key)
-            if not flag_data:
-                api_responses.append({"operation": "get_flag_config", "success": False, "error": "Could not retrieve flag configuration"})
-                return False, "Could not retrieve flag configuration", api_responses
-            
-            api_responses.append({"operation": "get_flag_config", "success": True, "data": flag_data})
-            
-            actual_env = ENVIRONMENT_MAPPINGS.get(environment, environment)
-            environments = flag_data.get("environments", {})
-            env_data = environments.get(actual_env, {})
-            
-            if not env_data:
-                api_responses.append({"operation": "environment_check", "success": False, "error": f"Environment '{actual_env}' not found in flag configuration"})
-                return False, f"Environment '{actual_env}' not found in flag configuration", api_responses
-            
-            logger.debug(f"Current environment data retrieved for {actual_env}")
-            
-            # Check for existing PMC ID rules
-            rules = env_data.get("rules", [])
-            pmcid_int = None
-            try:
-                pmcid_int = int(pmcid)
-            except:
-                pmcid_int = pmcid  # Keep as string if conversion fails
-            
-            logger.debug("=== TWO-RULE SYSTEM ===")
-            logger.debug(f"Checking {len(rules)} existing rules for PMC ID: {pmcid_int}")
-            
-            # Debug: List all existing rules
-            for i, rule in enumerate(rules):
-                rule_desc = rule.get("description", "No description")
-                rule_var = rule.get("variation", "Unknown")
-                logger.debug(f"Rule {i}: '{rule_desc}' (variation: {rule_var})")
-            
-            # Determine the variation index for enable/disable FIRST
-            variations = flag_data.get("variations", [])
-            enable_variation = 0  # Assume first variation is "true/enabled"
-            disable_variation = 1  # Assume second variation is "false/disabled"
-            
-            # Try to determine correct variations based on values
-            for i, variation in enumerate(variations):
-                if variation.get("value") == True:
-                    enable_variation = i
-                elif variation.get("value") == False:
-                    disable_variation = i
-            
-            target_variation = enable_variation if enable else disable_variation
-            logger.debug(f"Target variation determined: {target_variation} ({'enable' if enable else 'disable'})")
-            logger.debug(f"Enable variation: {enable_variation}, Disable variation: {disable_variation}")
-            
-            # Look for the two standard PMC rules: enabled and disabled
-            enabled_rule_index = -1
-            disabled_rule_index = -1
-            current_pmcid_rule_index = -1
-            
-            for i, rule in enumerate(rules):
-                rule_description = rule.get("description", "").lower()
-                rule_variation = rule.get("variation", -1)
-                clauses = rule.get("clauses", [])
-                
-                # Check if this is one of our standard PMC rules
-                has_pmcid_clause = any(c.get("attribute") == "PmcId" for c in clauses)
-                
-                if has_pmcid_clause:
-                    if "pmcs enabled rule" in rule_description or rule_variation == enable_variation:
-                        if enabled_rule_index == -1:  # Only take the first one we find
-                            enabled_rule_index = i
-                            logger.debug(f"Found PMCs Enabled Rule at index {i} (description: '{rule.get('description', '')}')")
-                    elif "pmcs disabled rule" in rule_description or rule_variation == disable_variation:
-                        if disabled_rule_index == -1:  # Only take the first one we find
-                            disabled_rule_index = i
-                            logger.debug(f"Found PMCs Disabled Rule at index {i} (description: '{rule.get('description', '')}')")
-                
-                # Check if this PMC ID is in any rule
-                for clause in clauses:
-                    if clause.get("attribute") == "PmcId":
-                        clause_values = clause.get("values", [])
-                        if pmcid_int in clause_values or str(pmcid_int) in clause_values:
-                            current_pmcid_rule_index = i
-                            logger.debug(f"Found PMC ID {pmcid_int} in rule at index {i} (variation {rule_variation})")
-                            break
-                
-                if current_pmcid_rule_index >= 0:
-                    continue  # Keep looking for standard rules even if we found the PMC
-            
-            # Determine what action to take with the two-rule system
-            target_rule_index = enabled_rule_index if enable else disabled_rule_index
-            source_rule_index = disabled_rule_index if enable else enabled_rule_index
-            
-            logger.debug(f"Target rule index: {target_rule_index}, Source rule index: {source_rule_index}")
-            
-            # Check if PMC is already in the correct rule
-            if current_pmcid_rule_index == target_rule_index and target_rule_index >= 0:
-                logger.debug(f"PMC ID {pmcid_int} already in correct rule")
-                action_description = f"PMC ID {pmcid_int} already {'enabled' if enable else 'disabled'} - no changes needed"
-                success = True
-                rule_to_apply = None
-                rule_index_to_update = -1
-                # DEDUPE: ensure PMC is not present in the opposite rule
-                try:
-                    patches_needed = []
-                    if source_rule_index >= 0:
-                        src_rule = rules[source_rule_index].copy()
-                        for clause in src_rule.get("clauses", []):
-                            if clause.get("attribute") == "PmcId":
-                                vals = clause.get("values", [])
-                                new_vals = [v for v in vals if v != pmcid_int and v != str(pmcid_int)]
-                                if len(new_vals) != len(vals):
-                                    clause["values"] = new_vals
-                                    if not new_vals:
-                                        # Remove empty rule entirely
-                                        patches_needed.append({
-                                            "op": "remove",
-                                            "path": f"/environments/{actual_env}/rules/{source_rule_index}"
-                                        })
-                                    else:
-                                        # Replace the opposite rule with the updated values
-                                        patches_needed.append({
-                                            "op": "replace",
-                                            "path": f"/environments/{actual_env}/rules/{source_rule_index}",
-                                            "value": src_rule
-                                        })
-                                break
-                    if patches_needed:
-                        dedupe_ok = self.update_flag_configuration(
-                            feature_key,
-                            flag_data,
-                            environment,
-                            rule_index_to_update=-1,
-                            rule_to_apply=None,
-                            additional_operations=patches_needed
-                        )
-                        api_responses.append({
-                            "operation": "dedupe_source_rule",
-                            "success": bool(dedupe_ok),
-                            "message": "Removed PMC from opposite rule to avoid duplication"
-                        })
-                        if dedupe_ok:
-                            action_description += " | deduped in opposite rule"
-                except Exception as _e:
-                    logger.debug(f"Dedupe check error: {_e}")
-            elif current_pmcid_rule_index == -1 and target_rule_index == -1:
-                # No PMC rules exist yet - create the first standard rule
-                logger.debug("No PMC targeting rules exist yet, creating first standard rule")
-                rule_to_apply = self.create_standard_pmc_rule(pmcid_int, target_variation, enable)
-                rule_index_to_update = -1
-                action_description = f"Created first PMC targeting rule: {'enabled' if enable else 'disabled'} with PMC {pmcid_int}"
-                additional_ops = []
-            else:
-                # Need to move PMC between rules or add to target rule
-                patches_needed = []
-                
-                # Step 1: Remove from source rule (if exists)
-                rule_deleted = False
-                adjusted_target_rule_index = target_rule_index
-                
-                if current_pmcid_rule_index >= 0 and current_pmcid_rule_index != target_rule_index:
-                    logger.debug(f"Removing PMC ID {pmcid_int} from rule at index {current_pmcid_rule_index}")
-                    source_rule = rules[current_pmcid_rule_index].copy()
-                    
-                    # Remove PMC ID from the source rule
-                    remaining_pmcs = []
-                    for clause in source_rule["clauses"]:
-                        if clause.get("attribute") == "PmcId":
-                            clause_values = clause.get("values", [])
-                            new_values = [v for v in clause_values if v != pmcid_int and v != str(pmcid_int)]
-                            clause["values"] = new_values
-                            remaining_pmcs = new_values
-                            break
-                    
-                    # SMART RULING: Delete empty rule instead of keeping it; otherwise, replace the rule without the PMC
-                    if not remaining_pmcs:
-                        logger.debug(f"SMART RULING - Source rule will be empty, deleting entire rule at index {current_pmcid_rule_index}")
-                        # Get the actual rule ID (UUID) from the rule
-                        source_rule_id = source_rule.get("_id")
-                        # Use JSON Patch to remove the rule by index
-                        patches_needed.append({
-                            "op": "remove",
-                            "path": f"/environments/{actual_env}/rules/{current_pmcid_rule_index}"
-                        })
-                        logger.debug(f"Will remove rule at index: {current_pmcid_rule_index}")
-                        rule_deleted = True
-                        
-                        # Adjust target rule index if it comes after the deleted rule
-                        if target_rule_index > current_pmcid_rule_index:
-                            adjusted_target_rule_index = target_rule_index - 1
-                            logger.debug(f"Adjusted target rule index from {target_rule_index} to {adjusted_target_rule_index}")
-                    else:
-                        logger.debug("Updating source rule to remove PMC without deleting entire rule")
-                        patches_needed.append({
-                            "op": "replace",
-                            "path": f"/environments/{actual_env}/rules/{current_pmcid_rule_index}",
-                            "value": source_rule
-                        })
-                # Step 2: Add to or create target rule
-                if adjusted_target_rule_index >= 0:
-                    # Add to existing target rule
-                    logger.debug(f"Adding PMC ID {pmcid_int} to existing {'enabled' if enable else 'disabled'} rule at index {adjusted_target_rule_index}")
-                    target_rule = rules[adjusted_target_rule_index].copy()
-
-                    # Add PMC ID to the target rule
-                    for clause in target_rule.get("clauses", []):
-                        if clause.get("attribute") == "PmcId":
-                            if pmcid_int not in clause.get("values", []):
-                                clause["values"].append(pmcid_int)
-                            break
-
-                    rule_to_apply = target_rule
-                    rule_index_to_update = adjusted_target_rule_index
-
-                    if rule_deleted:
-                        action_description = f"Deleted empty rule and moved PMC {pmcid_int} to {'enabled' if enable else 'disabled'} rule"
-                    else:
-                        action_description = f"Moved PMC {pmcid_int} to {'enabled' if enable else 'disabled'} rule"
-                else:
-                    # Create new standard rule
-                    logger.debug(f"Creating new standard {'enabled' if enable else 'disabled'} rule")
-                    rule_to_apply = self.create_standard_pmc_rule(pmcid_int, target_variation, enable)
-                    rule_index_to_update = -1
-                    action_description = f"Created new {'enabled' if enable else 'disabled'} rule with PMC {pmcid_int}"
-
-                additional_ops = patches_needed
-
-            # Apply the changes via API using JSON Patch operations
-            if rule_to_apply:
-                success = self.update_flag_configuration(
-                    feature_key,
-                    flag_data,
-                    environment,
-                    rule_index_to_update,
-                    rule_to_apply,
-                    additional_ops
-                )
-                api_responses.append({
-                    "operation": "update_flag_config",
-                    "success": success,
-                    "rule_index": rule_index_to_update,
-                    "additional_operations": additional_ops
-                })
-            else:
-                success = True
-                api_responses.append({
-                    "operation": "no_changes_needed",
-                    "success": True,
-                    "message": "PMC ID already in correct state"
-                })
-
-                # If user requested to set default rule (fallthrough) to True/False and we are enabling,
-                # apply a follow-up JSON Patch to set fallthrough even when no rule changes are needed and audit it.
-                try:
-                    desired = ""
-                    if getattr(self, 'fallthrough_option_var', None):
-                        desired = (self.fallthrough_option_var.get() or "").strip().lower()
-                    if enable and desired in ("true", "false"):
-                        logger.debug("Applying fallthrough update in intelligent path (no changes needed case)...")
-                        ft_success = self.update_flag_configuration(feature_key, flag_data, environment)
-                        api_responses.append({
-                            "operation": "fallthrough_update",
-                            "success": ft_success
-                        })
-                        # Audit default rule update for Notifications tab
-                        try:
-                            actual_env = ENVIRONMENT_MAPPINGS.get(environment, environment)
-                            audit_event(
-                                "default_rule_update",
-                                {
-                                    "feature_key": feature_key,
-                                    "environment": actual_env,
-                                    "enabled": True if desired == "true" else False,
-                                    "note": "fallthrough/offVariation updated in intelligent path",
-                                },
-                                ok=bool(ft_success),
-                            )
-                        except Exception:
-                            pass
-                        if not ft_success:
-                            logger.error("Failed to update fallthrough variation in intelligent path (no changes needed)")
-                except Exception as e:
-                    logger.exception(f"Exception applying fallthrough update in intelligent path: {str(e)}")
+        return apply_pmc_targeting(
+            feature_key,
+            environment,
+            pmcid,
+            enable,
+            fetch_flag=self.get_flag_configuration,
+            send_patch=self.send_flag_patch,
+            site_id=siteid,
+            default_value=self._default_rule_choice()
+        )
 
-            if success:
-                # Audit concise summary for Notifications tab
-                try:
-                    audit_event(
-                        "pmc_targeting_update",
-                        {
-                            "feature_key": feature_key,
-                            "environment": actual_env,
-                            "enabled": bool(enable),
-                            "pmc_id": str(pmcid_int),
-                            "site_id": str(siteid) if siteid else "",
-                            "summary": action_description,
-                        },
-                        ok=True,
-                    )
-                except Exception:
-                    pass
-                return True, action_description, api_responses
-            else:
-                api_responses.append({"operation": "final_result", "success": False, "error": "Failed to apply targeting rule changes"})
-                try:
-                    audit_event(
-                        "pmc_targeting_update",
-                        {
-                            "feature_key": feature_key,
-                            "environment": actual_env,
-                            "enabled": bool(enable),
-                            "pmc_id": str(pmcid_int),
-                            "site_id": str(siteid) if siteid else "",
-                            "summary": "Failed to apply targeting rule changes",
-                        },
-                        ok=False,
-                    )
-                except Exception:
-                    pass
-                return False, "Failed to apply targeting rule changes", api_responses
-                
-        except Exception as e:
-            logger.exception(f"Exception in intelligent targeting: {str(e)}")
-            api_responses.append({"operation": "exception", "success": False, "error": str(e)})
-            return False, f"Error in intelligent targeting: {str(e)}", api_responses
-
-    def create_standard_pmc_rule(self, pmcid_int, target_variation, enable):
-        """Create a standard PMC rule dict for enabled/disabled state."""
-        description = "PMCs Enabled Rule" if enable else "PMCs Disabled Rule"
-        new_rule = {
-            "variation": target_variation,
-            "description": description,
-            "clauses": [
-                {
-                    "attribute": "PmcId",
-                    "op": "in",
-                    "values": [pmcid_int],
-                    "negate": False
-                }
-            ],
-            "trackEvents": True
-        }
-        logger.debug(f"Created standard rule: {description} with PMC {pmcid_int}")
-        return new_rule
+    def update_flag_with_bulk_pmc_targeting(self, feature_key, environment, pmc_ids, siteid, enable):
+        """Target many PMC IDs with one flag fetch and a single JSON Patch"""
+        logger.debug(f"Starting bulk targeting for {len(pmc_ids)} PMC IDs")
+        return apply_bulk_pmc_targeting(
+            feature_key,
+            environment,
+            pmc_ids,
+            enable,
+            fetch_flag=self.get_flag_configuration,
+            send_patch=self.send_flag_patch,
+            site_id=siteid,
+            default_value=self._default_rule_choice()
+        )
+
+    def update_flag_with_default_rule(self, feature_key, environment, enable):
+        """Toggle globally and set the default rule with one flag fetch and a single JSON Patch"""
+        return apply_toggle(
+            feature_key,
+            environment,
+            enable,
+            fetch_flag=self.get_flag_configuration,
+            send_patch=self.send_flag_patch,
+            default_value=self._default_rule_choice()
+        )
 
     def get_flag_configuration(self, feature_key):
         """Get current flag configuration from LaunchDarkly"""
@@ -1113,6 +1176,23 @@ class UpdateTab:
         - ensure_on: If True, force the flag's 'on' state to True. If False, do not modify the 'on' state.
         - reset_fields: If True, reset the Update tab fields after success. Useful to keep context when only editing fallthrough.
         """
+        actual_env = ENVIRONMENT_MAPPINGS.get(environment, environment)
+        patch_operations = build_patch_operations(
+            flag_data,
+            actual_env,
+            rule_index_to_update,
+            rule_to_apply,
+            additional_operations,
+            ensure_on=ensure_on,
+            default_value=self._default_rule_choice()
+        )
+        return self.send_flag_patch(feature_key, patch_operations, reset_fields=reset_fields)
+
+    def send_flag_patch(self, feature_key, patch_operations, reset_fields=True):
+        """Send JSON Patch operations for a flag with user attribution; resets the Update tab fields on success.
+
+        Raises PatchConflict when guarded (test op) operations are rejected, so targeting can rebase and retry.
+        """
         from shared.user_session import get_api_comment
         try:
             url = URLBuilder.build_flag_url(PROJECT_KEY, feature_key)
@@ -1121,96 +1201,6 @@ class UpdateTab:
             if not PROJECT_KEY or not LAUNCHDARKLY_API_KEY:
                 logger.error("Missing LaunchDarkly configuration (PROJECT_KEY or API key). Cannot update flag configuration.")
                 return False
-            actual_env = ENVIRONMENT_MAPPINGS.get(environment, environment)
-
-            # Build JSON Patch operations
-            patch_operations = []
-
-            # Determine boolean variation indices for default rule (fallthrough)
-            true_index = 0
-            false_index = 1
-            try:
-                variations = flag_data.get("variations", [])
-                for i, v in enumerate(variations):
-                    if v.get("value") is True:
-                        true_index = i
-                    elif v.get("value") is False:
-                        false_index = i
-            except Exception:
-                # Fallback to defaults if variations are unexpected
-                pass
-
-            # Optionally ensure flag is turned ON
-            if ensure_on:
-                patch_operations.append({
-                    "op": "replace",
-                    "path": f"/environments/{actual_env}/on",
-                    "value": True
-                })
-
-            # Optionally set default rule (fallthrough) to True/False based on UI selection
-            try:
-                desired = ""
-                if getattr(self, 'fallthrough_option_var', None):
-                    desired = (self.fallthrough_option_var.get() or "").strip().lower()
-                if desired in ("true", "false"):
-                    desired_index = true_index if desired == "true" else false_index
-                    envs = flag_data.get("environments", {})
-                    env_obj = envs.get(actual_env, {}) if isinstance(envs, dict) else {}
-                    fallthrough_obj = env_obj.get("fallthrough", {}) if isinstance(env_obj, dict) else {}
-                    if isinstance(fallthrough_obj, dict) and "variation" in fallthrough_obj:
-                        logger.debug(f"Fallthrough uses 'variation' - patching /fallthrough/variation to {desired}")
-                        patch_operations.append({
-                            "op": "replace",
-                            "path": f"/environments/{actual_env}/fallthrough/variation",
-                            "value": desired_index
-                        })
-                    else:
-                        # Some flags (e.g., migration) use 'rollout' in fallthrough. Replace entire fallthrough with a rollout
-                        # that serves 100% of the selected variation.
-                        logger.debug(f"Fallthrough not in 'variation' form - replacing entire fallthrough with rollout 100% {desired}")
-                        patch_operations.append({
-                            "op": "replace",
-                            "path": f"/environments/{actual_env}/fallthrough",
-                            "value": {
-                                "rollout": {
-                                    "variations": [
-                                        {"variation": desired_index, "weight": 100000}
-                                    ],
-                                    "contextKind": "user"
-                                }
-                            }
-                        })
-                    # Also set offVariation so that when the flag is OFF, it serves the selected variation
-                    logger.debug(f"Patching /offVariation to index {desired_index} ({desired})")
-                    patch_operations.append({
-                        "op": "replace",
-                        "path": f"/environments/{actual_env}/offVariation",
-                        "value": desired_index
-                    })
-            except Exception as e:
-                # If UI var not present or structure unexpected, skip this optional change
-                logger.debug(f"Skipping optional fallthrough update due to: {e}")
-
-            # Add any additional operations first (like removing from old rules)
-            if additional_operations:
-                patch_operations.extend(additional_operations)
-
-            # Update existing rule or add a new one
-            if rule_to_apply is not None and rule_index_to_update >= 0:
-                logger.debug(f"Creating patch to update existing rule at index {rule_index_to_update}")
-                patch_operations.append({
-                    "op": "replace",
-                    "path": f"/environments/{actual_env}/rules/{rule_index_to_update}",
-                    "value": rule_to_apply
-                })
-            elif rule_to_apply is not None:
-                logger.debug("Creating patch to add new rule")
-                patch_operations.append({
-                    "op": "add",
-                    "path": f"/environments/{actual_env}/rules/-",
-                    "value": rule_to_apply
-                })
 
             # Prepare payload with comment per LaunchDarkly docs (Updates with comments)
             payload = {
@@ -1228,6 +1218,12 @@ class UpdateTab:
                 if reset_fields:
                     self.reset_update_fields()
                 return True
+            elif is_patch_conflict(response.status_code, patch_operations, response.text):
+                # Guarded patch rejected: the flag changed since it was read; the caller rebases
+                raise PatchConflict(f"{feature_key} changed since it was read ({response.status_code})")
+            elif is_guarded_patch(patch_operations) and response.status_code in (400, 422):
+                # Malformed patch: retrying cannot help, report LaunchDarkly's message instead
+                raise PatchRejected(patch_error_message(response))
             else:
                 try:
                     resp_text = response.text
@@ -1241,6 +1237,8 @@ class UpdateTab:
                 logger.error(f"Failed to update flag configuration: {response.status_code} - {resp_text_ascii}")
                 return False
 
+        except (PatchConflict, PatchRejected):
+            raise
         except Exception as e:
             logger.exception(f"Exception updating flag configuration: {str(e)}")
             return False
@@ -0,0 +1,94 @@
+"""
+Tk <-> asyncio bridge
+Runs an asyncio event loop on a background thread and hands coroutine results
+back to the Tk main loop via after(), so UI callbacks always run on the Tk thread
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+class AsyncBridge:
+    """Submit coroutines from Tk code; callbacks are invoked on the Tk thread.
+
+    Usage:
+        bridge = AsyncBridge(root)
+        bridge.submit(client.get_flags(keys), on_success=self.show_flags, on_error=self.show_error)
+    """
+
+    def __init__(self, root, poll_interval_ms: int = 50):
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self.loop = asyncio.new_event_loop()
+        self.results = queue.Queue()
+        self.pending = 0
+        self.poll_job = None
+        self.thread = threading.Thread(target=self._run_loop, name="async-bridge", daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro, on_success=None, on_error=None):
+        """Schedule coro on the background loop; returns a concurrent.futures.Future"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.pending += 1
+
+        def done(fut):
+            # Runs on the loop thread: only hand the outcome over, never touch Tk here
+            try:
+                self.results.put((on_success, fut.result(), None))
+            except Exception as e:
+                self.results.put((on_error, None, e))
+
+        future.add_done_callback(done)
+        if self.poll_job is None:
+            self.poll_job = self.root.after(self.poll_interval_ms, self._poll)
+        return future
+
+    def run_sync(self, coro, timeout=None):
+        """Block the calling (non-Tk) thread until coro finishes on the loop"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def _poll(self):
+        """Drain finished results on the Tk thread and dispatch their callbacks"""
+        self.poll_job = None
+        while True:
+            try:
+                callback, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            try:
+                if error is not None:
+                    if callback:
+                        callback(error)
+                    else:
+                        logger.error(f"Async task failed: {error}")
+                elif callback:
+                    callback(result)
+            except Exception as e:
+                logger.error(f"Async callback failed: {e}")
+
+        if self.pending > 0:
+            self.poll_job = self.root.after(self.poll_interval_ms, self._poll)
+
+    def shutdown(self, close_coro=None, timeout: float = 5):
+        """Optionally await a cleanup coroutine (e.g. client.close()), then stop the loop"""
+        if self.poll_job is not None:
+            try:
+                self.root.after_cancel(self.poll_job)
+            except Exception:
+                pass
+            self.poll_job = None
+        if close_coro is not None and self.loop.is_running():
+            try:
+                self.run_sync(close_coro, timeout)
+            except Exception as e:
+                logger.debug(f"Async cleanup failed: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)